@@ -0,0 +1,118 @@
+"""Benchmark for encoding product and order list responses.
+
+Builds list payloads the way the list endpoints do (marshmallow dumps of
+products, and of orders with their items), then times turning them into a
+response with Flask's default stdlib provider and with StoreJSONProvider.
+
+    python -m benchmarks.json_encoding --rows 100 --repeat 2000
+"""
+
+import argparse
+import random
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks.utils import summarize_latencies
+from store.enums import OrderStatusEnum
+from store.json_provider import StoreJSONProvider, orjson
+from store.order.models import Item, Order
+from store.order.schemas import OrderSchema
+from store.product.models import Product
+from store.product.schemas import ProductSchema
+
+
+def product_payload(rng: random.Random, rows: int) -> dict:
+    products = [
+        Product(
+            id=index,
+            name=f"Product {index}",
+            description="A product used to benchmark list serialization.",
+            price=round(rng.uniform(1, 500), 2),
+            inventory=rng.randint(0, 1000),
+            price_version=1,
+            created_by=1,
+            created_at=datetime.now(UTC),
+        )
+        for index in range(1, rows + 1)
+    ]
+    return {
+        "per_page": rows,
+        "has_next": True,
+        "next_cursor": "eyJ2IjpbMTAwXX0",
+        "products": ProductSchema(many=True).dump(products),
+    }
+
+
+def order_payload(rng: random.Random, rows: int) -> dict:
+    now = datetime.now(UTC)
+    orders = [
+        Order(
+            id=index,
+            user_id=1,
+            status=rng.choice(list(OrderStatusEnum)).name,
+            created_at=now - timedelta(minutes=index),
+            total_price=round(rng.uniform(10, 1000), 2),
+            tracking_code=uuid.UUID(int=rng.getrandbits(128)),
+            items=[
+                Item(
+                    product_id=rng.randint(1, 1000),
+                    quantity=rng.randint(1, 5),
+                    price_version=1,
+                )
+                for _ in range(3)
+            ],
+        )
+        for index in range(1, rows + 1)
+    ]
+    return {
+        "per_page": rows,
+        "has_next": True,
+        "next_cursor": "eyJ2IjpbMTAwXX0",
+        "orders": OrderSchema(many=True).dump(orders),
+    }
+
+
+def run_provider(provider, payload: dict, repeat: int) -> dict:
+    latencies: list = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        provider.response(payload)
+        latencies.append(time.perf_counter() - start)
+    return {"mean": sum(latencies) / len(latencies), **summarize_latencies(latencies)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)  # noqa: S311
+    app = Flask("benchmarks")
+    providers = {
+        "stdlib": DefaultJSONProvider(app),
+        "orjson" if orjson else "fallback": StoreJSONProvider(app),
+    }
+    payloads = {
+        "products": product_payload(rng, args.rows),
+        "orders": order_payload(rng, args.rows),
+    }
+    for payload_name, payload in payloads.items():
+        for provider_name, provider in providers.items():
+            result = run_provider(provider, payload, args.repeat)
+            print(  # noqa: T201
+                f"{payload_name:>8} {provider_name:>8}: "
+                f"mean={result['mean'] * 1_000_000:8.1f}us "
+                f"p50={result['p50'] * 1_000_000:.1f}us "
+                f"p95={result['p95'] * 1_000_000:.1f}us "
+                f"per response ({args.rows} rows)",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,632 @@
+"""Load test of every API route against a gunicorn-served app.
+
+Seeds a SQLite database with production-like volumes, serves it with
+gunicorn (Redis is stood in for by a fakeredis TCP server unless
+--redis-url is given), drives each endpoint with concurrent keep-alive
+clients and reports p50/p95/p99 latency and requests/sec per endpoint.
+
+The results are compared with a baseline JSON recorded with the same
+settings; any endpoint slower or less successful than the baseline beyond
+--tolerance makes the run exit with status 1.
+
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --scale 0.01 --requests 100 --baseline ""
+    python -m benchmarks.load_test --update-baseline
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import fakeredis
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy import select, text
+
+from benchmarks.utils import benchmark_config, create_benchmark_app, summarize_latencies
+from store.enums import OrderStatusEnum
+from store.extensions import db
+from store.hashing import hash_password
+from store.order.models import Order
+from store.seeding import Seeder, user_email
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "load_test.json"
+PASSWORD = "load-test-password"  # noqa: S105
+# Settings a baseline is only comparable under.
+BASELINE_KEYS = (
+    "users",
+    "products",
+    "orders",
+    "requests",
+    "concurrency",
+    "workers",
+    "threads",
+    "bcrypt_rounds",
+    "seed",
+)
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    # index of the request -> (path, JSON body or None, bearer token or None)
+    request: Callable
+    requests: int
+
+
+def seed(args: argparse.Namespace) -> None:
+    db.drop_all()
+    db.create_all()
+    db.session.execute(text("PRAGMA journal_mode=WAL"))
+    # Hashed at the served app's cost, so logins don't rehash it.
+    password_hash: bytes = hash_password(PASSWORD, args.bcrypt_rounds)
+    seeder = Seeder(db.session.connection(), password_hash, seed=args.seed)
+    seeder.seed(args.users, args.products, args.orders, admins=1)
+    db.session.commit()
+
+
+class Workload:
+    """Targets and tokens for every endpoint, picked from the seeded rows."""
+
+    def __init__(self, args: argparse.Namespace, rng: random.Random):
+        self.args = args
+        self.rng = rng
+        self.run_id: str = uuid.uuid4().hex[:8]
+        self.tokens: dict = {}
+        self.refresh_tokens: dict = {}
+        recent = datetime.now() - timedelta(minutes=50)  # noqa: DTZ005
+        self.pending_orders: list = db.session.execute(
+            select(Order.id, Order.user_id)
+            .where(
+                Order.status == OrderStatusEnum.PENDING.name,
+                Order.created_at > recent,
+            )
+            .order_by(Order.id)
+            .limit(3 * args.requests),
+        ).all()
+        self.confirmed_orders: list = db.session.execute(
+            select(Order.id, Order.user_id)
+            .where(Order.status == OrderStatusEnum.CONFIRMED.name)
+            .order_by(Order.id)
+            .limit(2 * args.requests),
+        ).all()
+        self.tracked_orders: list = db.session.execute(
+            select(Order.tracking_code, Order.user_id)
+            .order_by(Order.id.desc())
+            .limit(args.requests),
+        ).all()
+        # Products nobody ordered, so deleting them succeeds.
+        seeder = Seeder(db.session.connection(), b"", seed=args.seed)
+        self.spare_product_ids: list = list(
+            seeder.seed_products(
+                args.requests,
+                name="Spare product",
+                price=10.0,
+                inventory=10,
+            ),
+        )
+        db.session.commit()
+
+    def token(self, user_id: int) -> str:
+        if user_id not in self.tokens:
+            claims: dict = {"user_id": user_id, "is_admin": user_id == 1}
+            self.tokens[user_id] = create_access_token(
+                identity=user_email(user_id),
+                additional_claims=claims,
+            )
+            self.refresh_tokens[user_id] = create_refresh_token(
+                identity=user_email(user_id),
+                additional_claims=claims,
+            )
+        return self.tokens[user_id]
+
+    def refresh_token(self, user_id: int) -> str:
+        self.token(user_id)
+        return self.refresh_tokens[user_id]
+
+    def user_id(self, index: int) -> int:
+        # Customers only, so the admin's own rate limits aren't shared.
+        return 2 + index % (self.args.users - 1)
+
+    def product_id(self) -> int:
+        return self.rng.randint(1, self.args.products)
+
+    def items(self) -> list:
+        return [
+            {"product_id": self.product_id(), "quantity": self.rng.randint(1, 3)}
+            for _ in range(self.rng.randint(1, 3))
+        ]
+
+    def endpoints(self) -> list:
+        requests: int = self.args.requests
+        admin: str = self.token(1)
+        pending, confirmed = self.pending_orders, self.confirmed_orders
+        # Tokens are signed up front: the client threads run without an
+        # app context.
+        for row in [*pending, *confirmed, *self.tracked_orders]:
+            self.token(row.user_id)
+        for index in range(requests):
+            self.token(self.user_id(index))
+
+        def order_action(rows: list, suffix: str = "") -> Callable:
+            return lambda index: (
+                f"/api/v1/orders/{rows[index].id}{suffix}",
+                None,
+                self.tokens[rows[index].user_id],
+            )
+
+        update_orders = pending[:requests]
+        delete_orders = pending[requests : 2 * requests]
+        confirm_orders = pending[2 * requests :]
+        cancel_orders = confirmed[:requests]
+        complete_orders = confirmed[requests:]
+        endpoints: list = [
+            Endpoint(
+                "users.register",
+                "POST",
+                lambda index: (
+                    "/api/v1/users/",
+                    {
+                        "email": f"load-{self.run_id}-{index}@example.com",
+                        "full_name": "Load Test",
+                        "password": PASSWORD,
+                        "re_password": PASSWORD,
+                    },
+                    None,
+                ),
+                requests,
+            ),
+            Endpoint(
+                "users.login",
+                "POST",
+                lambda index: (
+                    "/api/v1/users/login",
+                    {"email": user_email(self.user_id(index)), "password": PASSWORD},
+                    None,
+                ),
+                requests,
+            ),
+            Endpoint(
+                "users.refresh",
+                "POST",
+                lambda index: (
+                    "/api/v1/users/refresh",
+                    None,
+                    self.refresh_token(self.user_id(index)),
+                ),
+                requests,
+            ),
+            Endpoint(
+                "users.me",
+                "GET",
+                lambda index: (
+                    "/api/v1/users/me",
+                    None,
+                    self.token(self.user_id(index)),
+                ),
+                requests,
+            ),
+            Endpoint(
+                "products.list",
+                "GET",
+                lambda index: (
+                    "/api/v1/products/?per_page=20&sort="
+                    + ("id", "name", "price")[index % 3],
+                    None,
+                    None,
+                ),
+                requests,
+            ),
+            Endpoint(
+                "products.list_page",
+                "GET",
+                lambda index: (f"/api/v1/products/?page={index % 100 + 1}", None, None),
+                requests,
+            ),
+            Endpoint(
+                "products.detail",
+                "GET",
+                lambda index: (f"/api/v1/products/{self.product_id()}", None, None),
+                requests,
+            ),
+            Endpoint(
+                "products.search",
+                "GET",
+                lambda index: (
+                    f"/api/v1/products/search?q=product+{self.product_id()}",
+                    None,
+                    None,
+                ),
+                requests,
+            ),
+            Endpoint(
+                "products.add",
+                "POST",
+                lambda index: (
+                    "/api/v1/products/",
+                    {
+                        "name": f"Load product {self.run_id}-{index}",
+                        "price": 9.99,
+                        "description": "Added by the load test.",
+                        "inventory": 100,
+                    },
+                    admin,
+                ),
+                requests,
+            ),
+            Endpoint(
+                "products.update",
+                "PUT",
+                lambda index: (
+                    f"/api/v1/products/{self.product_id()}",
+                    {
+                        "name": f"Updated product {self.run_id}-{index}",
+                        "price": round(self.rng.uniform(1, 500), 2),
+                        "description": "Updated by the load test.",
+                        "inventory": 1_000_000,
+                    },
+                    admin,
+                ),
+                requests,
+            ),
+            Endpoint(
+                "products.delete",
+                "DELETE",
+                lambda index: (
+                    f"/api/v1/products/{self.spare_product_ids[index]}",
+                    None,
+                    admin,
+                ),
+                requests,
+            ),
+            Endpoint(
+                "products.cache_stats",
+                "GET",
+                lambda index: ("/api/v1/products/cache-stats", None, admin),
+                requests,
+            ),
+            Endpoint(
+                "orders.add",
+                "POST",
+                lambda index: (
+                    "/api/v1/orders/",
+                    {"items": self.items()},
+                    self.token(self.user_id(index)),
+                ),
+                requests,
+            ),
+            Endpoint(
+                "orders.batch",
+                "POST",
+                lambda index: (
+                    "/api/v1/orders/batch",
+                    {"orders": [{"items": self.items()} for _ in range(5)]},
+                    self.token(self.user_id(index)),
+                ),
+                requests,
+            ),
+            Endpoint(
+                "orders.list",
+                "GET",
+                lambda index: (
+                    "/api/v1/orders/",
+                    None,
+                    self.token(self.user_id(index)),
+                ),
+                requests,
+            ),
+            Endpoint(
+                "orders.tracking",
+                "GET",
+                lambda index: (
+                    f"/api/v1/orders/tracking/{self.tracked_orders[index].tracking_code}",
+                    None,
+                    self.token(self.tracked_orders[index].user_id),
+                ),
+                len(self.tracked_orders),
+            ),
+            Endpoint(
+                "orders.update",
+                "PUT",
+                lambda index: (
+                    f"/api/v1/orders/{update_orders[index].id}",
+                    {"items": self.items()},
+                    self.tokens[update_orders[index].user_id],
+                ),
+                len(update_orders),
+            ),
+            Endpoint(
+                "orders.confirm",
+                "PATCH",
+                order_action(confirm_orders, "/confirmed"),
+                len(confirm_orders),
+            ),
+            Endpoint(
+                "orders.cancel",
+                "PATCH",
+                order_action(cancel_orders, "/canceled"),
+                len(cancel_orders),
+            ),
+            Endpoint(
+                "orders.complete",
+                "PATCH",
+                order_action(complete_orders, "/completed"),
+                len(complete_orders),
+            ),
+            Endpoint(
+                "orders.delete",
+                "DELETE",
+                order_action(delete_orders),
+                len(delete_orders),
+            ),
+            Endpoint(
+                "monitoring.db_pool",
+                "GET",
+                lambda index: ("/api/v1/monitoring/db-pool", None, admin),
+                requests,
+            ),
+        ]
+        for endpoint in endpoints:
+            if endpoint.requests < requests:
+                print(  # noqa: T201
+                    f"warning: only {endpoint.requests} targets for {endpoint.name}, "
+                    "seed more orders for a full run.",
+                )
+        return endpoints
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_redis() -> tuple:
+    server = fakeredis.TcpFakeServer(("127.0.0.1", free_port()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"redis://{host}:{port}/0"
+
+
+def start_gunicorn(args: argparse.Namespace, env: dict, port: int):
+    process = subprocess.Popen(  # noqa: S603
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--workers",
+            str(args.workers),
+            "--worker-class",
+            "gthread",
+            "--threads",
+            str(args.threads),
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--log-level",
+            "warning",
+            "store.app:create_app()",
+        ],
+        env=env,
+    )
+    deadline: float = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/api/v1/products/?per_page=1")
+            if connection.getresponse().status == http.client.OK:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    msg = "gunicorn didn't start in 30 seconds."
+    raise RuntimeError(msg)
+
+
+def run_endpoint(port: int, endpoint: Endpoint, concurrency: int) -> dict:
+    indexes = iter(range(endpoint.requests))
+    lock = threading.Lock()
+    latencies: list = []
+    statuses: Counter = Counter()
+
+    def client() -> None:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        while True:
+            with lock:
+                index: int | None = next(indexes, None)
+            if index is None:
+                break
+            path, body, token = endpoint.request(index)
+            headers: dict = {"Content-Type": "application/json"}
+            if token:
+                headers["Authorization"] = f"Bearer {token}"
+            start: float = time.perf_counter()
+            try:
+                connection.request(
+                    endpoint.method,
+                    path,
+                    body=json.dumps(body) if body is not None else None,
+                    headers=headers,
+                )
+                response = connection.getresponse()
+                response.read()
+                status: int = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                status = 0
+            elapsed: float = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+        connection.close()
+
+    started: float = time.perf_counter()
+    threads: list = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall: float = time.perf_counter() - started
+
+    errors: int = sum(
+        count
+        for status, count in statuses.items()
+        if not 200 <= status < 300  # noqa: PLR2004
+    )
+    quantiles: dict = summarize_latencies(latencies)
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(quantiles["p50"] * 1000, 2),
+        "p95_ms": round(quantiles["p95"] * 1000, 2),
+        "p99_ms": round(quantiles["p99"] * 1000, 2),
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Endpoints that got slower, handle fewer requests or fail more often."""
+    regressions: list = []
+    for name, expected in baseline["endpoints"].items():
+        actual: dict | None = results["endpoints"].get(name)
+        if actual is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        if actual["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {actual['p95_ms']}ms > baseline {expected['p95_ms']}ms",
+            )
+        if actual["rps"] < expected["rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {actual['rps']} req/s < baseline {expected['rps']} req/s",
+            )
+        if actual["error_rate"] > expected["error_rate"] + 0.01:
+            regressions.append(
+                f"{name}: error rate {actual['error_rate']} > "
+                f"baseline {expected['error_rate']}",
+            )
+    return regressions
+
+
+def main() -> None:  # noqa: PLR0915
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="multiply the seeded volumes, e.g. 0.01 for a quick run",
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--bcrypt-rounds", type=int, default=4)
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    args.users = max(int(args.users * args.scale), 2)
+    args.products = max(int(args.products * args.scale), 1)
+    args.orders = max(int(args.orders * args.scale), 1)
+
+    rng = random.Random(args.seed)  # noqa: S311
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite:///{Path(tmp_dir) / 'load.db'}"
+        config = benchmark_config(database_url)
+        app = create_benchmark_app(database_url)
+        with app.app_context():
+            started: float = time.perf_counter()
+            seed(args)
+            print(  # noqa: T201
+                f"seeded {args.users} users, {args.products} products and "
+                f"{args.orders} orders in {time.perf_counter() - started:.1f}s",
+            )
+            endpoints: list = Workload(args, rng).endpoints()
+            db.session.remove()
+            db.engine.dispose()
+
+        redis_server, redis_url = (None, args.redis_url)
+        if not redis_url:
+            redis_server, redis_url = start_fake_redis()
+        redis_host, redis_port = redis_url.split("//")[1].split("/")[0].split(":")
+        env: dict = {
+            **os.environ,
+            "FLASK_ENV": "production",
+            "SECRET_KEY": config.SECRET_KEY,
+            "JWT_SECRET_KEY": config.JWT_SECRET_KEY,
+            "DATABASE_URL": database_url,
+            "REDIS_URL": redis_url,
+            "CACHE_REDIS_HOST": redis_host,
+            "CACHE_REDIS_PORT": redis_port,
+            "BCRYPT_LOG_ROUNDS": str(args.bcrypt_rounds),
+            "REQUEST_LOG_FILE": str(Path(tmp_dir) / "request.log"),
+        }
+        port: int = free_port()
+        server = start_gunicorn(args, env, port)
+        results: dict = {
+            "config": {key: getattr(args, key) for key in BASELINE_KEYS},
+            "endpoints": {},
+        }
+        try:
+            for endpoint in endpoints:
+                result: dict = run_endpoint(port, endpoint, args.concurrency)
+                results["endpoints"][endpoint.name] = result
+                print(  # noqa: T201
+                    f"{endpoint.name:>22}: {result['rps']:8.1f} req/s "
+                    f"p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms "
+                    f"p99={result['p99_ms']:.1f}ms errors={result['error_rate']:.2%}",
+                )
+        finally:
+            server.terminate()
+            server.wait()
+            if redis_server:
+                redis_server.shutdown()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    if args.update_baseline:
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.baseline).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")  # noqa: T201
+        return
+    if not args.baseline:
+        return
+
+    baseline: dict = json.loads(Path(args.baseline).read_text())
+    if baseline["config"] != results["config"]:
+        print(  # noqa: T201
+            "baseline was recorded with different settings "
+            f"{baseline['config']}; rerun with them or --update-baseline.",
+        )
+        sys.exit(2)
+    regressions: list = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"regression: {regression}")  # noqa: T201
+    if regressions:
+        sys.exit(1)
+    print("no regressions against the baseline")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
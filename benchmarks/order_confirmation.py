@@ -0,0 +1,187 @@
+"""Contention benchmark for order confirmation.
+
+Confirms pending orders that all buy the same few "hot" products from many
+threads, once with the legacy lock-and-loop strategy and once with the
+guarded set-based UPDATE used by OrderService, and reports confirmations/sec.
+
+    python -m benchmarks.order_confirmation --orders 2000 --threads 16
+"""
+
+import argparse
+import queue
+import random
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.utils import create_benchmark_app, summarize_latencies
+from store.enums import OrderStatusEnum
+from store.exceptions import ConflictIntegrityError
+from store.extensions import db
+from store.order.models import Item, Order
+from store.order.services import OrderService
+from store.product.models import Product
+from store.user.models import User
+
+order_service = OrderService()
+
+
+def legacy_confirm(order_id: int) -> None:
+    order: Order = db.session.get(Order, order_id)
+    products_map: dict = order_service.get_map_products(
+        items=[{"product_id": item.product_id} for item in order.items],
+        lock=True,
+    )
+    for item in order.items:
+        product = products_map.get(item.product_id)
+        product.inventory = product.inventory - item.quantity
+    order.status = OrderStatusEnum.CONFIRMED.name
+    db.session.commit()
+
+
+def guarded_confirm(order_id: int) -> None:
+    order: Order = db.session.get(Order, order_id)
+    order_service.transition_order_status(
+        order,
+        OrderStatusEnum.PENDING.name,
+        OrderStatusEnum.CONFIRMED.name,
+    )
+    order_service.update_inventory_products(
+        order_id,
+        order_service.order_item_quantities(order_id),
+        OrderStatusEnum.CONFIRMED.name,
+    )
+    db.session.commit()
+
+
+STRATEGIES = {"legacy": legacy_confirm, "guarded": guarded_confirm}
+
+
+def seed(args: argparse.Namespace) -> list:
+    rng = random.Random(args.seed)  # noqa: S311
+    db.drop_all()
+    db.create_all()
+    user_id = db.session.scalar(
+        insert(User).returning(User.id),
+        [{"email": "benchmark@example.com", "active": True}],
+    )
+    db.session.execute(
+        insert(Product),
+        [
+            {
+                "name": f"Hot product {index}",
+                "price": 10.0,
+                "inventory": args.inventory,
+            }
+            for index in range(args.hot_products)
+        ],
+    )
+    product_ids = db.session.scalars(db.select(Product.id)).all()
+    order_ids = db.session.scalars(
+        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+        [
+            {
+                "user_id": user_id,
+                "status": OrderStatusEnum.PENDING.name,
+                "total_price": 10.0 * args.items_per_order,
+                "tracking_code": str(uuid.uuid4()),
+            }
+            for _ in range(args.orders)
+        ],
+    ).all()
+    db.session.execute(
+        insert(Item),
+        [
+            {
+                "order_id": order_id,
+                "product_id": product_id,
+                "quantity": 1,
+                "product_price": 10.0,
+            }
+            for order_id in order_ids
+            for product_id in rng.sample(product_ids, args.items_per_order)
+        ],
+    )
+    db.session.commit()
+    return order_ids
+
+
+def run_strategy(app, name: str, order_ids: list, threads: int) -> dict:
+    confirm = STRATEGIES[name]
+    pending: queue.Queue = queue.Queue()
+    for order_id in order_ids:
+        pending.put(order_id)
+    latencies: list = []
+    counters = {"confirmed": 0, "conflicts": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def worker() -> None:
+        with app.app_context():
+            while True:
+                try:
+                    order_id = pending.get_nowait()
+                except queue.Empty:
+                    break
+                start = time.perf_counter()
+                try:
+                    confirm(order_id)
+                    outcome = "confirmed"
+                except ConflictIntegrityError:
+                    outcome = "conflicts"
+                except OperationalError:
+                    db.session.rollback()
+                    outcome = "errors"
+                with lock:
+                    counters[outcome] += 1
+                    latencies.append(time.perf_counter() - start)
+            db.session.remove()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        **counters,
+        "seconds": elapsed,
+        "confirmations_per_second": counters["confirmed"] / elapsed,
+        **summarize_latencies(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--hot-products", type=int, default=5)
+    parser.add_argument("--items-per-order", type=int, default=2)
+    parser.add_argument("--inventory", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = args.database_url or f"sqlite:///{Path(tmp_dir) / 'bench.db'}"
+        app = create_benchmark_app(database_url)
+        for name in STRATEGIES:
+            with app.app_context():
+                order_ids = seed(args)
+            result = run_strategy(app, name, order_ids, args.threads)
+            print(  # noqa: T201
+                f"{name:>8}: {result['confirmations_per_second']:10.1f} "
+                f"confirmations/s confirmed={result['confirmed']} "
+                f"conflicts={result['conflicts']} "
+                f"errors={result['errors']} p50={result['p50'] * 1000:.2f}ms "
+                f"p95={result['p95'] * 1000:.2f}ms p99={result['p99'] * 1000:.2f}ms",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Benchmark for propagating a product price change to pending orders.
+
+Seeds one popular product that sits in many pending orders (plus some
+confirmed ones that must not change), then reprices it with the legacy
+load-and-save listener body and with the set-based UPDATEs used by
+store.events, and reports the time per price change.
+
+    python -m benchmarks.price_propagation --pending-orders 50000 --repeat 5
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import insert, select
+
+from benchmarks.utils import create_benchmark_app, summarize_latencies
+from store.enums import OrderStatusEnum
+from store.events import reprice_pending_orders
+from store.extensions import db
+from store.order.models import Item, Order
+from store.product.models import Product
+from store.user.models import User
+
+
+def legacy_reprice(product_id: int, price: float, price_version: int) -> None:
+    pending_order_items = (
+        Item.query.join(Order)
+        .filter(
+            Item.product_id == product_id,
+            Order.status == OrderStatusEnum.PENDING.name,
+        )
+        .all()
+    )
+    order_ids = [item.order_id for item in pending_order_items]
+    orders = Order.query.filter(Order.id.in_(order_ids)).all()
+
+    for item, order in zip(pending_order_items, orders, strict=False):
+        old_total = item.product_price * item.quantity
+        new_total = price * item.quantity
+
+        item.product_price = price
+        order.total_price = order.total_price - old_total + new_total
+
+    db.session.bulk_save_objects(pending_order_items)
+    db.session.bulk_save_objects(orders)
+    db.session.commit()
+
+
+def set_based_reprice(product_id: int, price: float, price_version: int) -> None:
+    reprice_pending_orders(db.session.connection(), product_id, price, price_version)
+    db.session.commit()
+
+
+STRATEGIES = {"legacy": legacy_reprice, "set-based": set_based_reprice}
+
+
+def seed(args: argparse.Namespace) -> int:
+    rng = random.Random(args.seed)  # noqa: S311
+    db.drop_all()
+    db.create_all()
+    user_id = db.session.scalar(
+        insert(User).returning(User.id),
+        [{"email": "benchmark@example.com", "active": True}],
+    )
+    db.session.execute(
+        insert(Product),
+        [
+            {"name": f"Product {index}", "price": 10.0, "inventory": 1_000_000}
+            for index in range(args.other_products + 1)
+        ],
+    )
+    product_ids = db.session.scalars(select(Product.id).order_by(Product.id)).all()
+    hot_product_id, other_product_ids = product_ids[0], product_ids[1:]
+    statuses = [OrderStatusEnum.PENDING.name] * args.pending_orders + [
+        OrderStatusEnum.CONFIRMED.name,
+    ] * args.confirmed_orders
+    order_ids = db.session.scalars(
+        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+        [
+            {
+                "user_id": user_id,
+                "status": status,
+                "total_price": 20.0,
+                "tracking_code": str(uuid.uuid4()),
+            }
+            for status in statuses
+        ],
+    ).all()
+    db.session.execute(
+        insert(Item),
+        [
+            {
+                "order_id": order_id,
+                "product_id": product_id,
+                "quantity": 1,
+                "product_price": 10.0,
+            }
+            for order_id in order_ids
+            for product_id in (hot_product_id, rng.choice(other_product_ids))
+        ],
+    )
+    db.session.commit()
+    return hot_product_id
+
+
+def run_strategy(name: str, product_id: int, repeat: int) -> dict:
+    reprice = STRATEGIES[name]
+    latencies: list = []
+    for index in range(repeat):
+        start = time.perf_counter()
+        reprice(product_id, 11.0 + index, index + 1)
+        latencies.append(time.perf_counter() - start)
+        db.session.expire_all()
+    return {"mean": sum(latencies) / len(latencies), **summarize_latencies(latencies)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--pending-orders", type=int, default=50_000)
+    parser.add_argument("--confirmed-orders", type=int, default=10_000)
+    parser.add_argument("--other-products", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = args.database_url or f"sqlite:///{Path(tmp_dir) / 'bench.db'}"
+        app = create_benchmark_app(database_url)
+        for name in STRATEGIES:
+            with app.app_context():
+                product_id = seed(args)
+                result = run_strategy(name, product_id, args.repeat)
+                db.session.remove()
+            print(  # noqa: T201
+                f"{name:>10}: mean={result['mean'] * 1000:9.1f}ms "
+                f"p50={result['p50'] * 1000:.1f}ms p95={result['p95'] * 1000:.1f}ms "
+                f"per price change ({args.pending_orders} pending orders)",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Benchmark for product search with the full-text index against LIKE scans.
+
+Seeds a catalog of products named and described with words drawn from a
+skewed vocabulary, so some words are in most products and others in a few,
+then times one page of results for queries of common, rare and missing
+words, read from the full-text index (ranked, as GET /products/search does)
+and with LIKE '%word%' on the name and description (unranked, in id order,
+which is the cheapest a LIKE scan gets).
+
+    python -m benchmarks.product_search --products 1000000 --repeat 10
+"""
+
+import argparse
+import itertools
+import random
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import and_, or_, select
+
+from benchmarks.utils import create_benchmark_app, summarize_latencies
+from store.extensions import db
+from store.product.models import Product
+from store.product.schemas import product_row_serializer
+from store.product.search import search_terms
+from store.product.services import ProductService
+from store.seeding import Seeder
+
+ADJECTIVES = (
+    "classic compact cordless deluxe durable ergonomic foldable handmade "
+    "heavy indoor light modern organic outdoor portable premium quiet rugged "
+    "slim smart sturdy vintage waterproof wireless wooden"
+).split()
+NOUNS = (
+    "backpack blender bottle camera chair charger desk drill headphones "
+    "jacket kettle keyboard lamp mattress monitor mouse mug pan router "
+    "scooter shoes speaker tent toaster umbrella watch"
+).split()
+FILLER = (
+    "and for with the of in to a your everyday use design quality made "
+    "steel cotton leather glass battery warranty kitchen office travel home "
+    "garden sports kids gift pack set color size"
+).split()
+# (label, query) pairs, from words in most products down to none.
+QUERIES = (
+    ("common word", "quality"),
+    ("two words", "wireless headphones"),
+    ("rare words", "limited edition"),
+    ("model code", "M0777777"),
+    ("missing word", "saxophone"),
+)
+
+
+def seed(args: argparse.Namespace) -> float:
+    db.drop_all()
+    db.create_all()
+    rng = random.Random(args.seed)  # noqa: S311
+    words: list = ADJECTIVES + NOUNS + FILLER
+    # Zipf-like: the n-th word is drawn about 1/n as often as the first.
+    cum_weights: list = list(
+        itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)),
+    )
+    now = datetime.now()  # noqa: DTZ005
+    started = time.perf_counter()
+    Seeder(db.session.connection(), b"", seed=args.seed).insert(
+        Product.__table__,
+        (
+            "id",
+            "name",
+            "price",
+            "description",
+            "inventory",
+            "price_version",
+            "created_at",
+            "updated_at",
+        ),
+        (
+            (
+                product_id,
+                # About one product in a thousand is a limited edition.
+                ("Limited edition " if rng.random() < 0.001 else "")  # noqa: PLR2004
+                + f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} M{product_id:07d}",
+                round(rng.uniform(1, 500), 2),
+                " ".join(
+                    rng.choices(words, cum_weights=cum_weights, k=rng.randint(8, 20)),
+                ),
+                100,
+                0,
+                now,
+                now,
+            )
+            for product_id in range(1, args.products + 1)
+        ),
+    )
+    db.session.commit()
+    return time.perf_counter() - started
+
+
+def full_text_search(text: str, per_page: int) -> list:
+    return ProductService().query_search_products(text, 1, per_page)["products"]
+
+
+def like_search(text: str, per_page: int) -> list:
+    query = (
+        select(*product_row_serializer.columns)
+        .where(
+            and_(
+                *(
+                    or_(
+                        Product.name.ilike(f"%{term}%"),
+                        Product.description.ilike(f"%{term}%"),
+                    )
+                    for term in search_terms(text)
+                ),
+            ),
+        )
+        .order_by(Product.id)
+        .limit(per_page + 1)
+    )
+    return product_row_serializer.dump_many(db.session.execute(query).all())
+
+
+STRATEGIES = {"full-text": full_text_search, "like": like_search}
+
+
+def run_strategy(name: str, text: str, args: argparse.Namespace) -> dict:
+    search = STRATEGIES[name]
+    latencies: list = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        products = search(text, args.per_page)
+        latencies.append(time.perf_counter() - start)
+    return {
+        "mean": sum(latencies) / len(latencies),
+        "found": len(products[: args.per_page]),
+        **summarize_latencies(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = args.database_url or f"sqlite:///{Path(tmp_dir) / 'bench.db'}"
+        app = create_benchmark_app(database_url)
+        with app.app_context():
+            seconds = seed(args)
+            print(  # noqa: T201
+                f"seeded {args.products} products with their search index "
+                f"in {seconds:.1f}s",
+            )
+            for label, text in QUERIES:
+                for name in STRATEGIES:
+                    result = run_strategy(name, text, args)
+                    print(  # noqa: T201
+                        f"{label:>12} {text!r:>23} {name:>9}: "
+                        f"mean={result['mean'] * 1000:8.1f}ms "
+                        f"p50={result['p50'] * 1000:.1f}ms "
+                        f"p95={result['p95'] * 1000:.1f}ms "
+                        f"({result['found']} results)",
+                    )
+            db.session.remove()
+
+
+if __name__ == "__main__":
+    main()
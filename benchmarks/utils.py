@@ -0,0 +1,39 @@
+import statistics
+
+from store.app import create_app
+from store.settings import REDIS_URL
+
+
+def benchmark_config(database_url: str) -> type:
+    class BenchmarkConfig:
+        TESTING = False
+        DEBUG = False
+        SECRET_KEY = "benchmark-secret-key"  # noqa: S105
+        JWT_SECRET_KEY = "benchmark-jwt-secret-key-of-32-bytes"  # noqa: S105
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        BCRYPT_LOG_ROUNDS = 4
+        SQLALCHEMY_ECHO = False
+        DEBUG_TB_ENABLED = False
+        DEBUG_TB_INTERCEPT_REDIRECTS = False
+        API_TITLE = "Benchmark Store Management API"
+        API_VERSION = "benchmark-1.0.0"
+        OPENAPI_VERSION = "3.0.3"
+        CELERY_BROKER_URL = REDIS_URL
+        CELERY_RESULT_BACKEND = REDIS_URL
+        REDIS_URL = REDIS_URL
+        CACHE_TYPE = "SimpleCache"
+
+    return BenchmarkConfig
+
+
+def create_benchmark_app(database_url: str):
+    return create_app(config_obj=benchmark_config(database_url))
+
+
+def summarize_latencies(latencies: list) -> dict:
+    if len(latencies) < 2:  # noqa: PLR2004
+        latency = latencies[0] if latencies else 0.0
+        return {"p50": latency, "p95": latency, "p99": latency}
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {"p50": quantiles[49], "p95": quantiles[94], "p99": quantiles[98]}
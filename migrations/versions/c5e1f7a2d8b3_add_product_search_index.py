@@ -0,0 +1,72 @@
+"""add full-text search index for products
+
+Revision ID: c5e1f7a2d8b3
+Revises: a41c7e5d9b20
+Create Date: 2026-10-18 19:12:44.507316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e1f7a2d8b3'
+down_revision = 'a41c7e5d9b20'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE products_fts USING fts5("
+    "name, description, content='products', content_rowid='id', "
+    "tokenize='porter unicode61 remove_diacritics 2')",
+    "INSERT INTO products_fts(products_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO products_fts(products_fts) VALUES ('rebuild')",
+    "CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER products_fts_update AFTER UPDATE OF name, description "
+    "ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO products_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+)
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER IF EXISTS products_fts_update",
+    "DROP TRIGGER IF EXISTS products_fts_delete",
+    "DROP TRIGGER IF EXISTS products_fts_insert",
+    "DROP TABLE IF EXISTS products_fts",
+)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        op.create_index(
+            'ix_products_search',
+            'products',
+            [
+                sa.text(
+                    "(setweight(to_tsvector('english', name), 'A') || "
+                    "setweight(to_tsvector('english', coalesce(description, '')), 'B'))"
+                ),
+            ],
+            unique=False,
+            postgresql_using='gin',
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        op.drop_index('ix_products_search', table_name='products', postgresql_using='gin')
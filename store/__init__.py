@@ -1,4 +1,5 @@
 from store.events import *  # noqa: F403
 from store.order.models import Item, Order  # noqa: F401
+from store.product import search  # noqa: F401
 from store.product.models import Product  # noqa: F401
 from store.user.models import User  # noqa: F401
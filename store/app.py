@@ -1,15 +1,28 @@
 from flask import Flask
 from flask_smorest import Api
 
-from store import commands, order, product, user
+from store import commands, monitoring, order, product, user
 from store.celery import celery_init_app
 from store.error_handler import store_error_handler
-from store.extensions import bcrypt, cache, db, debug_toolbar, jwt, limiter, migrate
+from store.extensions import (
+    bcrypt,
+    cache,
+    db,
+    debug_toolbar,
+    hybrid_limiter,
+    jwt,
+    migrate,
+    password_hasher,
+    pool_metrics,
+    redis_client,
+)
+from store.json_provider import StoreJSONProvider
 from store.request_logger import request_logging
 
 
 def create_app(config_obj="store.settings"):
     app = Flask(__name__.split(".")[0])
+    app.json = StoreJSONProvider(app)
     app.config.from_object(config_obj)
     register_extensions(app)
     register_commands(app)
@@ -22,16 +35,21 @@ def create_app(config_obj="store.settings"):
 def register_extensions(app):
     bcrypt.init_app(app)
     db.init_app(app)
+    pool_metrics.init_app(app, db)
     debug_toolbar.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
-    limiter.init_app(app)
     cache.init_app(app)
+    redis_client.init_app(app)
+    password_hasher.init_app(app)
+    hybrid_limiter.init_app(app)
     request_logging(app)
 
 
 def register_commands(app):
     app.cli.add_command(commands.create_admin_user)
+    app.cli.add_command(commands.seed)
+    app.cli.add_command(commands.import_products)
 
 
 def register_blueprints(app):
@@ -40,6 +58,7 @@ def register_blueprints(app):
     api.register_blueprint(user.apis.blueprint)
     api.register_blueprint(product.apis.blueprint)
     api.register_blueprint(order.apis.blueprint)
+    api.register_blueprint(monitoring.apis.blueprint)
 
 
 def register_error_handler(app):
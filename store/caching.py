@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from store.db_routing import replica_lag_window, replica_reads
+from store.extensions import cache
+from store.settings import CACHE_STATS_FLUSH_INTERVAL
+
+
+class CacheNamespace:
+    """
+    Group of cache keys that can be invalidated together in O(1).
+
+    Every entry is stored with the generation of the namespace it was
+    computed in, and a lookup reads the current generation and the entry
+    with one MGET; bumping the generation (one atomic INCR) makes all
+    existing entries misses until they are recomputed or expire with their
+    TTL. Hits, misses and invalidations are counted in each worker and added
+    to shared counters in the cache every CACHE_STATS_FLUSH_INTERVAL
+    seconds, so all workers report the same numbers without a write per
+    lookup.
+
+    A read replica may not have caught up with the write behind an
+    invalidation yet, so values read from it within the replica lag window
+    after one are returned but not cached.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.version_key = f"{name}:version"
+        self.invalidated_key = f"{name}:invalidated"
+        self._pending_stats: dict = {}
+        self._flushed_at: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def version(self) -> int:
+        version: int | None = cache.get(self.version_key)
+        if version is None:
+            # Seeded from the clock so that a lost version key never reuses a
+            # generation that still has entries in the cache.
+            seed: int = time.time_ns() // 1000
+            if cache.add(self.version_key, seed, timeout=0):
+                return seed
+            version = cache.get(self.version_key)
+        return version
+
+    def key(self, *parts) -> str:
+        return ":".join((self.name, "entry", *map(str, parts)))
+
+    def get_or_set(self, parts: tuple, factory, timeout: int | None = None):
+        key: str = self.key(*parts)
+        version, invalidated, entry = cache.get_many(
+            self.version_key,
+            self.invalidated_key,
+            key,
+        )
+        if version is None:
+            version = self.version()
+        if entry is not None and entry[0] == version:
+            self.record("hits")
+            return entry[1]
+
+        self.record("misses")
+        reads: int = replica_reads()
+        value = factory()
+        if replica_reads() == reads or invalidated is None:
+            cache.set(key, (version, value), timeout=timeout)
+        return value
+
+    def invalidate(self) -> None:
+        self.version()  # make sure the counter exists before incrementing it
+        cache.cache.inc(self.version_key)
+        cache.set(self.invalidated_key, 1, timeout=replica_lag_window())
+        self.record("invalidations")
+
+    def record(self, counter: str) -> None:
+        interval: float = current_app.config.get(
+            "CACHE_STATS_FLUSH_INTERVAL",
+            CACHE_STATS_FLUSH_INTERVAL,
+        )
+        with self._lock:
+            self._pending_stats[counter] = self._pending_stats.get(counter, 0) + 1
+            if time.monotonic() - self._flushed_at < interval:
+                return
+        self.flush_stats()
+
+    def flush_stats(self) -> None:
+        with self._lock:
+            pending, self._pending_stats = self._pending_stats, {}
+            self._flushed_at = time.monotonic()
+        for counter, count in pending.items():
+            cache.cache.inc(f"{self.name}:stats:{counter}", count)
+
+    def stats(self) -> dict:
+        self.flush_stats()
+        hits, misses, invalidations = cache.get_many(
+            f"{self.name}:stats:hits",
+            f"{self.name}:stats:misses",
+            f"{self.name}:stats:invalidations",
+        )
+        hits, misses = hits or 0, misses or 0
+        lookups: int = hits + misses
+        return {
+            "version": self.version(),
+            "hits": hits,
+            "misses": misses,
+            "invalidations": invalidations or 0,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        }
+
+
+class TTLCache:
+    """
+    Small in-process cache whose entries expire after ``ttl`` seconds. The
+    least recently used entry is dropped once ``maxsize`` is reached.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key, factory):
+        now: float = time.monotonic()
+        with self._lock:
+            entry: tuple | None = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        value = factory()
+        if value is not None:
+            with self._lock:
+                self._entries[key] = (now + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
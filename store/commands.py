@@ -1,8 +1,19 @@
 from getpass import getpass
+from pathlib import Path
 
 import click
+from flask import current_app
+from sqlalchemy import select
 
 from store.extensions import db
+from store.hashing import hash_password
+from store.order.reservations import stock_reservations
+from store.product.cache import product_cache
+from store.product.imports import ProductImporter, import_format, read_records
+from store.product.models import Product
+from store.product.services import catalog_cache
+from store.seeding import Seeder
+from store.settings import PRODUCT_IMPORT_CHUNK_SIZE
 from store.user.models import User
 from store.validators import validate_email_format
 
@@ -28,3 +39,91 @@ def create_admin_user() -> None:
     db.session.add(admin_user)
     db.session.commit()
     print("admin user created successfully!")  # noqa: T201
+
+
+@click.command()
+@click.option("--users", default=1_000, show_default=True)
+@click.option("--products", default=1_000, show_default=True)
+@click.option("--orders", default=10_000, show_default=True)
+@click.option("--admins", default=1, show_default=True, help="first N users are admins")
+@click.option("--max-items", default=3, show_default=True, help="items per order")
+@click.option("--password", default="password", show_default=True)
+@click.option("--seed", "random_seed", default=42, show_default=True)
+@click.option("--chunk-size", default=10_000, show_default=True)
+@click.option("--reset", is_flag=True, help="drop and recreate all tables first")
+def seed(  # noqa: PLR0913
+    users: int,
+    products: int,
+    orders: int,
+    admins: int,
+    max_items: int,
+    password: str,
+    random_seed: int,
+    chunk_size: int,
+    reset: bool,  # noqa: FBT001
+) -> None:
+    """Fill the database with generated users, products and orders."""
+    if orders and not (users > admins and products):
+        msg = "Orders need at least one non-admin user and one product to refer to."
+        raise click.UsageError(msg)
+    if reset:
+        forget_cached_rows(chunk_size)
+        db.drop_all()
+        db.create_all()
+
+    # Every seeded user shares one hash, at the cost logins check against.
+    rounds: int = current_app.config["BCRYPT_LOG_ROUNDS"]
+    password_hash: bytes = hash_password(password, rounds)
+    seeder = Seeder(
+        db.session.connection(),
+        password_hash,
+        seed=random_seed,
+        chunk_size=chunk_size,
+        max_items=max_items,
+    )
+    counts: dict = seeder.seed(users, products, orders, admins=admins)
+    db.session.commit()
+
+    seconds: float = counts.pop("seconds")
+    rows: int = sum(counts.values())
+    print(  # noqa: T201
+        ", ".join(f"{count} {table}" for table, count in counts.items())
+        + f" seeded in {seconds}s ({rows / max(seconds, 0.001) * 60:,.0f} rows/min).",
+    )
+    print(f"Users log in as user<id>@example.com with password {password!r}.")  # noqa: T201
+
+
+def forget_cached_rows(chunk_size: int) -> None:
+    """Drop what Redis keeps of the products and orders about to be deleted."""
+    product_ids: list = db.session.scalars(select(Product.id)).all()
+    for start in range(0, len(product_ids), chunk_size):
+        product_cache.evict(product_ids[start : start + chunk_size])
+    catalog_cache.invalidate()
+    stock_reservations.clear()
+    # End the read transaction, whose locks would block dropping the tables.
+    db.session.rollback()
+
+
+@click.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(["csv", "jsonl"]),
+    help="defaults to the file suffix",
+)
+@click.option("--chunk-size", default=PRODUCT_IMPORT_CHUNK_SIZE, show_default=True)
+def import_products(path: Path, file_format: str | None, chunk_size: int) -> None:
+    """Upsert products by name from a CSV or JSON Lines file."""
+    file_format = import_format(file_format or "", path.suffix.lower())
+    if file_format is None:
+        msg = "Can't tell the format from the file suffix, pass --format."
+        raise click.UsageError(msg)
+
+    with path.open("rb") as stream:
+        report: dict = ProductImporter(None, chunk_size=chunk_size).run(
+            read_records(stream, file_format),
+        )
+    for error in report.pop("errors"):
+        print(f"line {error['line']}: {error['errors']}")  # noqa: T201
+    print(", ".join(f"{count} {name}" for name, count in report.items()) + ".")  # noqa: T201
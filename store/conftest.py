@@ -1,10 +1,17 @@
+import os
+import re
+
+import fakeredis
 import pytest
 from flask_jwt_extended import create_access_token
+from sqlalchemy import event
 
 from store.app import create_app
 from store.extensions import db as _db
+from store.extensions import hybrid_limiter, redis_client
 from store.factories import OrderFactory, OrderItemFactory, ProductFactory, UserFactory
 from store.settings import REDIS_URL
+from store.user.identity import identity_claims, user_cache
 
 
 class TestingConfig:
@@ -15,6 +22,8 @@ class TestingConfig:
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASHER_WORKERS = 0
+    RATE_LIMIT_FLUSH_INTERVAL = 0
     SQLALCHEMY_ECHO = False
     DEBUG_TB_ENABLED = False
     DEBUG_TB_INTERCEPT_REDIRECTS = False
@@ -23,6 +32,10 @@ class TestingConfig:
     OPENAPI_VERSION = "3.0.3"
     CELERY_BROKER_URL = REDIS_URL
     CELERY_RESULT_BACKEND = REDIS_URL
+    REDIS_URL = REDIS_URL
+    CACHE_TYPE = "SimpleCache"
+    CACHE_STATS_FLUSH_INTERVAL = 0
+    REQUEST_LOG_FILE = os.devnull
 
 
 @pytest.fixture
@@ -47,6 +60,70 @@ def db(app):
     _db.drop_all()
 
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    hybrid_limiter.reset()
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(app):
+    redis_client.client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+    yield redis_client.client
+    redis_client.client.close()
+
+
+class QueryPlanRecorder:
+    """
+    Records the statements run against the test database and reports the
+    ones SQLite answers with a full table scan.
+    """
+
+    SCAN = re.compile(r"^SCAN (\w+)$")
+    WHERE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+
+    def __init__(self, db):
+        self.db = db
+        self.statements: list = []
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):  # noqa: PLR0913
+        if executemany or not statement.lstrip().upper().startswith(
+            ("SELECT", "UPDATE", "DELETE"),
+        ):
+            return
+        self.statements.append((statement, parameters))
+
+    def table_scans(self) -> list:
+        scans: list = []
+        connection = self.db.session.connection()
+        for statement, parameters in self.statements:
+            # Unfiltered reads (plain pages, counts) are expected to scan.
+            if not self.WHERE.search(statement):
+                continue
+            plan = connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}",
+                parameters,
+            ).all()
+            scans.extend(
+                (match.group(1), statement)
+                for row in plan
+                if (match := self.SCAN.match(row[-1]))
+            )
+        return scans
+
+
+@pytest.fixture
+def query_plans(db):
+    recorder = QueryPlanRecorder(db)
+    event.listen(db.engine, "before_cursor_execute", recorder.record)
+    yield recorder
+    event.remove(db.engine, "before_cursor_execute", recorder.record)
+
+
 @pytest.fixture
 def user_store(db):
     user = UserFactory(password="123")  # noqa: S106
@@ -66,7 +143,10 @@ def admin_user(db):
 @pytest.fixture
 def auth_headers():
     def _get_access_token(user):
-        access_token = create_access_token(identity=user.email)
+        access_token = create_access_token(
+            identity=user.email,
+            additional_claims=identity_claims(user),
+        )
         return {
             "Authorization": f"Bearer {access_token}",
         }
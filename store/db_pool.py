@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from flask import Flask, has_request_context, request
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+NO_ROUTE = "(no request)"
+
+
+@dataclass
+class TimingStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that also times how long checkouts wait for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = TimingStats()
+        self.checkout_timeouts: int = 0
+        self.stats_lock = threading.Lock()
+
+    def _do_get(self):
+        start: float = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self.stats_lock:
+                self.checkout_timeouts += 1
+            raise
+        finally:
+            waited: float = time.perf_counter() - start
+            with self.stats_lock:
+                self.checkout_wait.add(waited)
+
+
+class PoolMetrics:
+    """
+    Per-process view of the engine pools: how many connections are checked
+    out or in overflow, how long checkouts waited, and how long each route
+    held its connections.
+    """
+
+    def __init__(self):
+        self.holds: dict = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask, db: SQLAlchemy) -> None:
+        with app.app_context():
+            for bind_key, engine in db.engines.items():
+                event.listen(engine.pool, "checkout", self.on_checkout)
+                event.listen(engine.pool, "checkin", self.checkin_listener(bind_key))
+        app.extensions["pool_metrics"] = self
+
+    def on_checkout(self, dbapi_connection, record, proxy) -> None:
+        record.info["checked_out_at"] = time.perf_counter()
+        record.info["route"] = (
+            request.url_rule.rule
+            if has_request_context() and request.url_rule
+            else NO_ROUTE
+        )
+
+    def checkin_listener(self, bind_key: str | None):
+        def on_checkin(dbapi_connection, record) -> None:
+            checked_out_at: float | None = record.info.pop("checked_out_at", None)
+            if checked_out_at is None:
+                return
+            held: float = time.perf_counter() - checked_out_at
+            route: str = record.info.pop("route", NO_ROUTE)
+            with self._lock:
+                self.holds.setdefault((bind_key, route), TimingStats()).add(held)
+
+        return on_checkin
+
+    def stats(self, engines: dict) -> dict:
+        return {
+            "pid": os.getpid(),
+            "engines": {
+                bind_key or "default": self.engine_stats(bind_key, engine)
+                for bind_key, engine in engines.items()
+            },
+        }
+
+    def engine_stats(self, bind_key: str | None, engine: Engine) -> dict:
+        pool = engine.pool
+        data: dict = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                timeout=pool.timeout(),
+            )
+        if isinstance(pool, TimedQueuePool):
+            with pool.stats_lock:
+                data.update(
+                    checkout_wait=pool.checkout_wait.as_dict(),
+                    checkout_timeouts=pool.checkout_timeouts,
+                )
+        with self._lock:
+            data["hold_time_by_route"] = {
+                route: timing.as_dict()
+                for (key, route), timing in sorted(
+                    self.holds.items(),
+                    key=lambda item: item[0][1],
+                )
+                if key == bind_key
+            }
+        return data
+
+    def reset(self) -> None:
+        with self._lock:
+            self.holds.clear()
@@ -0,0 +1,161 @@
+import inspect
+import logging
+import math
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from store.settings import REPLICA_HEALTH_CHECK_INTERVAL, REPLICA_MAX_LAG
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND_KEY = "replica"
+
+
+def read_only(func):
+    """
+    Mark a service method as safe to answer from the read replica. Statements
+    it runs go to the replica unless the current request already wrote to
+    the primary or the replica is unhealthy. Generators, like the ones
+    streamed by exports, are routed for as long as they are iterated.
+    """
+
+    if inspect.isgeneratorfunction(func):
+
+        @wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            previous: bool = g.get("db_read_only", False)
+            g.db_read_only = True
+            try:
+                yield from func(*args, **kwargs)
+            finally:
+                g.db_read_only = previous
+
+        return generator_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        previous: bool = g.get("db_read_only", False)
+        g.db_read_only = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            g.db_read_only = previous
+
+    return wrapper
+
+
+def replica_reads() -> int:
+    """How many times the current request was routed to the replica so far."""
+    return g.get("db_replica_reads", 0) if has_app_context() else 0
+
+
+def replica_lag_window() -> int:
+    """
+    Seconds a write committed on the primary may still be missing from a
+    replica deemed healthy: the lag it is allowed, plus the time until its
+    health is checked again.
+    """
+    return math.ceil(
+        current_app.config.get("REPLICA_MAX_LAG", REPLICA_MAX_LAG)
+        + current_app.config.get(
+            "REPLICA_HEALTH_CHECK_INTERVAL",
+            REPLICA_HEALTH_CHECK_INTERVAL,
+        ),
+    )
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.use_replica(mapper, clause):
+            g.db_replica_reads = replica_reads() + 1
+            return self._db.engines[REPLICA_BIND_KEY]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def use_replica(self, mapper, clause) -> bool:
+        if not has_app_context() or REPLICA_BIND_KEY not in self._db.engines:
+            return False
+        if self.is_write(mapper, clause):
+            # Reads later in the request must see this write.
+            g.db_primary_pinned = True
+            return False
+        if not g.get("db_read_only") or g.get("db_primary_pinned"):
+            return False
+        return replica_health.is_healthy(self._db.engines[REPLICA_BIND_KEY])
+
+    def is_write(self, mapper, clause) -> bool:
+        if self._flushing:
+            return True
+        if clause is None:
+            # session.connection() callers run their own statements on it.
+            return mapper is None
+        return bool(
+            getattr(clause, "is_dml", False)
+            or getattr(clause, "_for_update_arg", None) is not None,
+        )
+
+
+class ReplicaHealth:
+    """Per-process view of the replica's health, refreshed at most every few seconds."""
+
+    def __init__(self):
+        self.healthy: bool = False
+        self.checked_at: float = float("-inf")
+        self._lock = threading.Lock()
+
+    def is_healthy(self, engine) -> bool:
+        interval: float = current_app.config.get(
+            "REPLICA_HEALTH_CHECK_INTERVAL",
+            REPLICA_HEALTH_CHECK_INTERVAL,
+        )
+        if time.monotonic() - self.checked_at < interval:
+            return self.healthy
+        with self._lock:
+            if time.monotonic() - self.checked_at >= interval:
+                self.healthy = self.check(
+                    engine,
+                    current_app.config.get("REPLICA_MAX_LAG", REPLICA_MAX_LAG),
+                )
+                self.checked_at = time.monotonic()
+        return self.healthy
+
+    def check(self, engine, max_lag: float) -> bool:
+        try:
+            with engine.connect() as connection:
+                lag: float | None = replication_lag(connection)
+        except SQLAlchemyError:
+            logger.warning("Read replica is unreachable, reading from primary.")
+            return False
+        if lag is not None and lag > max_lag:
+            logger.warning("Read replica is %.1fs behind, reading from primary.", lag)
+            return False
+        return True
+
+    def reset(self) -> None:
+        self.healthy = False
+        self.checked_at = float("-inf")
+
+
+def replication_lag(connection: Connection) -> float | None:
+    """Seconds the replica is behind, when the database can tell."""
+    if connection.dialect.name == "postgresql":
+        return connection.execute(
+            # An idle primary ships no WAL, so the replay timestamp only
+            # counts as lag while received WAL is still waiting for replay.
+            text(
+                "SELECT CASE WHEN NOT pg_is_in_recovery() "
+                "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) "
+                "END",
+            ),
+        ).scalar()
+    connection.execute(text("SELECT 1"))
+    return None
+
+
+replica_health = ReplicaHealth()
@@ -1,9 +1,20 @@
-from sqlalchemy import event, inspect
+from flask import current_app
+from sqlalchemy import Connection, case, event, func, inspect, select, update
+from sqlalchemy.orm import Session, object_session
 
 from store.enums import OrderStatusEnum
-from store.extensions import db
 from store.order.models import Item, Order
 from store.product.models import Product
+from store.settings import PRICE_PROPAGATION_MODE
+
+# Session.info key holding the products to reprice once the session commits.
+DEFERRED_REPRICE_KEY = "deferred_reprice_product_ids"
+
+
+@event.listens_for(Product, "before_update")
+def bump_price_version_on_price_change(mapper, connection, target):
+    if inspect(target).attrs.price.history.has_changes():
+        target.price_version = (target.price_version or 0) + 1
 
 
 @event.listens_for(Product, "after_update")
@@ -18,23 +29,89 @@ def update_items_and_order_on_product_update(mapper, connection, target):
     if not history_product_price.has_changes():
         return
 
-    pending_order_items = (
-        Item.query.join(Order)
-        .filter(
-            Item.product_id == target.id,
-            Order.status == OrderStatusEnum.PENDING.name,
-        )
-        .all()
+    propagate_price_change(
+        object_session(target),
+        connection,
+        target.id,
+        target.price,
+        target.price_version,
     )
-    order_ids = [item.order_id for item in pending_order_items]
-    orders = Order.query.filter(Order.id.in_(order_ids)).all()
 
-    for item, order in zip(pending_order_items, orders, strict=False):
-        old_total = item.product_price * item.quantity
-        new_total = target.price * item.quantity
 
-        item.product_price = target.price
-        order.total_price = order.total_price - old_total + new_total
+@event.listens_for(Session, "after_commit")
+def enqueue_deferred_repricing(session):
+    product_ids: set | None = session.info.pop(DEFERRED_REPRICE_KEY, None)
+    if product_ids:
+        from store.tasks import schedule_repricing
+
+        schedule_repricing(product_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_deferred_repricing(session):
+    session.info.pop(DEFERRED_REPRICE_KEY, None)
+
+
+def propagate_price_change(
+    session: Session,
+    connection: Connection,
+    product_id: int,
+    price: float,
+    price_version: int,
+) -> None:
+    """
+    Reprice the pending orders of a product whose price just changed, now
+    or, in deferred mode, once the session commits.
+    """
+    mode: str = current_app.config.get("PRICE_PROPAGATION_MODE", PRICE_PROPAGATION_MODE)
+    if mode == "deferred":
+        session.info.setdefault(DEFERRED_REPRICE_KEY, set()).add(product_id)
+        return
 
-    db.session.bulk_save_objects(pending_order_items)
-    db.session.bulk_save_objects(orders)
+    reprice_pending_orders(connection, product_id, price, price_version)
+
+
+def reprice_pending_orders(
+    connection: Connection,
+    product_id: int,
+    price: float,
+    price_version: int,
+    order_ids: list | None = None,
+) -> None:
+    """
+    Move the pending items of the product that are priced at an older
+    version to `price`, recomputing the totals of their orders by aggregate,
+    with one UPDATE each on the given connection. `order_ids` limits the
+    change to a batch of orders.
+    """
+    pending_orders = Order.status == OrderStatusEnum.PENDING.name
+    if order_ids is not None:
+        pending_orders = pending_orders & Order.id.in_(order_ids)
+
+    # Orders go first: which of them hold stale items is only known before
+    # the items are moved to the new version.
+    stale_order_ids = select(Item.order_id).where(
+        Item.product_id == product_id,
+        Item.price_version < price_version,
+    )
+    item_price = case((Item.product_id == product_id, price), else_=Item.product_price)
+    order_total = (
+        select(func.sum(item_price * Item.quantity))
+        .where(Item.order_id == Order.id)
+        .scalar_subquery()
+    )
+    connection.execute(
+        update(Order)
+        .where(pending_orders, Order.id.in_(stale_order_ids))
+        .values(total_price=order_total),
+    )
+
+    connection.execute(
+        update(Item)
+        .where(
+            Item.product_id == product_id,
+            Item.price_version < price_version,
+            Item.order_id.in_(select(Order.id).where(pending_orders)),
+        )
+        .values(product_price=price, price_version=price_version),
+    )
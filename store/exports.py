@@ -0,0 +1,64 @@
+import csv
+import io
+from collections.abc import Callable, Iterable, Iterator
+
+from flask import Response, current_app, stream_with_context
+from marshmallow import Schema, fields
+from marshmallow.validate import OneOf
+
+EXPORT_MIMETYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class ExportQuerySchema(Schema):
+    format = fields.Str(load_default="ndjson", validate=OneOf(tuple(EXPORT_MIMETYPES)))
+    # Rows created at or after created_from and before created_to.
+    created_from = fields.DateTime()
+    created_to = fields.DateTime()
+
+
+def ndjson_lines(batches: Iterable) -> Iterator[str]:
+    dumps = current_app.json.dumps
+    for batch in batches:
+        yield "".join(f"{dumps(record)}\n" for record in batch)
+
+
+def csv_lines(batches: Iterable, columns: list, rows: Callable) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for batch in batches:
+        for record in batch:
+            writer.writerows(rows(record))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Nothing matched; still send the header.
+        yield buffer.getvalue()
+
+
+def export_response(
+    batches: Iterable,
+    file_format: str,
+    filename: str,
+    columns: list,
+    rows: Callable = lambda record: [record],
+) -> Response:
+    """
+    Stream lists of serialized records as NDJSON, one record per line, or as
+    CSV with ``columns``, where ``rows`` turns one record into its CSV rows.
+    A batch is encoded and sent as soon as it is read, so only one batch is
+    ever held in memory.
+    """
+    lines: Iterator[str] = (
+        ndjson_lines(batches)
+        if file_format == "ndjson"
+        else csv_lines(batches, columns, rows)
+    )
+    return current_app.response_class(
+        stream_with_context(lines),
+        mimetype=EXPORT_MIMETYPES[file_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{file_format}"',
+        },
+    )
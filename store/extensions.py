@@ -7,21 +7,25 @@ from flask_bcrypt import Bcrypt
 from flask_caching import Cache
 from flask_debugtoolbar import DebugToolbarExtension
 from flask_jwt_extended import JWTManager
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
-from store.settings import REDIS_URL
+from store.db_pool import PoolMetrics, TimedQueuePool
+from store.db_routing import RoutingSession
+from store.hashing import PasswordHasher
+from store.rate_limit import HybridRateLimiter
+from store.redis_client import RedisClient
 
 bcrypt = Bcrypt()
-db = SQLAlchemy()
+db = SQLAlchemy(
+    session_options={"class_": RoutingSession},
+    engine_options={"poolclass": TimedQueuePool},
+)
+pool_metrics = PoolMetrics()
 migrate = Migrate()
 debug_toolbar = DebugToolbarExtension()
 jwt = JWTManager()
-limiter = Limiter(
-    key_func=get_remote_address,
-    storage_uri=REDIS_URL,
-    default_limits=[],
-)
 cache = Cache()
+redis_client = RedisClient()
+hybrid_limiter = HybridRateLimiter(redis_client)
+password_hasher = PasswordHasher()
@@ -0,0 +1,93 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http import HTTPStatus
+
+import bcrypt
+from flask import Flask, abort
+
+
+def hash_password(password: str, rounds: int) -> bytes:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds))
+
+
+def check_password(password_hash: bytes, password: str) -> bool:
+    return bcrypt.checkpw(password.encode(), password_hash)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a small process pool so login storms can't pin every web
+    worker. At most ``max_pending`` hashes are queued or running per worker;
+    anything beyond that is shed with 503 instead of waiting.
+
+    With ``workers=0`` hashing runs inline, still behind the same limit.
+    """
+
+    def __init__(self):
+        self.rounds: int = 12
+        self.workers: int = 0
+        self.timeout: float = 10
+        self._slots: threading.BoundedSemaphore = threading.BoundedSemaphore(1)
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_pid: int | None = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask) -> None:
+        self.rounds = app.config["BCRYPT_LOG_ROUNDS"]
+        self.workers = app.config.get("PASSWORD_HASHER_WORKERS", 2)
+        self.timeout = app.config.get("PASSWORD_HASHER_TIMEOUT", 10)
+        self._slots = threading.BoundedSemaphore(
+            app.config.get("PASSWORD_HASHER_MAX_PENDING", 8),
+        )
+        app.extensions["password_hasher"] = self
+
+    def hash(self, password: str) -> bytes:
+        return self.run(hash_password, password, self.rounds)
+
+    def check(self, password_hash: bytes, password: str) -> bool:
+        return self.run(check_password, password_hash, password)
+
+    def needs_rehash(self, password_hash: bytes) -> bool:
+        """True when the stored hash was made with another cost than configured."""
+        # bcrypt hashes look like $2b$<cost>$<salt and hash>
+        return int(password_hash.split(b"$")[2]) != self.rounds
+
+    def run(self, func, *args):
+        slots: threading.BoundedSemaphore = self._slots
+        if not slots.acquire(blocking=False):
+            self.abort_busy()
+        if not self.workers:
+            try:
+                return func(*args)
+            finally:
+                slots.release()
+
+        try:
+            future = self.executor().submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # A job outlives a request that stopped waiting for it, so its slot is
+        # only freed once the pool is done with it.
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self.abort_busy()
+
+    def executor(self) -> ProcessPoolExecutor:
+        # Gunicorn forks after the app is created, so every worker process
+        # needs a pool of its own.
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def abort_busy(self) -> None:
+        abort(
+            HTTPStatus.SERVICE_UNAVAILABLE,
+            description="Too many password checks in progress, try again later.",
+        )
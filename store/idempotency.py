@@ -0,0 +1,132 @@
+import hashlib
+import json
+import time
+from functools import wraps
+from http import HTTPStatus
+
+from flask import Response, abort, make_response, request
+
+from store.extensions import redis_client
+from store.settings import (
+    IDEMPOTENCY_IN_FLIGHT_TTL,
+    IDEMPOTENCY_KEY_TTL,
+    IDEMPOTENCY_WAIT_TIMEOUT,
+)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_PREFIX = "idempotency:"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IN_FLIGHT = "in-flight"
+DONE = "done"
+
+
+def idempotent():
+    """
+    Replay the first response of a request sent with the same Idempotency-Key
+    by the same user instead of running the view again. Place it under
+    jwt_required and above the limiter, so replays don't use up limiter slots.
+
+    Responses are stored in Redis for IDEMPOTENCY_KEY_TTL seconds; server
+    errors and exceptions are not stored, so those requests can be retried.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key: str | None = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return func(*args, **kwargs)
+            if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+                abort(
+                    HTTPStatus.BAD_REQUEST,
+                    description=f"{IDEMPOTENCY_HEADER} is too long.",
+                )
+
+            redis_key: str = idempotency_key(key)
+            fingerprint: str = hashlib.sha256(request.get_data()).hexdigest()
+            record: dict | None = load_record(redis_key)
+            if record is None:
+                in_flight: dict = {"state": IN_FLIGHT, "fingerprint": fingerprint}
+                if redis_client.set(
+                    redis_key,
+                    json.dumps(in_flight),
+                    nx=True,
+                    ex=IDEMPOTENCY_IN_FLIGHT_TTL,
+                ):
+                    return run_and_store(redis_key, fingerprint, func, args, kwargs)
+                record = load_record(redis_key)
+
+            if record and record["state"] == IN_FLIGHT:
+                record = wait_for_response(redis_key)
+            if record is None:
+                # The first request failed and dropped its marker; start over.
+                return wrapper(*args, **kwargs)
+            if record["fingerprint"] != fingerprint:
+                abort(
+                    HTTPStatus.UNPROCESSABLE_ENTITY,
+                    description=f"{IDEMPOTENCY_HEADER} was already used with "
+                    "a different request body.",
+                )
+            return replay(record)
+
+        return wrapper
+
+    return decorator
+
+
+def idempotency_key(key: str) -> str:
+    from store.user.identity import current_user_id
+
+    return f"{IDEMPOTENCY_PREFIX}{request.endpoint}:{current_user_id()}:{key}"
+
+
+def load_record(redis_key: str) -> dict | None:
+    record: bytes | None = redis_client.get(redis_key)
+    return json.loads(record) if record else None
+
+
+def run_and_store(redis_key: str, fingerprint: str, func, args, kwargs) -> Response:
+    try:
+        response: Response = make_response(func(*args, **kwargs))
+    except Exception:
+        redis_client.delete(redis_key)
+        raise
+
+    if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        redis_client.delete(redis_key)
+        return response
+    record: dict = {
+        "state": DONE,
+        "fingerprint": fingerprint,
+        "status": response.status_code,
+        "content_type": response.content_type,
+        "body": response.get_data(as_text=True),
+    }
+    redis_client.set(redis_key, json.dumps(record), ex=IDEMPOTENCY_KEY_TTL)
+    return response
+
+
+def wait_for_response(redis_key: str) -> dict | None:
+    """Poll until the request holding the marker stores its response."""
+    deadline: float = time.monotonic() + IDEMPOTENCY_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        record: dict | None = load_record(redis_key)
+        if record is None or record["state"] == DONE:
+            return record
+    abort(
+        HTTPStatus.CONFLICT,
+        description=f"A request with this {IDEMPOTENCY_HEADER} is still "
+        "in progress, retry later.",
+    )
+    return None
+
+
+def replay(record: dict) -> Response:
+    response = Response(
+        record["body"],
+        status=record["status"],
+        content_type=record["content_type"],
+    )
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
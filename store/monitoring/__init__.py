@@ -0,0 +1 @@
+from . import apis  # noqa: F401
@@ -0,0 +1,21 @@
+from http import HTTPStatus
+
+from flask import jsonify
+from flask.views import MethodView
+
+from store.extensions import db, pool_metrics
+from store.permissions import admin_required
+from store.routes import create_blueprint_api
+
+blueprint = create_blueprint_api(
+    name="monitoring",
+    url_prefix="monitoring",
+    version="v1",
+)
+
+
+@blueprint.route("/db-pool")
+class DatabasePoolStats(MethodView):
+    @admin_required()
+    def get(self, *args, **kwargs):
+        return jsonify(pool_metrics.stats(db.engines)), HTTPStatus.OK
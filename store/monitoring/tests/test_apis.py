@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+from store.app import create_app
+from store.conftest import TestingConfig
+from store.extensions import db as _db
+from store.extensions import pool_metrics
+
+
+@pytest.fixture
+def app(tmp_path):
+    class FileDatabaseConfig(TestingConfig):
+        # In-memory SQLite shares one static connection; a file gets a pool.
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'store.db'}"
+
+    app = create_app(config_obj=FileDatabaseConfig)
+    pool_metrics.reset()
+    with app.app_context():
+        yield app
+        _db.engine.dispose()
+
+
+class TestMonitoringApi:
+    def test_db_pool_stats(self, client, db, admin_user, auth_headers, product):
+        headers = auth_headers(admin_user)
+        product_url = f"/api/v1/products/{product.id}"
+        # Test requests share the test's app context and session, so end the
+        # session around the request the way a real request's teardown would.
+        db.session.remove()
+        client.get(product_url)
+        db.session.remove()
+        response = client.get("/api/v1/monitoring/db-pool", headers=headers)
+        stats = response.get_json()["engines"]["default"]
+
+        assert response.status_code == HTTPStatus.OK
+        assert stats["pool"] == "TimedQueuePool"
+        assert stats["checked_out"] == 0
+        assert stats["overflow"] == 0
+        assert stats["checkout_wait"]["count"] >= 1
+        assert stats["checkout_timeouts"] == 0
+        assert (
+            stats["hold_time_by_route"]["/api/v1/products/<int:product_id>"]["count"]
+            == 1
+        )
+
+    def test_db_pool_stats_requires_admin(self, client, user_store, auth_headers):
+        response = client.get(
+            "/api/v1/monitoring/db-pool",
+            headers=auth_headers(user_store),
+        )
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
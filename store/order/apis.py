@@ -1,14 +1,22 @@
 from http import HTTPStatus
 
-from flask import jsonify, request
+from flask import jsonify
 from flask.views import MethodView
 from flask_jwt_extended import jwt_required
 
 from store.enums import OrderStatusEnum
-from store.extensions import limiter
-from store.order.schemas import OrderSchema
+from store.extensions import hybrid_limiter
+from store.idempotency import idempotent
+from store.order.schemas import (
+    BatchOrderSchema,
+    OrderExportQuerySchema,
+    OrderListQuerySchema,
+    OrderSchema,
+)
 from store.order.services import OrderService
+from store.permissions import admin_required
 from store.routes import create_blueprint_api
+from store.settings import ORDER_BATCH_RATE_LIMIT
 
 blueprint = create_blueprint_api(name="order", url_prefix="orders", version="v1")
 order_service = OrderService()
@@ -19,19 +27,39 @@ class AddOrder(MethodView):  # Real Project this section session or temp memory.
     @blueprint.arguments(OrderSchema)
     @blueprint.response(HTTPStatus.CREATED, OrderSchema)
     @jwt_required()
-    @limiter.limit("2 per day")
+    @idempotent()
+    @hybrid_limiter.limit("2 per day")
     def post(self, data: dict):
         return jsonify(order_service.add_order(data)), HTTPStatus.CREATED
 
 
+@blueprint.route("/batch")
+class AddBatchOrders(MethodView):
+    @blueprint.arguments(BatchOrderSchema)
+    @jwt_required()
+    @hybrid_limiter.limit(
+        ORDER_BATCH_RATE_LIMIT,
+        cost=lambda view, data: len(data["orders"]),
+    )
+    def post(self, data: dict):
+        return jsonify(order_service.add_batch_orders(data)), HTTPStatus.MULTI_STATUS
+
+
 @blueprint.route("/")
 class GetListOrder(MethodView):
+    @blueprint.arguments(OrderListQuerySchema, location="query")
     @blueprint.response(HTTPStatus.OK, OrderSchema)
-    @blueprint.paginate()
     @jwt_required()
-    def get(self, pagination_parameters):
-        page_number: int = int(request.args.get("page", 1))
-        return jsonify(order_service.list_products(page_number)), HTTPStatus.OK
+    def get(self, args: dict):
+        return jsonify(order_service.list_orders(args)), HTTPStatus.OK
+
+
+@blueprint.route("/export")
+class ExportOrders(MethodView):
+    @blueprint.arguments(OrderExportQuerySchema, location="query")
+    @admin_required()
+    def get(self, args: dict, user):
+        return order_service.export_orders(args)
 
 
 @blueprint.route("/tracking/<string:tracking_code>")
@@ -6,13 +6,17 @@ from store.extensions import db
 
 class Order(db.Model):
     __tablename__ = "orders"
+    __table_args__ = (
+        db.Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+        db.Index("ix_orders_status_created_at", "status", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     status = db.Column(db.String(50), default=OrderStatusEnum.PENDING.name)
     created_at = db.Column(db.DateTime, default=datetime.datetime.now)
     total_price = db.Column(db.Float, nullable=False)
-    tracking_code = db.Column(db.String(40), nullable=False)
+    tracking_code = db.Column(db.String(40), nullable=False, index=True)
     items = db.relationship(
         "Item",
         foreign_keys="[Item.order_id]",
@@ -29,10 +33,21 @@ class Item(db.Model):
     __tablename__ = "items"
 
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), nullable=False)
+    order_id = db.Column(
+        db.Integer,
+        db.ForeignKey("orders.id"),
+        nullable=False,
+        index=True,
+    )
+    product_id = db.Column(
+        db.Integer,
+        db.ForeignKey("products.id"),
+        nullable=False,
+        index=True,
+    )
     quantity = db.Column(db.Integer, default=1)
     product_price = db.Column(db.Float, nullable=False)
+    price_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     def __repr__(self):
         return f"<Item(order_id={self.order_id}, product_id={self.product_id})>"
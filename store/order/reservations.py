@@ -0,0 +1,259 @@
+from collections import defaultdict
+
+from marshmallow import ValidationError
+from sqlalchemy import func, select
+
+from store.enums import OrderStatusEnum
+from store.extensions import db, redis_client
+from store.order.models import Item, Order
+from store.product.models import Product
+from store.settings import STOCK_COUNTER_TTL
+
+# Every stock key shares the {stock} hash tag, so on Redis Cluster all of them
+# live in one slot: the scripts below also update the counters of the
+# products an order holds, which are only known from its reservation hash
+# and so can't be passed in KEYS.
+STOCK_COUNTER_PREFIX = "{stock}:product:"
+RESERVATION_PREFIX = "{stock}:reservation:"
+
+# KEYS[1]: reservation hash of the order (product_id -> quantity),
+# KEYS[2..]: stock counters of the products to reserve
+# ARGV[1]: reservation ttl (the counter ttl), ARGV[2]: stock counter prefix,
+# ARGV[3..]: product_id, quantity pairs, in the order of KEYS[2..]
+# Replaces any reservation the order already holds. Nothing is written unless
+# every product has enough available stock.
+RESERVE_SCRIPT = """
+local reservation_key = KEYS[1]
+local prefix = ARGV[2]
+local held = {}
+local old = redis.call('HGETALL', reservation_key)
+for i = 1, #old, 2 do held[old[i]] = tonumber(old[i + 1]) end
+
+local missing = {}
+for k = 2, #KEYS do
+  if redis.call('EXISTS', KEYS[k]) == 0 then
+    table.insert(missing, ARGV[2 * k - 1])
+  end
+end
+if #missing > 0 then
+  table.insert(missing, 1, 'missing')
+  return missing
+end
+
+for k = 2, #KEYS do
+  local product_id = ARGV[2 * k - 1]
+  local available = tonumber(redis.call('GET', KEYS[k]))
+  available = available + (held[product_id] or 0)
+  if available < tonumber(ARGV[2 * k]) then
+    return {'short', product_id, tostring(available)}
+  end
+end
+
+for product_id, quantity in pairs(held) do
+  if redis.call('EXISTS', prefix .. product_id) == 1 then
+    redis.call('INCRBY', prefix .. product_id, quantity)
+  end
+end
+redis.call('DEL', reservation_key)
+for k = 2, #KEYS do
+  redis.call('DECRBY', KEYS[k], ARGV[2 * k])
+  redis.call('HSET', reservation_key, ARGV[2 * k - 1], ARGV[2 * k])
+end
+redis.call('EXPIRE', reservation_key, ARGV[1])
+return {'ok'}
+"""
+
+# KEYS[1]: reservation hash, ARGV[1]: stock counter prefix
+RELEASE_SCRIPT = """
+local held = redis.call('HGETALL', KEYS[1])
+for i = 1, #held, 2 do
+  if redis.call('EXISTS', ARGV[1] .. held[i]) == 1 then
+    redis.call('INCRBY', ARGV[1] .. held[i], held[i + 1])
+  end
+end
+return redis.call('DEL', KEYS[1])
+"""
+
+# KEYS: stock counters, ARGV: the quantity to add back to each of them
+RESTOCK_SCRIPT = """
+for k = 1, #KEYS do
+  if redis.call('EXISTS', KEYS[k]) == 1 then
+    redis.call('INCRBY', KEYS[k], ARGV[k])
+  end
+end
+return 1
+"""
+
+
+class StockReservations:
+    """
+    Redis ledger of stock held by pending orders.
+
+    Each product has an "available" counter (inventory minus the quantities
+    held by pending orders) that is seeded lazily from the database, and each
+    pending order has a hash with the quantities it holds. Reserving an order
+    is a single Lua script, so hot products don't need database row locks
+    until the order is confirmed.
+    """
+
+    def reserve(self, order_id: int, items: list) -> None:
+        error: str | None = self.reserve_many({order_id: items}).get(order_id)
+        if error:
+            raise ValidationError(error, field_name="items")
+
+    def reserve_many(self, orders: dict) -> dict:
+        """
+        Reserve the items of every order ({order_id: items}) in one round trip.
+        Returns an error message for each order that couldn't be reserved.
+        """
+        quantities: dict = {
+            order_id: self.group_quantities(items) for order_id, items in orders.items()
+        }
+        results: dict = self.run_reserve_scripts(quantities)
+
+        missing_product_ids: set = {
+            int(product_id)
+            for result in results.values()
+            if result[0] == b"missing"
+            for product_id in result[1:]
+        }
+        if missing_product_ids:
+            self.seed_counters(missing_product_ids, exclude_order_ids=list(orders))
+            results.update(
+                self.run_reserve_scripts(
+                    {
+                        order_id: quantities[order_id]
+                        for order_id, result in results.items()
+                        if result[0] == b"missing"
+                    },
+                ),
+            )
+
+        errors: dict = {}
+        for order_id, result in results.items():
+            if result[0] == b"short":
+                errors[order_id] = (
+                    f"Product {int(result[1])} has insufficient stock: "
+                    f"{max(int(result[2]), 0)} available."
+                )
+            elif result[0] != b"ok":
+                errors[order_id] = "Stock is being updated, try again."
+        return errors
+
+    def run_reserve_scripts(self, quantities: dict) -> dict:
+        reserve_script = redis_client.register_script(RESERVE_SCRIPT)
+        pipeline = redis_client.pipeline(transaction=False)
+        for order_id, order_quantities in quantities.items():
+            keys: list = [self.reservation_key(order_id)]
+            args: list = [STOCK_COUNTER_TTL, STOCK_COUNTER_PREFIX]
+            for product_id, quantity in order_quantities.items():
+                keys.append(self.counter_key(product_id))
+                args.extend((product_id, quantity))
+            reserve_script(keys=keys, args=args, client=pipeline)
+        return dict(zip(quantities, pipeline.execute(), strict=True))
+
+    def seed_counters(self, product_ids: set, exclude_order_ids: list) -> None:
+        """
+        Initialise missing counters with the inventory not held by other
+        pending orders. Existing counters are never overwritten. The holds of
+        those orders are kept as long as the new counters, so their stock is
+        given back to the counters that subtracted it.
+        """
+        held_quantity = (
+            select(func.sum(Item.quantity))
+            .join(Order, Order.id == Item.order_id)
+            .where(
+                Item.product_id == Product.id,
+                Order.status == OrderStatusEnum.PENDING.name,
+                Order.id.not_in(exclude_order_ids),
+            )
+            .scalar_subquery()
+        )
+        available = Product.inventory - func.coalesce(held_quantity, 0)
+        rows = db.session.execute(
+            select(Product.id, available).where(Product.id.in_(product_ids)),
+        ).all()
+        holding_order_ids = db.session.scalars(
+            select(Item.order_id)
+            .join(Order, Order.id == Item.order_id)
+            .where(
+                Item.product_id.in_(product_ids),
+                Order.status == OrderStatusEnum.PENDING.name,
+                Order.id.not_in(exclude_order_ids),
+            )
+            .distinct(),
+        ).all()
+
+        pipeline = redis_client.pipeline(transaction=False)
+        for product_id, available in rows:
+            pipeline.set(
+                self.counter_key(product_id),
+                available,
+                nx=True,
+                ex=STOCK_COUNTER_TTL,
+            )
+        for order_id in holding_order_ids:
+            pipeline.expire(self.reservation_key(order_id), STOCK_COUNTER_TTL)
+        pipeline.execute()
+
+    def release(self, order_id: int) -> None:
+        self.release_many([order_id])
+
+    def release_many(self, order_ids: list) -> None:
+        """Give the stock held by the orders back to the available counters."""
+        release_script = redis_client.register_script(RELEASE_SCRIPT)
+        pipeline = redis_client.pipeline(transaction=False)
+        for order_id in order_ids:
+            release_script(
+                keys=[self.reservation_key(order_id)],
+                args=[STOCK_COUNTER_PREFIX],
+                client=pipeline,
+            )
+        pipeline.execute()
+
+    def confirm(self, order_id: int) -> None:
+        """
+        The confirmed quantities now leave Product.inventory itself, so the
+        available counters already match and only the hold is dropped.
+        """
+        redis_client.delete(self.reservation_key(order_id))
+
+    def restock(self, items: list) -> None:
+        """Add the quantities of a canceled order back to the counters."""
+        quantities: dict = self.group_quantities(items)
+        redis_client.register_script(RESTOCK_SCRIPT)(
+            keys=[self.counter_key(product_id) for product_id in quantities],
+            args=list(quantities.values()),
+        )
+
+    def invalidate(self, product_ids: list) -> None:
+        """Drop counters so they are re-seeded from Product.inventory."""
+        keys: list = [self.counter_key(product_id) for product_id in product_ids]
+        redis_client.delete(*keys)
+
+    def clear(self) -> None:
+        """Drop every counter and hold, once the products and orders are gone."""
+        for prefix in (STOCK_COUNTER_PREFIX, RESERVATION_PREFIX):
+            keys: list = []
+            for key in redis_client.scan_iter(match=f"{prefix}*", count=1000):
+                keys.append(key)
+                if len(keys) == 1000:  # noqa: PLR2004
+                    redis_client.delete(*keys)
+                    keys = []
+            if keys:
+                redis_client.delete(*keys)
+
+    def group_quantities(self, items: list) -> dict:
+        quantities: dict = defaultdict(int)
+        for item in items:
+            quantities[item.get("product_id")] += item.get("quantity")
+        return dict(quantities)
+
+    def counter_key(self, product_id: int) -> str:
+        return f"{STOCK_COUNTER_PREFIX}{product_id}"
+
+    def reservation_key(self, order_id: int) -> str:
+        return f"{RESERVATION_PREFIX}{order_id}"
+
+
+stock_reservations = StockReservations()
@@ -1,12 +1,23 @@
 from marshmallow import Schema, fields
-from marshmallow.validate import Range
+from marshmallow.validate import Length, OneOf, Range
 
+from store.enums import OrderStatusEnum
+from store.exports import ExportQuerySchema
 from store.order.models import Item, Order
+from store.serializers import RowSerializer
+from store.settings import (
+    ORDER_BATCH_MAX_SIZE,
+    ORDER_LIST_MAX_PER_PAGE,
+    ORDER_LIST_PER_PAGE,
+)
 
 
 class AddItemSchema(Schema):
     product_id = fields.Int(required=True)
     quantity = fields.Int(required=True, validate=Range(min=1))
+    # Price version of the product this item is priced at, to compare with
+    # the product's price_version.
+    price_version = fields.Int(dump_only=True)
 
     def create_item(self, data):
         return Item(**data)
@@ -36,3 +47,33 @@ class OrderSchema(Schema):
 
     def create_order(self, data):
         return Order(**data)
+
+
+class BatchOrderSchema(Schema):
+    # Each order is validated on its own by OrderSchema so that one bad order
+    # doesn't reject the whole batch.
+    orders = fields.List(
+        fields.Dict(),
+        required=True,
+        validate=Length(min=1, max=ORDER_BATCH_MAX_SIZE),
+    )
+
+
+class OrderListQuerySchema(Schema):
+    # ?page= keeps the legacy offset pagination, everything else is keyset.
+    page = fields.Int(validate=Range(min=1))
+    cursor = fields.Str()
+    per_page = fields.Int(
+        load_default=ORDER_LIST_PER_PAGE,
+        validate=Range(min=1, max=ORDER_LIST_MAX_PER_PAGE),
+    )
+    include_total = fields.Bool(load_default=False)
+
+
+class OrderExportQuerySchema(ExportQuerySchema):
+    status = fields.Str(validate=OneOf([status.name for status in OrderStatusEnum]))
+
+
+# Read paths select these columns and dump the rows without loading orders.
+order_row_serializer = RowSerializer(OrderSchema(), Order, exclude=("items",))
+item_row_serializer = RowSerializer(AddItemSchema(), Item)
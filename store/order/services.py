@@ -1,19 +1,32 @@
 import uuid
+from collections.abc import Iterator
 from datetime import datetime, timedelta
 from http import HTTPStatus
 
-from flask import abort
-from flask_jwt_extended import get_jwt_identity
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Query, joinedload
+from flask import Response, abort
+from marshmallow import ValidationError
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Query  # noqa: TC002
 
+from store.db_routing import read_only
 from store.enums import OrderStatusEnum
 from store.exceptions import ConflictIntegrityError
+from store.exports import export_response
 from store.extensions import db
 from store.order.models import Item, Order
-from store.order.schemas import OrderSchema
+from store.order.reservations import stock_reservations
+from store.order.schemas import (
+    BatchOrderSchema,
+    OrderSchema,
+    item_row_serializer,
+    order_row_serializer,
+)
+from store.pagination import decode_cursor, encode_cursor
+from store.product.cache import product_cache
 from store.product.models import Product
-from store.user.models import User
+from store.settings import EXPORT_CHUNK_SIZE
+from store.user.identity import current_user_id
 from store.utils import calculate_total_price_products
 
 
@@ -23,25 +36,181 @@ class OrderService:
         valid_data: dict = add_order_schema.load(data)
         map_products: dict = self.get_map_products(
             items=valid_data.get("items"),
-            fields=(Product.id, Product.price, Product.inventory),
+            fields=(
+                Product.id,
+                Product.price,
+                Product.inventory,
+                Product.price_version,
+            ),
             lock=False,
         )
         calculate_total_price_order: float = calculate_total_price_products(
             map_products,
             valid_data.get("items"),
         )
-        user: User = User.query.filter_by(email=get_jwt_identity()).first()
         order: Order = self.create_order(
             add_order_schema,
-            user,
+            current_user_id(),
             calculate_total_price_order,
         )
         db.session.add(order)
         db.session.flush()
         self.create_order_items(order, valid_data.get("items"), map_products)
-        db.session.commit()
+        self.reserve_stock(order.id, valid_data.get("items"))
+        self.commit_reserved_orders([order.id])
         return add_order_schema.dump(order)
 
+    def add_batch_orders(self, data: dict) -> dict:
+        batch_order_schema = BatchOrderSchema()
+        order_schema = OrderSchema()
+        orders_data: list = batch_order_schema.load(data).get("orders")
+        results: list = [None] * len(orders_data)
+
+        valid_orders: list = []
+        for index, order_data in enumerate(orders_data):
+            try:
+                valid_orders.append((index, order_schema.load(order_data)))
+            except ValidationError as error:
+                results[index] = self.failed_batch_result(index, error)
+
+        # One product lookup for the union of all items in the batch.
+        batch_items: list = [
+            item for _, valid_data in valid_orders for item in valid_data["items"]
+        ]
+        map_products: dict = self.get_map_products(
+            items=batch_items,
+            fields=(
+                Product.id,
+                Product.price,
+                Product.inventory,
+                Product.price_version,
+            ),
+            lock=False,
+        )
+        user_id: int = current_user_id()
+        created_at = datetime.now()  # noqa: DTZ005
+
+        new_orders: list = []
+        for index, valid_data in valid_orders:
+            try:
+                total_price: float = calculate_total_price_products(
+                    map_products,
+                    valid_data.get("items"),
+                )
+            except ValidationError as error:
+                results[index] = self.failed_batch_result(index, error)
+                continue
+            new_orders.append(
+                (
+                    index,
+                    {
+                        "user_id": user_id,
+                        "status": OrderStatusEnum.PENDING.name,
+                        "created_at": created_at,
+                        "total_price": total_price,
+                        "tracking_code": str(uuid.uuid4()),
+                    },
+                    valid_data.get("items"),
+                ),
+            )
+
+        if new_orders:
+            self.bulk_create_orders(new_orders, map_products)
+            reservation_errors: dict = stock_reservations.reserve_many(
+                {order_row["id"]: items for _, order_row, items in new_orders},
+            )
+            for index, order_row, _ in new_orders:
+                if error := reservation_errors.get(order_row["id"]):
+                    results[index] = self.failed_batch_result(
+                        index,
+                        ValidationError(error, field_name="items"),
+                    )
+            if reservation_errors:
+                self.bulk_delete_orders(list(reservation_errors))
+                new_orders = [
+                    new_order
+                    for new_order in new_orders
+                    if new_order[1]["id"] not in reservation_errors
+                ]
+            self.commit_reserved_orders(
+                [order_row["id"] for _, order_row, _ in new_orders],
+            )
+
+        for index, order_row, items in new_orders:
+            results[index] = {
+                "index": index,
+                "status": "created",
+                "order": order_schema.dump({**order_row, "items": items}),
+            }
+
+        return {
+            "created": len(new_orders),
+            "failed": len(orders_data) - len(new_orders),
+            "results": results,
+        }
+
+    def bulk_create_orders(self, new_orders: list, map_products: dict) -> None:
+        """
+        Insert every order, then every item, with one multi-row INSERT each.
+        Order ids are written back into the given order rows.
+        """
+        order_ids: list = db.session.scalars(
+            insert(Order).returning(Order.id, sort_by_parameter_order=True),
+            [order_row for _, order_row, _ in new_orders],
+        ).all()
+
+        item_rows: list = []
+        for order_id, (_, order_row, items) in zip(order_ids, new_orders, strict=True):
+            order_row["id"] = order_id
+            for item in items:
+                product = map_products[item.get("product_id")]
+                item_rows.append(
+                    {
+                        "order_id": order_id,
+                        "product_id": product.id,
+                        "quantity": item.get("quantity"),
+                        "product_price": product.price,
+                        "price_version": product.price_version,
+                    },
+                )
+        # An empty list would run a single INSERT without values.
+        if item_rows:
+            db.session.execute(insert(Item), item_rows)
+
+    def bulk_delete_orders(self, order_ids: list) -> None:
+        db.session.execute(delete(Item).where(Item.order_id.in_(order_ids)))
+        db.session.execute(delete(Order).where(Order.id.in_(order_ids)))
+
+    def reserve_stock(self, order_id: int, items: list) -> None:
+        try:
+            stock_reservations.reserve(order_id, items)
+        except ValidationError:
+            db.session.rollback()
+            raise
+
+    def commit_reserved_orders(self, order_ids: list) -> None:
+        try:
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            stock_reservations.release_many(order_ids)
+            raise
+
+    def commit_updated_order(self, order_id: int, previous_items: list) -> None:
+        try:
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            # The order keeps its previous items, so it holds their stock again.
+            try:
+                stock_reservations.reserve(order_id, previous_items)
+            except ValidationError:
+                stock_reservations.release(order_id)
+            raise
+
+    def failed_batch_result(self, index: int, error: ValidationError) -> dict:
+        return {"index": index, "status": "failed", "errors": error.messages}
+
     def get_map_products(
         self,
         items: dict,
@@ -71,6 +240,7 @@ class OrderService:
                 product_id=product.id,
                 quantity=item.get("quantity"),
                 product_price=product.price,
+                price_version=product.price_version,
             )
             for item in items
             if (product := map_products.get(item.get("product_id")))
@@ -80,18 +250,27 @@ class OrderService:
     def create_order(
         self,
         add_order_schema: OrderSchema,
-        user: User,
+        user_id: int,
         calculate_total_price_order: float,
     ) -> Order:
         order_data: dict = {
-            "user_id": user.id,
+            "user_id": user_id,
             "total_price": calculate_total_price_order,
             "tracking_code": str(uuid.uuid4()),
         }
         return add_order_schema.create_order(order_data)
 
+    @read_only
+    def list_orders(self, args: dict) -> dict:
+        if args.get("page") is not None:
+            return self.list_products(args.get("page"))
+        return self.cursor_list_orders(
+            cursor=args.get("cursor"),
+            per_page=args.get("per_page"),
+            include_total=args.get("include_total"),
+        )
+
     def list_products(self, page_number: int) -> dict:
-        order_schema = OrderSchema()
         pagination = self.pagination_list_order(page_number)
         return {
             "page": pagination.page,
@@ -100,21 +279,143 @@ class OrderService:
             "total_pages": pagination.pages,
             "has_next": pagination.has_next,
             "has_prev": pagination.has_prev,
-            "orders": [order_schema.dump(order) for order in pagination.items],
+            "orders": self.dump_order_rows(pagination.items),
         }
 
     def pagination_list_order(self, page_number: int):
         return (
-            Order.query.options(joinedload(Order.items))
-            .join(User)  # Inner Join
-            .filter(User.email == get_jwt_identity())
+            Order.query.with_entities(*order_row_serializer.columns)
+            .filter(Order.user_id == current_user_id())
             .paginate(page=page_number, per_page=5, error_out=False)
         )
 
+    def cursor_list_orders(
+        self,
+        cursor: str | None,
+        per_page: int,
+        *args,
+        include_total: bool,
+    ) -> dict:
+        """
+        Keyset pagination on (created_at, id), newest first. Items are loaded
+        with one extra IN query and the total is only counted when asked for.
+        """
+        query = (
+            select(*order_row_serializer.columns)
+            .where(Order.user_id == current_user_id())
+            .order_by(Order.created_at.desc(), Order.id.desc())
+            .limit(per_page + 1)
+        )
+        if cursor:
+            created_at, order_id = decode_cursor(cursor, str, int)
+            try:
+                created_at = datetime.fromisoformat(created_at)
+            except ValueError as error:
+                raise ValidationError("Invalid cursor.", field_name="cursor") from error  # noqa: EM101, TRY003
+            query = query.where(
+                tuple_(Order.created_at, Order.id) < tuple_(created_at, order_id),
+            )
+
+        orders: list = db.session.execute(query).all()
+        has_next: bool = len(orders) > per_page
+        orders = orders[:per_page]
+        next_cursor: str | None = None
+        if has_next:
+            last_order = orders[-1]
+            next_cursor = encode_cursor(
+                [last_order.created_at.isoformat(), last_order.id],
+            )
+
+        result: dict = {
+            "per_page": per_page,
+            "has_next": has_next,
+            "next_cursor": next_cursor,
+            "orders": self.dump_order_rows(orders),
+        }
+        if include_total:
+            result["total_orders"] = db.session.scalar(
+                select(func.count(Order.id)).where(
+                    Order.user_id == current_user_id(),
+                ),
+            )
+        return result
+
+    def dump_order_rows(self, rows: list) -> list:
+        """
+        Serialize order rows like OrderSchema does, reading the items of all
+        of them with one IN query.
+        """
+        orders: list = order_row_serializer.dump_many(rows)
+        items_by_order: dict = {}
+        for order in orders:
+            order["items"] = items_by_order[order["id"]] = []
+        if items_by_order:
+            item_rows = db.session.execute(
+                select(Item.order_id, *item_row_serializer.columns)
+                .where(Item.order_id.in_(list(items_by_order)))
+                .order_by(Item.id),
+            )
+            for order_id, *item_row in item_rows:
+                items_by_order[order_id].append(item_row_serializer.dump(item_row))
+        return orders
+
+    def export_orders(self, args: dict) -> Response:
+        """
+        Every order matching the filters, with its items, streamed as NDJSON
+        or as CSV with one row per item.
+        """
+        item_columns: list = [f"item_{key}" for key in item_row_serializer.keys]
+        return export_response(
+            self.export_order_batches(args),
+            args.get("format"),
+            "orders",
+            columns=[*order_row_serializer.keys, *item_columns],
+            rows=self.order_csv_rows,
+        )
+
+    @read_only
+    def export_order_batches(self, args: dict) -> Iterator[list]:
+        """
+        Serialized orders in id order, EXPORT_CHUNK_SIZE at a time, read from
+        one streamed cursor plus one items query per chunk.
+        """
+        query = (
+            select(*order_row_serializer.columns)
+            .order_by(Order.id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        if args.get("status"):
+            query = query.where(Order.status == args.get("status"))
+        if args.get("created_from"):
+            query = query.where(Order.created_at >= args.get("created_from"))
+        if args.get("created_to"):
+            query = query.where(Order.created_at < args.get("created_to"))
+
+        for rows in db.session.execute(query).partitions():
+            yield self.dump_order_rows(rows)
+
+    def order_csv_rows(self, order: dict) -> list:
+        order_fields: dict = {
+            key: value for key, value in order.items() if key != "items"
+        }
+        return [
+            {**order_fields, **{f"item_{key}": value for key, value in item.items()}}
+            for item in order["items"]
+        ] or [order_fields]
+
+    @read_only
     def order(self, tracking_code: uuid) -> dict:
-        order_schema = OrderSchema()
-        order = self.find_order(tracking_code=tracking_code)
-        return order_schema.dump(order)
+        row = db.session.execute(
+            select(*order_row_serializer.columns).where(
+                Order.tracking_code == tracking_code,
+            ),
+        ).first()
+        if not row:
+            abort(
+                HTTPStatus.NOT_FOUND,
+                description="User don't have this order.",
+            )
+        return self.dump_order_rows([row])[0]
 
     def find_order(
         self,
@@ -126,8 +427,8 @@ class OrderService:
             query = Order.query.filter_by(tracking_code=tracking_code)
 
         elif order_id:
-            query = Order.query.join(User).filter(
-                User.email == get_jwt_identity(),
+            query = Order.query.filter(
+                Order.user_id == current_user_id(),
                 Order.id == order_id,
             )
             if status:
@@ -153,23 +454,61 @@ class OrderService:
 
         db.session.delete(order)
         db.session.commit()
+        stock_reservations.release(order_id)
         return {
             "message": f"Order with ID {order_id} successfully deleted.",
         }
 
     def update_inventory_products(
         self,
+        order_id: int,
         items: list,
-        products_map: dict,
         new_status: str,
     ) -> None:
-        for item in items:
-            product = products_map.get(item.product_id)
-            product.inventory = self.calculate_inventory_products(
-                product.inventory,
-                item.quantity,
-                new_status,
+        """
+        Move the inventory of every product in the order with one UPDATE.
+        A confirmation only applies when all products have enough stock.
+        """
+        order_quantity = (
+            select(func.sum(Item.quantity))
+            .where(Item.order_id == order_id, Item.product_id == Product.id)
+            .scalar_subquery()
+        )
+        statement = update(Product).where(
+            Product.id.in_(select(Item.product_id).where(Item.order_id == order_id)),
+        )
+        if new_status == OrderStatusEnum.CONFIRMED.name:
+            statement = statement.where(Product.inventory >= order_quantity).values(
+                inventory=Product.inventory - order_quantity,
             )
+        elif new_status == OrderStatusEnum.CANCELED.name:
+            statement = statement.values(inventory=Product.inventory + order_quantity)
+
+        result = db.session.execute(
+            statement,
+            execution_options={"synchronize_session": False},
+        )
+        if result.rowcount != len({item.get("product_id") for item in items}):
+            db.session.rollback()
+            msg_error = f"Order with ID {order_id} has insufficient stock."
+            raise ConflictIntegrityError(msg_error)
+
+    def transition_order_status(
+        self,
+        order: Order,
+        current_status: str,
+        new_status: str,
+    ) -> None:
+        result = db.session.execute(
+            update(Order)
+            .where(Order.id == order.id, Order.status == current_status)
+            .values(status=new_status),
+            execution_options={"synchronize_session": False},
+        )
+        if result.rowcount != 1:
+            db.session.rollback()
+            msg_error = f"Order with ID {order.id} status was changed, try again."
+            raise ConflictIntegrityError(msg_error)
 
     def change_order_status(self, order: Order, new_order_status: str) -> None:
         order.status = new_order_status
@@ -191,12 +530,12 @@ class OrderService:
         current_status: str,
         new_status: str,
     ) -> dict:
-        order_schema = OrderSchema()
         order = self.find_order(order_id=order_id, status=current_status)
-        data_order = order_schema.dump(order)
-        products_map = self.get_map_products(items=data_order.get("items"), lock=True)
-        self.update_inventory_products(order.items, products_map, new_status)
-        self.change_order_status(order, new_status)
+        # The status guard runs first so concurrent transitions of the same
+        # order can't move the inventory twice.
+        self.transition_order_status(order, current_status, new_status)
+        order_items: list = self.order_item_quantities(order.id)
+        self.update_inventory_products(order.id, order_items, new_status)
 
         try:
             db.session.commit()
@@ -205,20 +544,21 @@ class OrderService:
             msg_error = "An error occurred, try again later."
             raise ConflictIntegrityError(msg_error) from err
 
+        if new_status == OrderStatusEnum.CONFIRMED.name:
+            stock_reservations.confirm(order_id)
+        elif new_status == OrderStatusEnum.CANCELED.name:
+            stock_reservations.restock(order_items)
+        product_cache.evict([item.get("product_id") for item in order_items])
+
         return {"message": f"Order with ID {order_id} {new_status.lower()}."}
 
-    def calculate_inventory_products(
-        self,
-        product_inventory: int,
-        item_quentity: int,
-        new_status: str,
-    ) -> int:
-        result = None
-        if new_status == OrderStatusEnum.CONFIRMED.name:
-            result = product_inventory - item_quentity
-        if new_status == OrderStatusEnum.CANCELED.name:
-            result = product_inventory + item_quentity
-        return result
+    def order_item_quantities(self, order_id: int) -> list:
+        rows = db.session.execute(
+            select(Item.product_id, Item.quantity).where(Item.order_id == order_id),
+        ).all()
+        return [
+            {"product_id": row.product_id, "quantity": row.quantity} for row in rows
+        ]
 
     def full_update_order(self, data: dict, order_id: int) -> dict:
         order = self.find_order(order_id=order_id, status=OrderStatusEnum.PENDING.name)
@@ -232,7 +572,12 @@ class OrderService:
         valid_data_order = order_schema.load(data)
         map_products: dict = self.get_map_products(
             items=valid_data_order.get("items"),
-            fields=(Product.id, Product.price, Product.inventory),
+            fields=(
+                Product.id,
+                Product.price,
+                Product.inventory,
+                Product.price_version,
+            ),
             lock=False,
         )
 
@@ -240,13 +585,18 @@ class OrderService:
             map_products,
             valid_data_order.get("items"),
         )
+        previous_items: list = [
+            {"product_id": item.product_id, "quantity": item.quantity}
+            for item in order.items
+        ]
         self.update_order_items(
             order,
             valid_data_order.get("items"),
             map_products,
         )
         order.total_price = calculate_total_price_order
-        db.session.commit()
+        self.reserve_stock(order.id, valid_data_order.get("items"))
+        self.commit_updated_order(order.id, previous_items)
         return order_schema.dump(order)
 
     def update_order_items(self, order: Order, items: list, map_products: dict) -> None:
@@ -257,6 +607,7 @@ class OrderService:
                 product_id=product.id,
                 quantity=item.get("quantity"),
                 product_price=product.price,
+                price_version=product.price_version,
             )
             for item in items
             if (product := map_products.get(item.get("product_id")))
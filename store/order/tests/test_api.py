@@ -1,9 +1,23 @@
+import json
 from datetime import datetime, timedelta
 from http import HTTPStatus
 
+import pytest
+from limits import parse
+from redis.crc import key_slot
+from sqlalchemy.exc import SQLAlchemyError
+
 from store.enums import OrderStatusEnum
+from store.extensions import hybrid_limiter, redis_client
 from store.order.models import Order
+from store.order.schemas import OrderSchema
+from store.pagination import encode_cursor
 from store.product.models import Product
+from store.settings import (
+    ORDER_BATCH_MAX_SIZE,
+    ORDER_BATCH_RATE_LIMIT,
+    STOCK_COUNTER_TTL,
+)
 
 
 class TestOrderApi:
@@ -282,3 +296,443 @@ class TestOrderApi:
         response = client.put(f"/api/v1/orders/{order.id}", json=data, headers=headers)
 
         assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_add_batch_orders(self, client, auth_headers, user_store, product_factory):
+        headers = auth_headers(user_store)
+        product1 = product_factory(price=10, inventory=5)
+        product2 = product_factory(price=20, inventory=1)
+        batch_data = {
+            "orders": [
+                {"items": [{"product_id": product1.id, "quantity": 2}]},
+                {"items": [{"product_id": product2.id, "quantity": 3}]},
+                {"items": [{"product_id": product1.id, "quantity": 0}]},
+                {
+                    "items": [
+                        {"product_id": product1.id, "quantity": 1},
+                        {"product_id": product2.id, "quantity": 1},
+                    ],
+                },
+            ],
+        }
+
+        response = client.post("api/v1/orders/batch", json=batch_data, headers=headers)
+        data = response.get_json()
+        results = data.get("results", [])
+        orders = Order.query.filter_by(user_id=user_store.id).order_by(Order.id).all()
+
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        assert data.get("created") == 2  # noqa: PLR2004
+        assert data.get("failed") == 2  # noqa: PLR2004
+        assert [result["status"] for result in results] == [
+            "created",
+            "failed",
+            "failed",
+            "created",
+        ]
+        assert "insufficient stock" in results[1]["errors"][0]
+        assert [order.id for order in orders] == [
+            results[0]["order"]["id"],
+            results[3]["order"]["id"],
+        ]
+        assert orders[0].total_price == 2 * product1.price
+        assert orders[1].total_price == product1.price + product2.price
+        assert len(orders[1].items) == 2  # noqa: PLR2004
+
+    def test_confirm_order_insufficient_inventory_is_atomic(  # noqa: PLR0913
+        self,
+        db,
+        client,
+        order_factory,
+        product_factory,
+        auth_headers,
+        user_store,
+        order_item_factory,
+    ):
+        order = order_factory(user_id=user_store.id, is_flush=True)
+        product1 = product_factory(inventory=5)
+        product2 = product_factory(inventory=1)
+        item1 = order_item_factory(product=product1, quantity=2)
+        item2 = order_item_factory(product=product2, quantity=9)
+        order.items = [item1, item2]
+        db.session.commit()
+        headers = auth_headers(user_store)
+
+        response = client.patch(f"/api/v1/orders/{order.id}/confirmed", headers=headers)
+        updated_order = db.session.get(Order, order.id)
+
+        assert response.status_code == HTTPStatus.CONFLICT
+        assert updated_order.status == OrderStatusEnum.PENDING.name
+        assert db.session.get(Product, product1.id).inventory == 5  # noqa: PLR2004
+        assert db.session.get(Product, product2.id).inventory == 1
+
+    def test_add_order_reserves_stock_until_deleted(
+        self,
+        client,
+        auth_headers,
+        user_store,
+        product_factory,
+        fake_redis,
+    ):
+        headers = auth_headers(user_store)
+        product = product_factory(inventory=3)
+        stock_key = f"{{stock}}:product:{product.id}"
+        order_data = {"items": [{"product_id": product.id, "quantity": 2}]}
+
+        first_response = client.post("api/v1/orders/", json=order_data, headers=headers)
+        second_response = client.post(
+            "api/v1/orders/",
+            json=order_data,
+            headers=headers,
+        )
+        reserved_stock = int(fake_redis.get(stock_key))
+        order_id = first_response.get_json()["id"]
+        delete_response = client.delete(f"/api/v1/orders/{order_id}", headers=headers)
+
+        assert first_response.status_code == HTTPStatus.CREATED
+        assert second_response.status_code == HTTPStatus.BAD_REQUEST
+        assert "1 available" in second_response.get_json()["errors"][0]
+        assert reserved_stock == 1
+        assert delete_response.status_code == HTTPStatus.OK
+        assert int(fake_redis.get(stock_key)) == 3  # noqa: PLR2004
+        assert Order.query.count() == 0
+
+    def test_update_order_keeps_its_hold_when_commit_fails(  # noqa: PLR0913
+        self,
+        client,
+        db,
+        auth_headers,
+        user_store,
+        product_factory,
+        fake_redis,
+        monkeypatch,
+    ):
+        headers = auth_headers(user_store)
+        product = product_factory(inventory=5)
+        stock_key = f"{{stock}}:product:{product.id}"
+        response = client.post(
+            "api/v1/orders/",
+            json={"items": [{"product_id": product.id, "quantity": 2}]},
+            headers=headers,
+        )
+        order_id = response.get_json()["id"]
+
+        def failing_commit():
+            raise SQLAlchemyError
+
+        monkeypatch.setattr(db.session, "commit", failing_commit)
+        with pytest.raises(SQLAlchemyError):
+            client.put(
+                f"/api/v1/orders/{order_id}",
+                json={"items": [{"product_id": product.id, "quantity": 4}]},
+                headers=headers,
+            )
+
+        assert int(fake_redis.get(stock_key)) == 3  # noqa: PLR2004
+        assert fake_redis.hgetall(f"{{stock}}:reservation:{order_id}") == {
+            str(product.id).encode(): b"2",
+        }
+        assert [item.quantity for item in db.session.get(Order, order_id).items] == [2]
+
+    def test_reservations_outlive_the_counters_they_hold_stock_of(
+        self,
+        client,
+        auth_headers,
+        user_store,
+        product_factory,
+        fake_redis,
+    ):
+        headers = auth_headers(user_store)
+        product = product_factory(inventory=5)
+        stock_key = f"{{stock}}:product:{product.id}"
+        order_data = {"items": [{"product_id": product.id, "quantity": 1}]}
+        order_id = client.post(
+            "api/v1/orders/",
+            json=order_data,
+            headers=headers,
+        ).get_json()["id"]
+        reservation_key = f"{{stock}}:reservation:{order_id}"
+        assert fake_redis.ttl(reservation_key) >= fake_redis.ttl(stock_key)
+
+        # The counter expired and was re-seeded while the hold was about to.
+        fake_redis.delete(stock_key)
+        fake_redis.expire(reservation_key, 60)
+        client.post("api/v1/orders/", json=order_data, headers=headers)
+        reseeded_stock = int(fake_redis.get(stock_key))
+        assert fake_redis.ttl(reservation_key) == STOCK_COUNTER_TTL
+        client.delete(f"/api/v1/orders/{order_id}", headers=headers)
+
+        assert reseeded_stock == 3  # noqa: PLR2004
+        assert int(fake_redis.get(stock_key)) == 4  # noqa: PLR2004
+
+    def test_stock_keys_share_one_cluster_slot(
+        self,
+        client,
+        auth_headers,
+        user_store,
+        product_factory,
+        fake_redis,
+    ):
+        headers = auth_headers(user_store)
+        products = [product_factory(inventory=5) for _ in range(3)]
+        order_id = client.post(
+            "api/v1/orders/",
+            json={
+                "items": [
+                    {"product_id": product.id, "quantity": 1} for product in products
+                ],
+            },
+            headers=headers,
+        ).get_json()["id"]
+        client.put(
+            f"/api/v1/orders/{order_id}",
+            json={"items": [{"product_id": products[0].id, "quantity": 3}]},
+            headers=headers,
+        )
+
+        keys: list = fake_redis.keys("{stock}:*")
+        assert len(keys) == 4  # noqa: PLR2004
+        assert len({key_slot(key) for key in keys}) == 1
+        assert [
+            int(fake_redis.get(f"{{stock}}:product:{product.id}"))
+            for product in products
+        ] == [2, 5, 5]
+
+    def test_list_orders_with_cursor(
+        self,
+        client,
+        auth_headers,
+        user_store,
+        order_factory,
+    ):
+        now = datetime.now()  # noqa: DTZ005
+        orders = [
+            order_factory(user_id=user_store.id, created_at=now - timedelta(minutes=n))
+            for n in range(3)
+        ]
+        headers = auth_headers(user_store)
+
+        first_page = client.get(
+            "/api/v1/orders/?per_page=2&include_total=true",
+            headers=headers,
+        ).get_json()
+        second_page = client.get(
+            f"/api/v1/orders/?per_page=2&cursor={first_page['next_cursor']}",
+            headers=headers,
+        ).get_json()
+        legacy_page = client.get("/api/v1/orders/?page=1", headers=headers).get_json()
+
+        assert [order["id"] for order in first_page["orders"]] == [
+            orders[0].id,
+            orders[1].id,
+        ]
+        assert first_page["has_next"] is True
+        assert first_page["total_orders"] == 3  # noqa: PLR2004
+        assert [order["id"] for order in second_page["orders"]] == [orders[2].id]
+        assert second_page["has_next"] is False
+        assert second_page["next_cursor"] is None
+        assert "total_orders" not in second_page
+        assert legacy_page["total_orders"] == 3  # noqa: PLR2004
+
+    def test_order_read_paths_match_schema_dump(  # noqa: PLR0913
+        self,
+        client,
+        db,
+        auth_headers,
+        user_store,
+        order_factory,
+        order_item_factory,
+    ):
+        now = datetime.now()  # noqa: DTZ005
+        orders = [
+            order_factory(user_id=user_store.id, created_at=now - timedelta(minutes=n))
+            for n in range(2)
+        ]
+        for order in orders:
+            order.items = [
+                order_item_factory(quantity=2),
+                order_item_factory(quantity=3),
+            ]
+        db.session.commit()
+        expected: list = OrderSchema(many=True).dump(orders)
+        headers = auth_headers(user_store)
+
+        cursor_page = client.get("/api/v1/orders/", headers=headers).get_json()
+        legacy_page = client.get("/api/v1/orders/?page=1", headers=headers).get_json()
+        tracked_order = client.get(
+            f"/api/v1/orders/tracking/{orders[0].tracking_code}",
+            headers=headers,
+        ).get_json()
+
+        assert cursor_page["orders"] == expected
+        assert sorted(legacy_page["orders"], key=lambda order: order["id"]) == sorted(
+            expected,
+            key=lambda order: order["id"],
+        )
+        assert tracked_order == expected[0]
+
+    def test_list_orders_invalid_cursor(self, client, auth_headers, user_store):
+        headers = auth_headers(user_store)
+
+        responses = [
+            client.get(f"/api/v1/orders/?cursor={cursor}", headers=headers)
+            for cursor in (
+                "not-a-cursor",
+                encode_cursor([1, 2]),
+                encode_cursor(["nope", 2]),
+                encode_cursor(["2026-01-01T00:00:00", "2"]),
+                encode_cursor(["2026-01-01T00:00:00", True]),
+            )
+        ]
+
+        assert [response.status_code for response in responses] == [
+            HTTPStatus.BAD_REQUEST,
+        ] * 5
+
+    def test_add_order_replays_response_for_same_idempotency_key(
+        self,
+        client,
+        db,
+        auth_headers,
+        user_store,
+        product_factory,
+    ):
+        product = product_factory(inventory=10)
+        headers = {**auth_headers(user_store), "Idempotency-Key": "retry-1"}
+        order_data = {"items": [{"product_id": product.id, "quantity": 1}]}
+
+        # More attempts than the "2 per day" limit allows.
+        responses = [
+            client.post("api/v1/orders/", json=order_data, headers=headers)
+            for _ in range(3)
+        ]
+        other_body = client.post(
+            "api/v1/orders/",
+            json={"items": [{"product_id": product.id, "quantity": 2}]},
+            headers=headers,
+        )
+
+        assert [response.status_code for response in responses] == [
+            HTTPStatus.CREATED,
+        ] * 3
+        assert responses[0].get_json() == responses[2].get_json()
+        assert "Idempotent-Replayed" not in responses[0].headers
+        assert responses[2].headers["Idempotent-Replayed"] == "true"
+        assert Order.query.count() == 1
+        assert other_body.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    def test_add_order_with_idempotency_key_in_flight(  # noqa: PLR0913
+        self,
+        client,
+        db,
+        auth_headers,
+        user_store,
+        product,
+        monkeypatch,
+    ):
+        monkeypatch.setattr("store.idempotency.IDEMPOTENCY_WAIT_TIMEOUT", 0.1)
+        headers = {**auth_headers(user_store), "Idempotency-Key": "retry-2"}
+        order_data = {"items": [{"product_id": product.id, "quantity": 1}]}
+        redis_client.set(
+            f"idempotency:order.AddOrder:{user_store.id}:retry-2",
+            json.dumps({"state": "in-flight", "fingerprint": ""}),
+        )
+
+        response = client.post("api/v1/orders/", json=order_data, headers=headers)
+
+        assert response.status_code == HTTPStatus.CONFLICT
+        assert Order.query.count() == 0
+
+    def test_add_order_rate_limit_is_per_user(  # noqa: PLR0913
+        self,
+        client,
+        db,
+        auth_headers,
+        user_store,
+        admin_user,
+        product_factory,
+    ):
+        product = product_factory(inventory=10)
+        order_data = {"items": [{"product_id": product.id, "quantity": 1}]}
+
+        user_responses = [
+            client.post(
+                "api/v1/orders/",
+                json=order_data,
+                headers=auth_headers(user_store),
+            )
+            for _ in range(3)
+        ]
+        other_user_response = client.post(
+            "api/v1/orders/",
+            json=order_data,
+            headers=auth_headers(admin_user),
+        )
+
+        assert [response.status_code for response in user_responses] == [
+            HTTPStatus.CREATED,
+            HTTPStatus.CREATED,
+            HTTPStatus.TOO_MANY_REQUESTS,
+        ]
+        assert other_user_response.status_code == HTTPStatus.CREATED
+
+    def test_add_batch_orders_without_items(self, client, auth_headers, user_store):
+        response = client.post(
+            "api/v1/orders/batch",
+            json={"orders": [{"items": []}]},
+            headers=auth_headers(user_store),
+        )
+
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        assert response.get_json()["created"] == 1
+
+    def test_batch_orders_count_each_order_against_rate_limit(
+        self,
+        client,
+        auth_headers,
+        user_store,
+        product_factory,
+    ):
+        product = product_factory(inventory=10)
+        headers = auth_headers(user_store)
+        # Invalid orders still count, so the quota runs out without writes.
+        invalid_batch = {"orders": [{}] * ORDER_BATCH_MAX_SIZE}
+        valid_batch = {
+            "orders": [{"items": [{"product_id": product.id, "quantity": 1}]}],
+        }
+        limit = parse(ORDER_BATCH_RATE_LIMIT).amount
+
+        responses = [
+            client.post("api/v1/orders/batch", json=invalid_batch, headers=headers)
+            for _ in range(limit // ORDER_BATCH_MAX_SIZE)
+        ]
+        over_limit = client.post(
+            "api/v1/orders/batch",
+            json=valid_batch,
+            headers=headers,
+        )
+
+        assert {response.status_code for response in responses} == {
+            HTTPStatus.MULTI_STATUS,
+        }
+        assert over_limit.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert Order.query.count() == 0
+
+    def test_rate_limit_admits_locally_and_flushes_in_batches(self, monkeypatch):
+        calls = []
+        run_script = hybrid_limiter.run_script
+        monkeypatch.setattr(
+            hybrid_limiter,
+            "run_script",
+            lambda *args, **kwargs: calls.append(kwargs) or run_script(*args, **kwargs),
+        )
+        item = parse("100 per minute")
+
+        hits = [hybrid_limiter.hit(item, "test", identity=1) for _ in range(5)]
+        hybrid_limiter.flush()
+        counted = sum(
+            int(redis_client.get(key)) for key in redis_client.scan_iter("ratelimit:*")
+        )
+
+        assert all(hits)
+        assert [call["requested"] for call in calls] == [1, 0]
+        assert counted == 5  # noqa: PLR2004
@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+from datetime import datetime
+from http import HTTPStatus
+
+import store.order.services
+from store.enums import OrderStatusEnum
+from store.order.schemas import OrderSchema
+from store.order.services import OrderService
+
+
+class TestOrderExport:
+    def create_orders(self, admin_user, order_factory, order_item_factory, product):
+        orders: list = []
+        for day, status in enumerate(
+            (
+                OrderStatusEnum.PENDING,
+                OrderStatusEnum.COMPLETED,
+                OrderStatusEnum.COMPLETED,
+                OrderStatusEnum.CANCELED,
+            ),
+            start=1,
+        ):
+            order = order_factory(
+                user_id=admin_user.id,
+                status=status.name,
+                created_at=datetime(2026, 1, day),  # noqa: DTZ001
+                is_flush=True,
+            )
+            for quantity in range(1, day + 1):
+                order_item_factory(
+                    order_id=order.id,
+                    product=product,
+                    quantity=quantity,
+                )
+            orders.append(order)
+        return orders
+
+    def test_export_orders_ndjson(  # noqa: PLR0913
+        self,
+        client,
+        db,
+        admin_user,
+        auth_headers,
+        order_factory,
+        order_item_factory,
+        product,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(store.order.services, "EXPORT_CHUNK_SIZE", 1)
+        orders = self.create_orders(
+            admin_user,
+            order_factory,
+            order_item_factory,
+            product,
+        )
+        db.session.commit()
+
+        response = client.get(
+            "/api/v1/orders/export?status=COMPLETED&created_from=2026-01-03T00:00:00",
+            headers=auth_headers(admin_user),
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.is_streamed
+        assert response.mimetype == "application/x-ndjson"
+        assert response.headers["Content-Disposition"] == (
+            'attachment; filename="orders.ndjson"'
+        )
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line) for line in lines] == [OrderSchema().dump(orders[2])]
+
+    def test_export_orders_csv_has_a_row_per_item(  # noqa: PLR0913
+        self,
+        client,
+        db,
+        admin_user,
+        auth_headers,
+        order_factory,
+        order_item_factory,
+        product,
+    ):
+        orders = self.create_orders(
+            admin_user,
+            order_factory,
+            order_item_factory,
+            product,
+        )
+        db.session.commit()
+
+        response = client.get(
+            "/api/v1/orders/export?format=csv&created_to=2026-01-03T00:00:00",
+            headers=auth_headers(admin_user),
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.mimetype == "text/csv"
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert [(row["id"], row["item_quantity"]) for row in rows] == [
+            (str(orders[0].id), "1"),
+            (str(orders[1].id), "1"),
+            (str(orders[1].id), "2"),
+        ]
+        assert rows[0]["tracking_code"] == orders[0].tracking_code
+        assert rows[0]["item_product_id"] == str(product.id)
+
+    def test_export_orders_csv_without_matches_has_a_header(
+        self,
+        client,
+        db,
+        admin_user,
+        auth_headers,
+    ):
+        response = client.get(
+            "/api/v1/orders/export?format=csv",
+            headers=auth_headers(admin_user),
+        )
+
+        assert response.get_data(as_text=True) == (
+            "id,user_id,status,created_at,total_price,tracking_code,"
+            "item_product_id,item_quantity,item_price_version\r\n"
+        )
+
+    def test_export_orders_requires_admin(self, client, db, user_store, auth_headers):
+        response = client.get(
+            "/api/v1/orders/export",
+            headers=auth_headers(user_store),
+        )
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_export_order_batches_stream_in_chunks(  # noqa: PLR0913
+        self,
+        db,
+        admin_user,
+        order_factory,
+        order_item_factory,
+        product,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(store.order.services, "EXPORT_CHUNK_SIZE", 3)
+        orders = self.create_orders(
+            admin_user,
+            order_factory,
+            order_item_factory,
+            product,
+        )
+        db.session.commit()
+
+        batches = list(OrderService().export_order_batches({}))
+
+        assert [[order["id"] for order in batch] for batch in batches] == [
+            [order.id for order in orders[:3]],
+            [orders[3].id],
+        ]
+        assert [len(order["items"]) for batch in batches for order in batch] == [
+            1,
+            2,
+            3,
+            4,
+        ]
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+from store.order.models import Order
+from store.tasks import purge_pending_orders
+
+
+class TestOrderQueryPlans:
+    def add_orders(self, client, headers, product_ids):
+        orders = [
+            {"items": [{"product_id": product_id, "quantity": 1}]}
+            for product_id in product_ids
+        ]
+        response = client.post(
+            "api/v1/orders/batch",
+            json={"orders": orders},
+            headers=headers,
+        )
+        assert response.get_json()["created"] == len(product_ids)
+        return Order.query.order_by(Order.id).all()
+
+    def test_order_reads_use_indexes(  # noqa: PLR0913
+        self,
+        client,
+        db,
+        auth_headers,
+        user_store,
+        product_factory,
+        query_plans,
+    ):
+        headers = auth_headers(user_store)
+        products = [product_factory(inventory=10) for _ in range(3)]
+        orders = self.add_orders(client, headers, [product.id for product in products])
+
+        first_page = client.get(
+            "/api/v1/orders/?per_page=2&include_total=true",
+            headers=headers,
+        )
+        responses = [
+            first_page,
+            client.get(
+                f"/api/v1/orders/?cursor={first_page.get_json()['next_cursor']}",
+                headers=headers,
+            ),
+            client.get("/api/v1/orders/?page=1", headers=headers),
+            client.get(
+                f"/api/v1/orders/tracking/{orders[0].tracking_code}",
+                headers=headers,
+            ),
+        ]
+
+        assert [response.status_code for response in responses] == [
+            HTTPStatus.OK,
+        ] * 4
+        assert query_plans.table_scans() == []
+
+    def test_order_writes_use_indexes(  # noqa: PLR0913
+        self,
+        client,
+        db,
+        auth_headers,
+        user_store,
+        product_factory,
+        query_plans,
+    ):
+        headers = auth_headers(user_store)
+        products = [product_factory(inventory=10) for _ in range(4)]
+        added = client.post(
+            "api/v1/orders/",
+            json={"items": [{"product_id": products[0].id, "quantity": 1}]},
+            headers=headers,
+        )
+        orders = self.add_orders(client, headers, [product.id for product in products])
+
+        responses = [
+            added,
+            client.put(
+                f"/api/v1/orders/{orders[0].id}",
+                json={"items": [{"product_id": products[1].id, "quantity": 2}]},
+                headers=headers,
+            ),
+            client.patch(f"/api/v1/orders/{orders[1].id}/confirmed", headers=headers),
+            client.patch(f"/api/v1/orders/{orders[1].id}/completed", headers=headers),
+            # Only confirmed orders can be canceled.
+            client.patch(f"/api/v1/orders/{orders[2].id}/confirmed", headers=headers),
+            client.patch(f"/api/v1/orders/{orders[2].id}/canceled", headers=headers),
+            client.delete(f"/api/v1/orders/{orders[3].id}", headers=headers),
+        ]
+        purged = purge_pending_orders(
+            older_than=datetime.now() + timedelta(hours=1),  # noqa: DTZ005
+            chunk_size=10,
+            time_budget=60,
+        )
+
+        assert [response.status_code for response in responses] == [
+            HTTPStatus.CREATED,
+            *[HTTPStatus.OK] * 6,
+        ]
+        # The single order and the updated one are still pending.
+        assert purged["orders"] == 2  # noqa: PLR2004
+        assert query_plans.table_scans() == []
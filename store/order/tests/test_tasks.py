@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+from store.enums import OrderStatusEnum
+from store.extensions import redis_client
+from store.order.models import Item, Order
+from store.tasks import (
+    PURGE_LOCK_KEY,
+    purge_pending_orders,
+    remove_old_order_pending_status,
+)
+
+
+class TestPurgePendingOrders:
+    def test_purge_deletes_orders_and_items_in_chunks(
+        self,
+        db,
+        user_store,
+        product,
+        order_factory,
+        order_item_factory,
+    ):
+        old = datetime.now() - timedelta(hours=2)  # noqa: DTZ005
+        stale_orders = [
+            order_factory(user_id=user_store.id, created_at=old, is_flush=True)
+            for _ in range(5)
+        ]
+        confirmed = order_factory(
+            user_id=user_store.id,
+            created_at=old,
+            status=OrderStatusEnum.CONFIRMED.name,
+            is_flush=True,
+        )
+        recent = order_factory(user_id=user_store.id, is_flush=True)
+        for order in [*stale_orders, confirmed, recent]:
+            order_item_factory(order_id=order.id, product=product)
+        db.session.commit()
+        recent.created_at = datetime.now()  # noqa: DTZ005
+        db.session.commit()
+
+        report = purge_pending_orders(
+            older_than=datetime.now() - timedelta(hours=1),  # noqa: DTZ005
+            chunk_size=2,
+            time_budget=60,
+        )
+
+        assert report["orders"] == 5  # noqa: PLR2004
+        assert report["items"] == 5  # noqa: PLR2004
+        assert [chunk["orders"] for chunk in report["chunks"]] == [2, 2, 1]
+        assert {order.id for order in Order.query} == {confirmed.id, recent.id}
+        assert {item.order_id for item in Item.query} == {confirmed.id, recent.id}
+
+    def test_purge_skips_when_another_run_holds_the_lock(
+        self,
+        db,
+        user_store,
+        order_factory,
+    ):
+        old = datetime.now() - timedelta(hours=2)  # noqa: DTZ005
+        order = order_factory(user_id=user_store.id, created_at=old)
+        redis_client.set(PURGE_LOCK_KEY, "other-run")
+
+        report = remove_old_order_pending_status()
+
+        assert report is None
+        assert db.session.get(Order, order.id) is not None
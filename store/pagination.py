@@ -0,0 +1,31 @@
+import base64
+import binascii
+import json
+
+from marshmallow import ValidationError
+
+
+def encode_cursor(values: list) -> str:
+    """Opaque, URL-safe cursor holding the sort key of the last row of a page."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> list:
+    """The values of ``cursor``, one per entry of ``types``, each of its type."""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise ValidationError("Invalid cursor.", field_name="cursor") from error  # noqa: EM101, TRY003
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(
+            # JSON true/false decode to bool, which is also an int.
+            isinstance(value, value_type) and not isinstance(value, bool)
+            for value, value_type in zip(values, types, strict=True)
+        )
+    ):
+        raise ValidationError("Invalid cursor.", field_name="cursor")  # noqa: EM101, TRY003
+    return values
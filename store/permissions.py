@@ -2,7 +2,7 @@ from functools import wraps
 from http import HTTPStatus
 
 from flask import jsonify
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_jwt_extended import jwt_required
 
 
 def admin_required():
@@ -10,9 +10,9 @@ def admin_required():
         @wraps(func)
         @jwt_required()
         def wrapper(*args, **kwargs):
-            from store.user.models import User
+            from store.user.identity import current_identity
 
-            user = User.query.filter_by(email=get_jwt_identity()).first()
+            user = current_identity()
             if not user or not user.is_admin:
                 return jsonify({"error": "Unauthorized"}), HTTPStatus.UNAUTHORIZED
             kwargs["user"] = user
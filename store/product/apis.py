@@ -1,11 +1,15 @@
 from http import HTTPStatus
 
-from flask import jsonify, request
+from flask import jsonify
 from flask.views import MethodView
 
-from store.extensions import cache
+from store.exports import ExportQuerySchema
 from store.permissions import admin_required
-from store.product.schemas import ProductSchema
+from store.product.schemas import (
+    ProductListQuerySchema,
+    ProductSchema,
+    ProductSearchQuerySchema,
+)
 from store.product.services import ProductService
 from store.routes import create_blueprint_api
 
@@ -24,14 +28,40 @@ class AddProduct(MethodView):
 
 @blueprint.route("/")
 class GetListProducts(MethodView):
+    @blueprint.arguments(ProductListQuerySchema, location="query")
     @blueprint.response(HTTPStatus.OK, ProductSchema)
-    @blueprint.paginate()
-    @cache.cached(
-        timeout=300,
-        key_prefix=lambda: f"products_list_page_{request.args.get('page', 1)}",
-    )
-    def get(self, pagination_parameters):
-        return jsonify(product_service.list_products()), HTTPStatus.OK
+    def get(self, args: dict):
+        return jsonify(product_service.list_products(args)), HTTPStatus.OK
+
+
+@blueprint.route("/search")
+class SearchProducts(MethodView):
+    @blueprint.arguments(ProductSearchQuerySchema, location="query")
+    @blueprint.response(HTTPStatus.OK, ProductSchema)
+    def get(self, args: dict):
+        return jsonify(product_service.search_products(args)), HTTPStatus.OK
+
+
+@blueprint.route("/import")
+class ImportProducts(MethodView):
+    @admin_required()
+    def post(self, user):
+        return jsonify(product_service.import_products(user)), HTTPStatus.MULTI_STATUS
+
+
+@blueprint.route("/export")
+class ExportProducts(MethodView):
+    @blueprint.arguments(ExportQuerySchema, location="query")
+    @admin_required()
+    def get(self, args: dict, user):
+        return product_service.export_products(args)
+
+
+@blueprint.route("/cache-stats")
+class ProductCacheStats(MethodView):
+    @admin_required()
+    def get(self, *args, **kwargs):
+        return jsonify(product_service.cache_stats()), HTTPStatus.OK
 
 
 @blueprint.route("/<int:product_id>")
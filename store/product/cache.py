@@ -0,0 +1,87 @@
+from store.db_routing import replica_lag_window
+from store.extensions import cache
+from store.settings import PRODUCT_CACHE_TIMEOUT, PRODUCT_NOT_FOUND_CACHE_TIMEOUT
+
+# Stored instead of a product when the id doesn't exist, so repeated 404s
+# don't reach the database either.
+NOT_FOUND = "not-found"
+
+
+class ProductCache:
+    """
+    Write-through cache of serialized products, one key per product id.
+
+    Writes also leave a marker for the replica lag window, during which a
+    read replica may still return the product as it was before; misses read
+    from the replica don't cache marked products.
+    """
+
+    def key(self, product_id: int) -> str:
+        return f"product:{product_id}"
+
+    def written_key(self, product_id: int) -> str:
+        return f"product:{product_id}:written"
+
+    def get(self, product_id: int) -> dict | str | None:
+        return cache.get(self.key(product_id))
+
+    def get_many(self, product_ids: list) -> dict:
+        """One MGET for all ids; only ids with a cached entry are returned."""
+        keys: list = [self.key(product_id) for product_id in product_ids]
+        values: list = cache.get_many(*keys)
+        return {
+            product_id: value
+            for product_id, value in zip(product_ids, values, strict=True)
+            if value is not None
+        }
+
+    def set(self, product: dict) -> None:
+        """Write through a product the primary has just written."""
+        cache.set(self.key(product["id"]), product, timeout=PRODUCT_CACHE_TIMEOUT)
+        self.mark_written([product["id"]])
+
+    def fill(self, products: list, not_found_ids: list, *, from_replica: bool) -> None:
+        """Cache what a miss read, found or not."""
+        if from_replica:
+            written: list = self.written(
+                [product["id"] for product in products] + not_found_ids,
+            )
+            products = [product for product in products if product["id"] not in written]
+            not_found_ids = [
+                product_id for product_id in not_found_ids if product_id not in written
+            ]
+        if products:
+            cache.set_many(
+                {self.key(product["id"]): product for product in products},
+                timeout=PRODUCT_CACHE_TIMEOUT,
+            )
+        if not_found_ids:
+            cache.set_many(
+                {self.key(product_id): NOT_FOUND for product_id in not_found_ids},
+                timeout=PRODUCT_NOT_FOUND_CACHE_TIMEOUT,
+            )
+
+    def evict(self, product_ids: list) -> None:
+        # Not cache.delete_many, which stops at the first key not cached.
+        for product_id in product_ids:
+            cache.delete(self.key(product_id))
+        self.mark_written(product_ids)
+
+    def mark_written(self, product_ids: list) -> None:
+        cache.set_many(
+            {self.written_key(product_id): 1 for product_id in product_ids},
+            timeout=replica_lag_window(),
+        )
+
+    def written(self, product_ids: list) -> list:
+        """Ids of the products written within the replica lag window."""
+        keys: list = [self.written_key(product_id) for product_id in product_ids]
+        markers: list = cache.get_many(*keys)
+        return [
+            product_id
+            for product_id, marker in zip(product_ids, markers, strict=True)
+            if marker is not None
+        ]
+
+
+product_cache = ProductCache()
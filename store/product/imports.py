@@ -0,0 +1,222 @@
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+from marshmallow import EXCLUDE, ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from store.extensions import db
+from store.product.cache import product_cache
+from store.product.models import Product
+from store.product.schemas import ProductSchema
+from store.settings import PRODUCT_IMPORT_CHUNK_SIZE, PRODUCT_IMPORT_MAX_ERRORS
+
+IMPORT_FORMATS = {
+    ".csv": "csv",
+    "text/csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/x-ndjson": "jsonl",
+}
+# Fields an imported row sets; a row equal to the stored product on all of
+# them is left alone.
+IMPORT_FIELDS = ("name", "price", "description", "inventory")
+
+
+def import_format(*hints: str) -> str | None:
+    """The import format named by a format, file suffix or mimetype, if any."""
+    for hint in hints:
+        if hint in IMPORT_FORMATS.values():
+            return hint
+        if hint in IMPORT_FORMATS:
+            return IMPORT_FORMATS[hint]
+    return None
+
+
+def read_records(stream, file_format: str) -> Iterator[tuple]:
+    """
+    Yield (line number, record) for each record of a binary CSV (with a
+    header row) or JSON Lines stream, reading it one line at a time. JSON
+    lines that don't parse are yielded as text for the schema to reject.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError:
+            yield line_number, line
+
+
+class ProductImporter:
+    """
+    Upserts products by name from (line number, record) pairs, one
+    transaction per chunk of rows.
+
+    A chunk is validated with one ProductSchema load, the products it names
+    are read with one query, and the new and the changed products are then
+    written with one executemany each. Price changes bump price_version and
+    reprice pending orders the way a product update does. When a name is
+    repeated within a chunk, its last row wins and the earlier ones are
+    reported as duplicates.
+
+    Only one chunk and at most ``max_errors`` failed rows are ever held, so
+    memory doesn't grow with the size of the import.
+    """
+
+    def __init__(
+        self,
+        user_id: int | None,
+        chunk_size: int = PRODUCT_IMPORT_CHUNK_SIZE,
+        max_errors: int = PRODUCT_IMPORT_MAX_ERRORS,
+    ):
+        self.user_id = user_id
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.schema = ProductSchema(many=True, unknown=EXCLUDE)
+        self.report: dict = {
+            "created": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "failed": 0,
+            "duplicates": 0,
+            "errors": [],
+        }
+
+    def run(self, records: Iterable) -> dict:
+        records = iter(records)
+        while chunk := list(islice(records, self.chunk_size)):
+            self.import_chunk(chunk)
+        return self.report
+
+    def import_chunk(self, chunk: list) -> None:
+        line_numbers, records = zip(*chunk, strict=True)
+        try:
+            loaded: list = self.schema.load(records)
+            errors: dict = {}
+        except ValidationError as error:
+            loaded, errors = error.valid_data, error.messages
+
+        rows: dict = {}
+        for index, (line_number, data) in enumerate(
+            zip(line_numbers, loaded, strict=True),
+        ):
+            if index in errors:
+                self.fail(line_number, errors[index])
+            else:
+                if data["name"] in rows:
+                    self.duplicate(rows[data["name"]][0], line_number)
+                rows[data["name"]] = (line_number, data)
+        if not rows:
+            return
+
+        try:
+            created_ids, updated_ids, unchanged = self.upsert(rows)
+            db.session.commit()
+        except IntegrityError:
+            # Another writer added one of these names since it was looked up.
+            db.session.rollback()
+            for line_number, _ in rows.values():
+                self.fail(
+                    line_number,
+                    {"name": ["Product was changed concurrently, import it again."]},
+                )
+            return
+
+        self.report["created"] += len(created_ids)
+        self.report["updated"] += len(updated_ids)
+        self.report["unchanged"] += unchanged
+        self.invalidate(created_ids, updated_ids)
+
+    def upsert(self, rows: dict) -> tuple:
+        """Write the chunk; return created ids, updated ids and unchanged count."""
+        from store.events import propagate_price_change
+
+        existing: dict = {
+            product.name: product
+            for product in db.session.execute(
+                select(Product.id, *self.columns(), Product.price_version).where(
+                    Product.name.in_(rows),
+                ),
+            )
+        }
+
+        new_rows: list = []
+        changed_rows: list = []
+        for name, (_, data) in rows.items():
+            product = existing.get(name)
+            if product is None:
+                new_rows.append({**data, "created_by": self.user_id})
+            elif any(getattr(product, field) != data[field] for field in IMPORT_FIELDS):
+                changed_rows.append(
+                    {
+                        **data,
+                        "id": product.id,
+                        "updated_by": self.user_id,
+                        "price_version": product.price_version
+                        + (product.price != data["price"]),
+                    },
+                )
+
+        created_ids: list = []
+        if new_rows:
+            created_ids = db.session.scalars(
+                insert(Product).returning(Product.id, sort_by_parameter_order=True),
+                new_rows,
+            ).all()
+        if changed_rows:
+            db.session.execute(update(Product), changed_rows)
+            connection = db.session.connection()
+            for row in changed_rows:
+                if row["price"] != existing[row["name"]].price:
+                    propagate_price_change(
+                        db.session,
+                        connection,
+                        row["id"],
+                        row["price"],
+                        row["price_version"],
+                    )
+
+        updated_ids: list = [row["id"] for row in changed_rows]
+        return created_ids, updated_ids, len(rows) - len(new_rows) - len(changed_rows)
+
+    def columns(self) -> list:
+        return [getattr(Product, field) for field in IMPORT_FIELDS]
+
+    def invalidate(self, created_ids: list, updated_ids: list) -> None:
+        from store.order.reservations import stock_reservations
+        from store.product.services import catalog_cache
+
+        if not created_ids and not updated_ids:
+            return
+        # New ids may still be cached as not found.
+        product_cache.evict(created_ids + updated_ids)
+        catalog_cache.invalidate()
+        if updated_ids:
+            stock_reservations.invalidate(updated_ids)
+
+    def fail(self, line_number: int, messages) -> None:
+        self.report["failed"] += 1
+        self.add_error(line_number, messages)
+
+    def duplicate(self, line_number: int, replaced_by: int) -> None:
+        self.report["duplicates"] += 1
+        self.add_error(
+            line_number,
+            {"name": [f"Skipped, line {replaced_by} has the same name."]},
+        )
+
+    def add_error(self, line_number: int, messages) -> None:
+        if len(self.report["errors"]) < self.max_errors:
+            self.report["errors"].append({"line": line_number, "errors": messages})
@@ -1,16 +1,37 @@
 import datetime
 
+from sqlalchemy import ColumnElement, func, literal_column
+
 from store.extensions import db
 
 
+def search_document(name, description) -> ColumnElement:
+    """
+    PostgreSQL tsvector of a product, name words weighted above description
+    words. Queries must use this exact expression to hit ix_products_search.
+    """
+    config = literal_column("'english'")
+    return func.setweight(
+        func.to_tsvector(config, name),
+        literal_column("'A'"),
+    ).op("||")(
+        func.setweight(
+            func.to_tsvector(config, func.coalesce(description, literal_column("''"))),
+            literal_column("'B'"),
+        ),
+    )
+
+
 class Product(db.Model):
     __tablename__ = "products"
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False, unique=True)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Float, nullable=False, index=True)
     description = db.Column(db.Text, nullable=True)
     inventory = db.Column(db.Integer, nullable=False)
+    # Bumped on every price change; items record the version they were priced at.
+    price_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
     updated_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.datetime.now)
@@ -26,5 +47,14 @@ class Product(db.Model):
         lazy=True,
     )
 
+    __table_args__ = (
+        # SQLite searches the FTS5 table of store.product.search instead.
+        db.Index(
+            "ix_products_search",
+            search_document(name, description),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
     def __repr__(self):
         return f"<Product(name={self.name}, price={self.price})>"
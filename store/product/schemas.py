@@ -1,7 +1,9 @@
 from marshmallow import Schema, fields
-from marshmallow.validate import Range
+from marshmallow.validate import Length, OneOf, Range
 
 from store.product.models import Product
+from store.serializers import RowSerializer
+from store.settings import PRODUCT_LIST_MAX_PER_PAGE, PRODUCT_LIST_PER_PAGE
 
 
 class ProductSchema(Schema):
@@ -10,6 +12,32 @@ class ProductSchema(Schema):
     price = fields.Float(required=True, validate=Range(min=0))
     description = fields.Str(required=True)
     inventory = fields.Int(required=True, validate=Range(min=1))
+    price_version = fields.Int(dump_only=True)
 
     def create_product(self, data):
         return Product(**data)
+
+
+class ProductListQuerySchema(Schema):
+    # ?page= keeps the legacy offset pagination, everything else is keyset.
+    page = fields.Int(validate=Range(min=1))
+    cursor = fields.Str()
+    per_page = fields.Int(
+        load_default=PRODUCT_LIST_PER_PAGE,
+        validate=Range(min=1, max=PRODUCT_LIST_MAX_PER_PAGE),
+    )
+    sort = fields.Str(load_default="id", validate=OneOf(("id", "name", "price")))
+    include_total = fields.Bool(load_default=False)
+
+
+class ProductSearchQuerySchema(Schema):
+    q = fields.Str(required=True, validate=Length(min=1, max=200))
+    page = fields.Int(load_default=1, validate=Range(min=1))
+    per_page = fields.Int(
+        load_default=PRODUCT_LIST_PER_PAGE,
+        validate=Range(min=1, max=PRODUCT_LIST_MAX_PER_PAGE),
+    )
+
+
+# Read paths select these columns and dump the rows without loading products.
+product_row_serializer = RowSerializer(ProductSchema(), Product)
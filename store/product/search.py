@@ -0,0 +1,108 @@
+import re
+
+from sqlalchemy import (
+    DDL,
+    Select,
+    column,
+    event,
+    func,
+    literal_column,
+    select,
+    table,
+)
+
+from store.product.models import Product, search_document
+
+# Full-text index of product names and descriptions, kept up to date by the
+# database itself on every insert, update and delete of a product: SQLite
+# indexes them in the FTS5 table products_fts, filled by triggers, and
+# PostgreSQL in the GIN index ix_products_search of the model. Both stem
+# English words, and a match in the name ranks higher than one in the
+# description.
+SEARCH_TABLE = "products_fts"
+SEARCH_TABLE_DDL = (
+    "CREATE VIRTUAL TABLE products_fts USING fts5("
+    "name, description, content='products', content_rowid='id', "
+    "tokenize='porter unicode61 remove_diacritics 2')",
+    # bm25 weights of the name and the description columns.
+    "INSERT INTO products_fts(products_fts, rank) "
+    "VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER products_fts_update AFTER UPDATE OF name, description "
+    "ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO products_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+)
+search_table = table(SEARCH_TABLE, column("rowid"), column("rank"))
+document = search_document(Product.name, Product.description)
+
+for statement in SEARCH_TABLE_DDL:
+    event.listen(
+        Product.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    Product.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {SEARCH_TABLE}").execute_if(dialect="sqlite"),
+)
+
+
+def search_terms(text: str) -> list:
+    return re.findall(r"\w+", text.lower())
+
+
+def search_query(
+    columns: list,
+    text: str,
+    dialect: str,
+    limit: int,
+    offset: int = 0,
+) -> Select | None:
+    """
+    Select ``columns`` of a page of the products matching every word of
+    ``text``, best match first, or None when ``text`` has no words to look
+    for.
+    """
+    terms: list = search_terms(text)
+    if not terms:
+        return None
+
+    if dialect == "postgresql":
+        query = func.plainto_tsquery(literal_column("'english'"), " ".join(terms))
+        return (
+            select(*columns)
+            .where(document.op("@@")(query))
+            .order_by(func.ts_rank(document, query).desc(), Product.id)
+            .limit(limit)
+            .offset(offset)
+        )
+
+    # Every match has to be ranked, so the page is cut from the index alone
+    # and only its rows are then read from products. Every term is quoted,
+    # so words like AND or NEAR aren't read as operators.
+    matches = (
+        select(search_table.c.rowid, search_table.c.rank)
+        .where(
+            literal_column(SEARCH_TABLE).op("MATCH")(
+                " ".join(f'"{term}"' for term in terms),
+            ),
+        )
+        .order_by(search_table.c.rank, search_table.c.rowid)
+        .limit(limit)
+        .offset(offset)
+        .subquery("matches")
+    )
+    return (
+        select(*columns)
+        .join_from(matches, Product, Product.id == matches.c.rowid)
+        .order_by(matches.c.rank, Product.id)
+    )
@@ -1,19 +1,39 @@
+from collections.abc import Iterator
 from http import HTTPStatus
+from pathlib import Path
 
-from flask import abort, request
+from flask import Response, abort, request
 from marshmallow import ValidationError
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.exc import IntegrityError
+from werkzeug.datastructures import FileStorage  # noqa: TC002
 
+from store.caching import CacheNamespace
+from store.db_routing import read_only, replica_reads
 from store.exceptions import ConflictIntegrityError
+from store.exports import export_response
 from store.extensions import db
+from store.pagination import decode_cursor, encode_cursor
+from store.product.cache import NOT_FOUND, product_cache
+from store.product.imports import ProductImporter, import_format, read_records
 from store.product.models import Product
-from store.product.schemas import ProductSchema
-from store.user.models import User
+from store.product.schemas import ProductSchema, product_row_serializer
+from store.product.search import search_query
+from store.settings import (
+    EXPORT_CHUNK_SIZE,
+    PRODUCT_LIST_CACHE_TIMEOUT,
+    PRODUCT_TOTAL_CACHE_TIMEOUT,
+)
+from store.user.identity import UserIdentity
 from store.validators import exists_row
 
+catalog_cache = CacheNamespace("catalog")
+# JSON types a list cursor may hold for each sort column.
+SORT_VALUE_TYPES: dict = {"id": int, "name": str, "price": (int, float)}
+
 
 class ProductService:
-    def add_product(self, product_data: dict, user: User) -> dict:
+    def add_product(self, product_data: dict, user: UserIdentity) -> dict:
         add_product_schema = ProductSchema()
         valid_data: dict = add_product_schema.load(product_data)
         product: Product = add_product_schema.create_product(valid_data)
@@ -27,16 +47,35 @@ class ProductService:
         product.created_by = user.id
         db.session.add(product)
         db.session.commit()
-        return add_product_schema.dump(product)
+        data_product: dict = add_product_schema.dump(product)
+        product_cache.set(data_product)
+        catalog_cache.invalidate()
+        return data_product
+
+    @read_only
+    def list_products(self, args: dict) -> dict:
+        return catalog_cache.get_or_set(
+            ("list", *sorted(args.items())),
+            lambda: self.query_list_products(args),
+            timeout=PRODUCT_LIST_CACHE_TIMEOUT,
+        )
 
-    def list_products(self) -> dict:
-        product_schema = ProductSchema()
+    def query_list_products(self, args: dict) -> dict:
+        if args.get("page") is not None:
+            return self.pagination_list_products(args.get("page"))
+        return self.cursor_list_products(
+            cursor=args.get("cursor"),
+            per_page=args.get("per_page"),
+            sort=args.get("sort"),
+            include_total=args.get("include_total"),
+        )
+
+    def pagination_list_products(self, page: int) -> dict:
         # https://flask-sqlalchemy.readthedocs.io/en/stable/api/#flask_sqlalchemy.pagination.Pagination
-        page = int(
-            request.args.get("page", 1),
-        )  # default is "1" and for ex: /?page=<number>
         per_page = 10
-        pagination = Product.query.paginate(
+        pagination = Product.query.with_entities(
+            *product_row_serializer.columns,
+        ).paginate(
             page=page,
             per_page=per_page,
             error_out=False,
@@ -48,13 +87,184 @@ class ProductService:
             "total_pages": pagination.pages,
             "has_next": pagination.has_next,
             "has_prev": pagination.has_prev,
-            "products": [product_schema.dump(product) for product in pagination.items],
+            "products": product_row_serializer.dump_many(pagination.items),
         }
 
+    def cursor_list_products(
+        self,
+        cursor: str | None,
+        per_page: int,
+        sort: str,
+        *args,
+        include_total: bool,
+    ) -> dict:
+        """
+        Keyset pagination on (sort, id), so deep pages cost the same as the
+        first one and no COUNT(*) runs unless the total is asked for.
+        """
+        sort_column = getattr(Product, sort)
+        query = (
+            select(*product_row_serializer.columns)
+            .order_by(sort_column, Product.id)
+            .limit(per_page + 1)
+        )
+        if cursor:
+            sort_value, product_id = decode_cursor(
+                cursor,
+                SORT_VALUE_TYPES[sort],
+                int,
+            )
+            # A row value comparison, unlike the equivalent OR, can seek
+            # straight into the (sort, id) order of the index.
+            query = query.where(
+                tuple_(sort_column, Product.id) > tuple_(sort_value, product_id),
+            )
+
+        products: list = db.session.execute(query).all()
+        has_next: bool = len(products) > per_page
+        products = products[:per_page]
+        next_cursor: str | None = None
+        if has_next:
+            last_product = products[-1]
+            next_cursor = encode_cursor(
+                [getattr(last_product, sort), last_product.id],
+            )
+
+        result: dict = {
+            "per_page": per_page,
+            "sort": sort,
+            "has_next": has_next,
+            "next_cursor": next_cursor,
+            "products": product_row_serializer.dump_many(products),
+        }
+        if include_total:
+            result["total_products"] = self.total_products()
+        return result
+
+    @read_only
+    def search_products(self, args: dict) -> dict:
+        return catalog_cache.get_or_set(
+            ("search", *sorted(args.items())),
+            lambda: self.query_search_products(
+                args.get("q"),
+                args.get("page"),
+                args.get("per_page"),
+            ),
+            timeout=PRODUCT_LIST_CACHE_TIMEOUT,
+        )
+
+    def query_search_products(self, text: str, page: int, per_page: int) -> dict:
+        """
+        Products matching every word of ``text`` in their name or
+        description, best match first, read from the full-text index.
+        """
+        query = search_query(
+            product_row_serializer.columns,
+            text,
+            # Not session.get_bind(), which would pin the request to the primary.
+            db.engine.dialect.name,
+            limit=per_page + 1,
+            offset=(page - 1) * per_page,
+        )
+        products: list = db.session.execute(query).all() if query is not None else []
+        return {
+            "page": page,
+            "per_page": per_page,
+            "has_next": len(products) > per_page,
+            "products": product_row_serializer.dump_many(products[:per_page]),
+        }
+
+    def total_products(self) -> int:
+        """Exact count, cached for a short while to keep it off the hot path."""
+        return catalog_cache.get_or_set(
+            ("total",),
+            lambda: db.session.scalar(select(func.count(Product.id))),
+            timeout=PRODUCT_TOTAL_CACHE_TIMEOUT,
+        )
+
+    @read_only
     def product(self, product_id: int) -> dict:
-        product: Product = self.find_product(product_id)
-        product_schema = ProductSchema()
-        return product_schema.dump(product)
+        cached_product: dict | str | None = product_cache.get(product_id)
+        if cached_product == NOT_FOUND:
+            self.abort_product_not_found(product_id)
+        if cached_product:
+            return cached_product
+
+        reads: int = replica_reads()
+        row = db.session.execute(
+            select(*product_row_serializer.columns).where(Product.id == product_id),
+        ).first()
+        from_replica: bool = replica_reads() > reads
+        if not row:
+            product_cache.fill([], [product_id], from_replica=from_replica)
+            self.abort_product_not_found(product_id)
+        data_product: dict = product_row_serializer.dump(row)
+        product_cache.fill([data_product], [], from_replica=from_replica)
+        return data_product
+
+    @read_only
+    def products(self, product_ids: list) -> dict:
+        """
+        Serialized products by id in the order of ``product_ids``, read with
+        one MGET and one IN query for the cache misses. Unknown ids are left
+        out of the result.
+        """
+        cached_products: dict = product_cache.get_many(product_ids)
+        missing_ids: list = [
+            product_id
+            for product_id in product_ids
+            if product_id not in cached_products
+        ]
+        if missing_ids:
+            reads: int = replica_reads()
+            data_products: list = product_row_serializer.dump_many(
+                db.session.execute(
+                    select(*product_row_serializer.columns).where(
+                        Product.id.in_(missing_ids),
+                    ),
+                ).all(),
+            )
+            cached_products.update(
+                {data_product["id"]: data_product for data_product in data_products},
+            )
+            product_cache.fill(
+                data_products,
+                [
+                    product_id
+                    for product_id in missing_ids
+                    if product_id not in cached_products
+                ],
+                from_replica=replica_reads() > reads,
+            )
+        return {
+            product_id: cached_products[product_id]
+            for product_id in product_ids
+            if cached_products.get(product_id, NOT_FOUND) != NOT_FOUND
+        }
+
+    def export_products(self, args: dict) -> Response:
+        """The catalog, filtered by creation date, streamed as NDJSON or CSV."""
+        return export_response(
+            self.export_product_batches(args),
+            args.get("format"),
+            "products",
+            columns=product_row_serializer.keys,
+        )
+
+    @read_only
+    def export_product_batches(self, args: dict) -> Iterator[list]:
+        query = (
+            select(*product_row_serializer.columns)
+            .order_by(Product.id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        if args.get("created_from"):
+            query = query.where(Product.created_at >= args.get("created_from"))
+        if args.get("created_to"):
+            query = query.where(Product.created_at < args.get("created_to"))
+
+        for rows in db.session.execute(query).partitions():
+            yield product_row_serializer.dump_many(rows)
 
     def delete(self, product_id: int) -> None:
         product: Product = self.find_product(product_id)
@@ -64,8 +274,11 @@ class ProductService:
         except IntegrityError as error:
             db.session.rollback()
             raise ConflictIntegrityError from error
+        product_cache.evict([product_id])
+        catalog_cache.invalidate()
+        self.invalidate_stock_counter(product_id)
 
-    def full_update(self, data: dict, product_id: int, user: User) -> dict:
+    def full_update(self, data: dict, product_id: int, user: UserIdentity) -> dict:
         update_product_schema = ProductSchema()
         valid_data: dict = update_product_schema.load(data)
 
@@ -78,13 +291,52 @@ class ProductService:
             setattr(product, field, value)
         product.updated_by = user.id
         db.session.commit()
-        return update_product_schema.dump(product)
+        data_product: dict = update_product_schema.dump(product)
+        product_cache.set(data_product)
+        catalog_cache.invalidate()
+        self.invalidate_stock_counter(product_id)
+        return data_product
+
+    def import_products(self, user: UserIdentity) -> dict:
+        """
+        Upsert the products of the uploaded CSV or JSON Lines file, sent as
+        the multipart field ``file`` or as the request body, without reading
+        it whole into memory.
+        """
+        upload: FileStorage | None = request.files.get("file")
+        stream, filename, mimetype = (
+            (upload.stream, upload.filename or "", upload.mimetype)
+            if upload
+            else (request.stream, "", request.mimetype)
+        )
+        file_format: str | None = import_format(
+            request.args.get("format", ""),
+            Path(filename).suffix.lower(),
+            mimetype,
+        )
+        if file_format is None:
+            abort(
+                HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                description="Upload a .csv or .jsonl file, or pass ?format=csv|jsonl.",
+            )
+        return ProductImporter(user.id).run(read_records(stream, file_format))
+
+    def cache_stats(self) -> dict:
+        return catalog_cache.stats()
 
     def find_product(self, product_id: int) -> Product:
         product: Product | None = Product.query.filter_by(id=product_id).first()
         if not product:
-            abort(
-                HTTPStatus.NOT_FOUND,
-                description=f"Product with product_id {product_id} not found.",
-            )
+            self.abort_product_not_found(product_id)
         return product
+
+    def abort_product_not_found(self, product_id: int) -> None:
+        abort(
+            HTTPStatus.NOT_FOUND,
+            description=f"Product with product_id {product_id} not found.",
+        )
+
+    def invalidate_stock_counter(self, product_id: int) -> None:
+        from store.order.reservations import stock_reservations
+
+        stock_reservations.invalidate([product_id])
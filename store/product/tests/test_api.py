@@ -1,7 +1,11 @@
+from datetime import datetime
 from http import HTTPStatus
 
+from store.enums import OrderStatusEnum
 from store.order.models import Order
+from store.pagination import encode_cursor
 from store.product.models import Product
+from store.tasks import reprice_product_pending_orders
 
 
 class TestProductApi:
@@ -195,3 +199,313 @@ class TestProductApi:
         assert response_update_product.status_code == HTTPStatus.OK
         assert new_order.total_price == new_calculate_total_price
         assert product2.price == new_data_product2.get("price", 0)
+
+    def test_product_update_reprices_only_pending_orders(  # noqa: PLR0913
+        self,
+        client,
+        db,
+        auth_headers,
+        order_factory,
+        order_item_factory,
+        product_factory,
+        admin_user,
+    ):
+        headers = auth_headers(admin_user)
+        product1 = product_factory(name="P1", price=10, inventory=10)
+        product2 = product_factory(name="P2", price=20, inventory=10)
+        pending = order_factory(user_id=admin_user.id, is_flush=True)
+        confirmed = order_factory(
+            user_id=admin_user.id,
+            status=OrderStatusEnum.CONFIRMED.name,
+            is_flush=True,
+        )
+        for order in (pending, confirmed):
+            order_item_factory(order_id=order.id, product=product1, quantity=2)
+            order_item_factory(order_id=order.id, product=product2, quantity=1)
+            order.total_price = 40
+        db.session.commit()
+
+        response = client.put(
+            f"/api/v1/products/{product1.id}",
+            headers=headers,
+            json={
+                "name": "P1 repriced",
+                "price": 15,
+                "inventory": 10,
+                "description": "",
+            },
+        )
+        db.session.expire_all()
+
+        assert response.status_code == HTTPStatus.OK
+        assert db.session.get(Order, pending.id).total_price == 50  # noqa: PLR2004
+        assert db.session.get(Order, confirmed.id).total_price == 40  # noqa: PLR2004
+        assert {item.product_price for item in confirmed.items} == {10, 20}
+
+    def test_deferred_price_changes_are_coalesced(  # noqa: PLR0913
+        self,
+        app,
+        client,
+        db,
+        auth_headers,
+        order_factory,
+        order_item_factory,
+        product_factory,
+        admin_user,
+        monkeypatch,
+    ):
+        headers = auth_headers(admin_user)
+        app.config["PRICE_PROPAGATION_MODE"] = "deferred"
+        scheduled = []
+        monkeypatch.setattr(
+            reprice_product_pending_orders,
+            "apply_async",
+            lambda args, countdown: scheduled.append(args),
+        )
+        product = product_factory(name="P1", price=10, inventory=10)
+        order = order_factory(user_id=admin_user.id, total_price=20, is_flush=True)
+        order_item_factory(order_id=order.id, product=product, quantity=2)
+        db.session.commit()
+
+        for price in (11, 12, 13):
+            client.put(
+                f"/api/v1/products/{product.id}",
+                headers=headers,
+                json={
+                    "name": f"P1 at {price}",
+                    "price": price,
+                    "inventory": 10,
+                    "description": "",
+                },
+            )
+        db.session.expire_all()
+        total_before_job = db.session.get(Order, order.id).total_price
+        repriced = reprice_product_pending_orders(product.id)
+        db.session.expire_all()
+        repriced_order = db.session.get(Order, order.id)
+
+        assert scheduled == [(product.id,)]
+        assert total_before_job == 20  # noqa: PLR2004
+        assert repriced == 1
+        assert repriced_order.total_price == 26  # noqa: PLR2004
+        assert repriced_order.items[0].price_version == product.price_version == 3  # noqa: PLR2004
+
+    def test_list_products_with_cursor(self, client, product_factory):
+        products = [
+            product_factory(price=30),
+            product_factory(price=10),
+            product_factory(price=20),
+        ]
+
+        first_page = client.get(
+            "/api/v1/products/?per_page=2&sort=price&include_total=true",
+        ).get_json()
+        second_page = client.get(
+            f"/api/v1/products/?per_page=2&sort=price&cursor={first_page['next_cursor']}",
+        ).get_json()
+        legacy_page = client.get("/api/v1/products/?page=1").get_json()
+
+        assert [product["id"] for product in first_page["products"]] == [
+            products[1].id,
+            products[2].id,
+        ]
+        assert first_page["has_next"] is True
+        assert first_page["total_products"] == 3  # noqa: PLR2004
+        assert [product["id"] for product in second_page["products"]] == [
+            products[0].id,
+        ]
+        assert second_page["has_next"] is False
+        assert "total_products" not in second_page
+        assert legacy_page["total_products"] == 3  # noqa: PLR2004
+
+    def test_list_products_invalid_cursor(self, client):
+        responses = [
+            client.get(f"/api/v1/products/?sort={sort}&cursor={encode_cursor(values)}")
+            for sort, values in (
+                ("id", ["1", 2]),
+                ("name", [{"name": "x"}, 2]),
+                ("price", [True, 2]),
+                ("price", [1.5, None]),
+            )
+        ]
+
+        assert [response.status_code for response in responses] == [
+            HTTPStatus.BAD_REQUEST,
+        ] * 4
+
+    def test_list_products_per_page_is_capped(self, client):
+        response = client.get("/api/v1/products/?per_page=100000")
+
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    def test_product_write_invalidates_list_cache(
+        self,
+        client,
+        admin_user,
+        auth_headers,
+        product,
+    ):
+        headers = auth_headers(admin_user)
+        data = {
+            "name": "Fresh Product",
+            "price": 5.5,
+            "description": "Added after the list was cached",
+            "inventory": 3,
+        }
+
+        client.get("/api/v1/products/")
+        cached_page = client.get("/api/v1/products/").get_json()
+        client.post("/api/v1/products/", json=data, headers=headers)
+        fresh_page = client.get("/api/v1/products/").get_json()
+        stats = client.get("/api/v1/products/cache-stats", headers=headers).get_json()
+
+        assert len(cached_page["products"]) == 1
+        assert len(fresh_page["products"]) == 2  # noqa: PLR2004
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2  # noqa: PLR2004
+        assert stats["invalidations"] == 1
+
+    def test_list_cache_hit_is_one_round_trip(self, app, client, product, monkeypatch):
+        from store.extensions import cache
+        from store.product.services import catalog_cache
+
+        app.config["CACHE_STATS_FLUSH_INTERVAL"] = 60
+        client.get("/api/v1/products/")
+        calls: list = []
+        nested: list = []
+
+        def counted(method, original):
+            # SimpleCache.get_many calls get per key; RedisCache sends one MGET.
+            def call(*args, **kwargs):
+                if not nested:
+                    calls.append(method)
+                nested.append(method)
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    nested.pop()
+
+            return call
+
+        for method in ("get", "get_many", "has", "set", "inc", "add"):
+            monkeypatch.setattr(
+                cache.cache,
+                method,
+                counted(method, getattr(cache.cache, method)),
+            )
+
+        response = client.get("/api/v1/products/")
+        monkeypatch.undo()
+        stats = catalog_cache.stats()
+
+        assert response.status_code == HTTPStatus.OK
+        assert calls == ["get_many"]
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_get_product_write_through_cache(
+        self,
+        client,
+        db,
+        admin_user,
+        auth_headers,
+        product,
+    ):
+        headers = auth_headers(admin_user)
+        product_id = product.id
+        original_price = product.price
+        update_data = {
+            "name": "Cached Product",
+            "price": 12.5,
+            "description": "Updated through the API",
+            "inventory": 7,
+        }
+
+        client.get(f"/api/v1/products/{product_id}")
+        db.session.execute(
+            db.update(Product).where(Product.id == product_id).values(price=1),
+        )
+        cached_product = client.get(f"/api/v1/products/{product_id}").get_json()
+        client.put(f"/api/v1/products/{product_id}", json=update_data, headers=headers)
+        updated_product = client.get(f"/api/v1/products/{product_id}").get_json()
+        client.delete(f"/api/v1/products/{product_id}", headers=headers)
+        deleted_response = client.get(f"/api/v1/products/{product_id}")
+
+        assert cached_product["price"] == original_price
+        assert updated_product["name"] == update_data["name"]
+        assert updated_product["price"] == update_data["price"]
+        assert deleted_response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_get_many_products_from_cache(self, app, product_factory):
+        from store.product.services import ProductService
+
+        product_service = ProductService()
+        products = [product_factory(), product_factory()]
+        product_ids = [product.id for product in products]
+
+        # The cached product is asked for last and still comes back last.
+        product_service.product(product_ids[0])
+        data_products = product_service.products([product_ids[1], 9999, product_ids[0]])
+
+        assert list(data_products) == [product_ids[1], product_ids[0]]
+        assert data_products[product_ids[1]]["name"] == products[1].name
+
+    def test_evict_products_missing_from_cache(self, app, product_factory):
+        from store.product.cache import product_cache
+        from store.product.services import ProductService
+
+        products = [product_factory(), product_factory()]
+        ProductService().product(products[1].id)
+
+        product_cache.evict([products[0].id, products[1].id])
+
+        assert product_cache.get(products[1].id) is None
+
+    def test_list_products_json_matches_stdlib_encoding(
+        self,
+        app,
+        client,
+        product_factory,
+        monkeypatch,
+    ):
+        from store import json_provider
+
+        product_factory(name="Desk", price=120.5)
+        product_factory(name="Lamp", price=19.99)
+        payloads: list = [
+            {"name": "Desk", "created_at": datetime(2026, 1, 2, 3, 4)},  # noqa: DTZ001
+            {"counts": {10: "ten", 2: "two"}, "status": OrderStatusEnum.PENDING},
+        ]
+
+        def encode() -> list:
+            with app.app_context():
+                return [
+                    client.get("/api/v1/products/").get_data(),
+                    *(app.json.dumps(payload) for payload in payloads),
+                    *(app.json.response(payload).get_data() for payload in payloads),
+                ]
+
+        orjson_bodies = encode()
+        monkeypatch.setattr(json_provider, "orjson", None)
+        stdlib_bodies = encode()
+
+        assert orjson_bodies == stdlib_bodies
+        assert (
+            orjson_bodies[2] == '{"counts":{"2":"two","10":"ten"},"status":"Pending"}'
+        )
+
+    def test_product_read_paths_match_schema_dump(self, client, product_factory):
+        from store.product.schemas import ProductSchema
+
+        products = [
+            product_factory(name="Desk", price=120.5, description=None),
+            product_factory(name="Lamp", price=19.99),
+        ]
+        expected: list = ProductSchema(many=True).dump(products)
+
+        cursor_page = client.get("/api/v1/products/").get_json()
+        legacy_page = client.get("/api/v1/products/?page=1").get_json()
+        single_product = client.get(f"/api/v1/products/{products[0].id}").get_json()
+
+        assert cursor_page["products"] == expected
+        assert legacy_page["products"] == expected
+        assert single_product == expected[0]
@@ -0,0 +1,195 @@
+import io
+from http import HTTPStatus
+
+from store.commands import import_products
+from store.product.imports import ProductImporter, read_records
+from store.product.models import Product
+
+CSV = b"""name,price,description,inventory
+Kept,10.0,Same as stored,5
+Repriced,25.5,New price,7
+Fresh,3.0,A new product,2
+Broken,-1,Negative price,2
+"""
+
+
+class TestProductImport:
+    def test_import_csv_upserts_by_name(  # noqa: PLR0913
+        self,
+        client,
+        db,
+        admin_user,
+        auth_headers,
+        product_factory,
+        order_factory,
+        order_item_factory,
+    ):
+        kept = product_factory(
+            name="Kept",
+            price=10.0,
+            description="Same as stored",
+            inventory=5,
+        )
+        repriced = product_factory(name="Repriced", price=20.0, inventory=1)
+        order = order_factory(user_id=admin_user.id, is_flush=True)
+        order_item_factory(order_id=order.id, product=repriced, quantity=2)
+        order.total_price = 40
+        db.session.commit()
+
+        response = client.post(
+            "/api/v1/products/import",
+            headers=auth_headers(admin_user),
+            data={"file": (io.BytesIO(CSV), "products.csv")},
+        )
+        db.session.expire_all()
+
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        report = response.get_json()
+        assert {key: report[key] for key in ("created", "updated", "unchanged")} == {
+            "created": 1,
+            "updated": 1,
+            "unchanged": 1,
+        }
+        assert report["failed"] == 1
+        assert report["errors"][0]["line"] == 5  # noqa: PLR2004
+        assert "price" in report["errors"][0]["errors"]
+        assert kept.price_version == 0
+        assert repriced.price == 25.5  # noqa: PLR2004
+        assert repriced.inventory == 7  # noqa: PLR2004
+        assert repriced.price_version == 1
+        assert repriced.updated_by == admin_user.id
+        assert order.total_price == 51.0  # noqa: PLR2004
+        assert order.items[0].price_version == 1
+        fresh = Product.query.filter_by(name="Fresh").one()
+        assert fresh.created_by == admin_user.id
+        assert client.get(f"/api/v1/products/{fresh.id}").get_json()["price"] == 3.0  # noqa: PLR2004
+
+    def test_import_jsonl_body(self, client, db, admin_user, auth_headers):
+        body = (
+            b'{"name": "A", "price": 1, "description": "", "inventory": 1}\n'
+            b"\n"
+            b"not json\n"
+        )
+
+        response = client.post(
+            "/api/v1/products/import",
+            headers=auth_headers(admin_user),
+            data=body,
+            content_type="application/x-ndjson",
+        )
+
+        report = response.get_json()
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        assert report["created"] == 1
+        assert report["errors"] == [
+            {"line": 3, "errors": {"_schema": ["Invalid input type."]}},
+        ]
+
+    def test_import_requires_known_format(self, client, db, admin_user, auth_headers):
+        response = client.post(
+            "/api/v1/products/import",
+            headers=auth_headers(admin_user),
+            data=b"name\n",
+            content_type="application/octet-stream",
+        )
+
+        assert response.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+
+    def test_import_requires_admin(self, client, db, user_store, auth_headers):
+        response = client.post(
+            "/api/v1/products/import",
+            headers=auth_headers(user_store),
+            data=CSV,
+            content_type="text/csv",
+        )
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_import_in_chunks(self, db):
+        records = read_records(
+            io.BytesIO(
+                b"".join(
+                    b'{"name": "P%d", "price": %d, "description": "", "inventory": 1}\n'
+                    % (index % 3, index)
+                    for index in range(1, 8)
+                )
+                + b'{"name": "Broken", "price": -1}\n' * 2,
+            ),
+            "jsonl",
+        )
+
+        report = ProductImporter(None, chunk_size=2, max_errors=1).run(records)
+
+        assert report == {
+            "created": 3,
+            "updated": 4,
+            "unchanged": 0,
+            "failed": 2,
+            "duplicates": 0,
+            "errors": [report["errors"][0]],
+        }
+        assert report["errors"][0]["line"] == 8  # noqa: PLR2004
+        assert [
+            (product.name, product.price, product.price_version)
+            for product in Product.query.order_by(Product.name)
+        ] == [("P0", 6.0, 1), ("P1", 7.0, 2), ("P2", 5.0, 1)]
+
+    def test_import_reports_duplicate_names_in_a_chunk(self, db):
+        records = read_records(
+            io.BytesIO(
+                b"".join(
+                    b'{"name": "%s", "price": %d, "description": "", "inventory": 1}\n'
+                    % (name, index)
+                    for index, name in enumerate((b"Lamp", b"Desk", b"Lamp", b"Lamp"))
+                ),
+            ),
+            "jsonl",
+        )
+
+        report = ProductImporter(None).run(records)
+
+        assert (report["created"], report["duplicates"]) == (2, 2)
+        assert report["errors"] == [
+            {"line": 1, "errors": {"name": ["Skipped, line 3 has the same name."]}},
+            {"line": 3, "errors": {"name": ["Skipped, line 4 has the same name."]}},
+        ]
+        assert Product.query.filter_by(name="Lamp").one().price == 3  # noqa: PLR2004
+
+    def test_import_products_command(self, app, db, tmp_path):
+        path = tmp_path / "products.csv"
+        path.write_bytes(CSV)
+
+        result = app.test_cli_runner().invoke(import_products, [str(path)])
+
+        assert result.exit_code == 0, result.output
+        assert "line 5:" in result.output
+        assert (
+            "3 created, 0 updated, 0 unchanged, 1 failed, 0 duplicates."
+            in result.output
+        )
+        assert Product.query.count() == 3  # noqa: PLR2004
+
+    def test_exported_csv_imports_unchanged(
+        self,
+        client,
+        db,
+        admin_user,
+        auth_headers,
+        product_factory,
+    ):
+        product_factory(price=12.5)
+        product_factory(description='Quoted, "on" purpose')
+        headers = auth_headers(admin_user)
+
+        export = client.get("/api/v1/products/export?format=csv", headers=headers)
+        response = client.post(
+            "/api/v1/products/import",
+            headers=headers,
+            data=export.get_data(),
+            content_type="text/csv",
+        )
+
+        assert export.headers["Content-Disposition"] == (
+            'attachment; filename="products.csv"'
+        )
+        assert response.get_json()["unchanged"] == 2  # noqa: PLR2004
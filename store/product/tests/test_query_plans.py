@@ -0,0 +1,49 @@
+from http import HTTPStatus
+
+
+class TestProductQueryPlans:
+    def test_product_queries_use_indexes(  # noqa: PLR0913
+        self,
+        client,
+        db,
+        admin_user,
+        auth_headers,
+        product_factory,
+        order_factory,
+        order_item_factory,
+        query_plans,
+    ):
+        headers = auth_headers(admin_user)
+        products = [product_factory(inventory=10) for _ in range(3)]
+        order = order_factory(user_id=admin_user.id, is_flush=True)
+        order_item_factory(order_id=order.id, product=products[0])
+        db.session.commit()
+
+        responses: list = []
+        for sort in ("id", "name", "price"):
+            first_page = client.get(f"/api/v1/products/?per_page=1&sort={sort}")
+            responses += [
+                first_page,
+                client.get(
+                    f"/api/v1/products/?per_page=1&sort={sort}"
+                    f"&cursor={first_page.get_json()['next_cursor']}",
+                ),
+            ]
+        responses += [
+            client.get(f"/api/v1/products/{products[0].id}"),
+            client.put(
+                f"/api/v1/products/{products[0].id}",
+                json={
+                    "name": "Repriced",
+                    "price": 1.5,
+                    "description": "Repriced product",
+                    "inventory": 5,
+                },
+                headers=headers,
+            ),
+            client.delete(f"/api/v1/products/{products[1].id}", headers=headers),
+        ]
+
+        assert [response.status_code for response in responses] == [HTTPStatus.OK] * 9
+        assert order.items[0].product_price == 1.5  # noqa: PLR2004
+        assert query_plans.table_scans() == []
@@ -0,0 +1,140 @@
+from http import HTTPStatus
+
+import pytest
+from flask import g
+from sqlalchemy import event, insert, update
+
+from store.app import create_app
+from store.conftest import TestingConfig
+from store.db_routing import REPLICA_BIND_KEY, replica_health
+from store.extensions import db as _db
+from store.product.cache import product_cache
+from store.product.models import Product
+from store.product.services import ProductService, catalog_cache
+
+
+@pytest.fixture
+def app(tmp_path):
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        SQLALCHEMY_BINDS = {REPLICA_BIND_KEY: f"sqlite:///{tmp_path / 'replica.db'}"}
+
+    app = create_app(config_obj=ReplicaConfig)
+    with app.app_context():
+        yield app
+        _db.engines[REPLICA_BIND_KEY].dispose()
+    # init_app registers a metadata per bind on the shared extension; other
+    # tests' apps have no replica to create its tables on.
+    _db.metadatas.pop(REPLICA_BIND_KEY, None)
+
+
+@pytest.fixture
+def replica_product(db, product_factory):
+    product = product_factory(name="Primary copy")
+    replica = db.engines[REPLICA_BIND_KEY]
+    db.metadata.create_all(replica)
+    with replica.begin() as connection:
+        connection.execute(
+            insert(Product),
+            {
+                "id": product.id,
+                "name": "Replica copy",
+                "price": product.price,
+                "inventory": product.inventory,
+            },
+        )
+    # The factory wrote through the test's app context and session, which
+    # every test client request shares; start the "request" afresh.
+    db.session.remove()
+    g.pop("db_primary_pinned", None)
+    replica_health.reset()
+    yield product
+    replica_health.reset()
+
+
+class TestReadReplica:
+    def test_read_only_methods_use_replica(self, client, replica_product):
+        response = client.get(f"/api/v1/products/{replica_product.id}")
+
+        assert response.get_json()["name"] == "Replica copy"
+
+    def test_unhealthy_replica_falls_back_to_primary(
+        self,
+        client,
+        replica_product,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(replica_health, "check", lambda engine, max_lag: False)
+
+        response = client.get(f"/api/v1/products/{replica_product.id}")
+
+        assert response.get_json()["name"] == "Primary copy"
+
+    def test_reads_stick_to_primary_after_a_write(self, db, replica_product):
+        product_service = ProductService()
+
+        before_write = product_service.products([replica_product.id])
+        db.session.execute(
+            update(Product)
+            .where(Product.id == replica_product.id)
+            .values(inventory=replica_product.inventory + 1),
+        )
+        db.session.commit()
+        product_cache.evict([replica_product.id])
+        after_write = product_service.products([replica_product.id])
+
+        assert before_write[replica_product.id]["name"] == "Replica copy"
+        assert after_write[replica_product.id]["name"] == "Primary copy"
+
+    def test_replica_reads_are_not_cached_right_after_a_write(
+        self,
+        client,
+        replica_product,
+    ):
+        # The replica still has the product as it was before the write.
+        product_cache.evict([replica_product.id])
+        catalog_cache.invalidate()
+
+        product_response = client.get(f"/api/v1/products/{replica_product.id}")
+        client.get("/api/v1/products/")
+        client.get("/api/v1/products/")
+
+        assert product_response.get_json()["name"] == "Replica copy"
+        assert product_cache.get(replica_product.id) is None
+        assert catalog_cache.stats()["misses"] == 2  # noqa: PLR2004
+
+    def test_replica_reads_are_cached_outside_the_lag_window(
+        self,
+        client,
+        replica_product,
+    ):
+        client.get(f"/api/v1/products/{replica_product.id}")
+        client.get("/api/v1/products/")
+        client.get("/api/v1/products/")
+
+        assert product_cache.get(replica_product.id)["name"] == "Replica copy"
+        assert catalog_cache.stats()["misses"] == 1
+
+    def test_streamed_exports_use_replica(self, replica_product):
+        batches = list(ProductService().export_product_batches({}))
+
+        assert [product["name"] for product in batches[0]] == ["Replica copy"]
+        assert not g.get("db_read_only")
+
+    def test_search_never_touches_primary(self, client, db, replica_product):
+        primary_statements: list = []
+        event.listen(
+            db.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: primary_statements.append(
+                statement,
+            ),
+        )
+
+        response = client.get("/api/v1/products/search?q=copy")
+
+        assert response.status_code == HTTPStatus.OK
+        assert [product["name"] for product in response.get_json()["products"]] == [
+            "Replica copy",
+        ]
+        assert primary_statements == []
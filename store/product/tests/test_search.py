@@ -0,0 +1,110 @@
+from http import HTTPStatus
+
+from store.product.models import Product
+
+
+class TestProductSearch:
+    def test_search_ranks_name_matches_first(self, client, product_factory):
+        in_description = product_factory(
+            name="Walking boots",
+            description="Waterproof running shoes for trails",
+        )
+        in_name = product_factory(name="Running shoe", description="Light")
+        product_factory(name="Running jacket", description="Warm")
+
+        response = client.get("/api/v1/products/search?q=Running%20SHOES")
+
+        assert response.status_code == HTTPStatus.OK
+        assert [product["id"] for product in response.get_json()["products"]] == [
+            in_name.id,
+            in_description.id,
+        ]
+
+    def test_search_is_paginated(self, client, product_factory):
+        products = [
+            product_factory(name=f"Desk lamp {index}", description="Lamp")
+            for index in range(3)
+        ]
+
+        first_page = client.get("/api/v1/products/search?q=lamp&per_page=2")
+        second_page = client.get("/api/v1/products/search?q=lamp&per_page=2&page=2")
+
+        assert first_page.get_json()["has_next"] is True
+        assert second_page.get_json() == {
+            "page": 2,
+            "per_page": 2,
+            "has_next": False,
+            "products": [second_page.get_json()["products"][0]],
+        }
+        assert [
+            product["id"]
+            for page in (first_page, second_page)
+            for product in page.get_json()["products"]
+        ] == [product.id for product in products]
+
+    def test_search_index_follows_product_writes(
+        self,
+        client,
+        db,
+        admin_user,
+        auth_headers,
+    ):
+        headers = auth_headers(admin_user)
+
+        def search(text):
+            response = client.get(f"/api/v1/products/search?q={text}")
+            return [product["name"] for product in response.get_json()["products"]]
+
+        client.post(
+            "/api/v1/products/",
+            json={
+                "name": "Espresso machine",
+                "price": 200.0,
+                "description": "Brews coffee",
+                "inventory": 3,
+            },
+            headers=headers,
+        )
+        product_id = Product.query.filter_by(name="Espresso machine").one().id
+        assert search("coffee") == ["Espresso machine"]
+
+        client.put(
+            f"/api/v1/products/{product_id}",
+            json={
+                "name": "Tea kettle",
+                "price": 40.0,
+                "description": "Boils water",
+                "inventory": 3,
+            },
+            headers=headers,
+        )
+        assert search("coffee") == []
+        assert search("kettle") == ["Tea kettle"]
+
+        client.delete(f"/api/v1/products/{product_id}", headers=headers)
+        assert search("kettle") == []
+
+    def test_search_treats_query_as_plain_words(self, client, product_factory):
+        product_factory(name="Salt AND pepper", description='Mill "grinder"')
+
+        assert (
+            client.get('/api/v1/products/search?q="NEAR(salt').status_code
+            == HTTPStatus.OK
+        )
+        assert [
+            len(client.get(f"/api/v1/products/search?q={text}").get_json()["products"])
+            for text in ("pepper AND", '"grinder"*', "!!!", "salt sugar")
+        ] == [1, 1, 0, 0]
+        assert (
+            client.get("/api/v1/products/search").status_code
+            == HTTPStatus.UNPROCESSABLE_ENTITY
+        )
+
+    def test_search_uses_the_index(self, client, product_factory, query_plans):
+        product_factory(name="Garden hose", description="Green")
+
+        client.get("/api/v1/products/search?q=hose")
+
+        assert query_plans.statements
+        # Only the page cut from the index is scanned, products by primary key.
+        assert [table for table, _ in query_plans.table_scans()] == ["matches"]
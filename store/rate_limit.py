@@ -0,0 +1,219 @@
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import wraps
+from http import HTTPStatus
+
+from flask import Flask, abort
+from limits import RateLimitItem, parse
+
+from store.redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_PREFIX = "ratelimit:"
+
+# Approximate sliding window over two fixed windows: the previous window's
+# count is weighted by how much of it still overlaps the sliding window.
+# KEYS[1]: current window counter, KEYS[2]: previous window counter
+# ARGV[1]: limit, ARGV[2]: window (ms), ARGV[3]: now (ms),
+# ARGV[4]: hits already admitted locally, ARGV[5]: hits to ask for (may be 0)
+# Returns {allowed, count in the sliding window}.
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3]) % window
+local pending = tonumber(ARGV[4])
+local requested = tonumber(ARGV[5])
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local count = math.floor(previous * (window - elapsed) / window) + current + pending
+
+local allowed = 0
+if requested > 0 and count + requested <= limit then
+  allowed = 1
+  count = count + requested
+end
+if pending + allowed * requested > 0 then
+  redis.call('INCRBY', KEYS[1], pending + allowed * requested)
+  redis.call('PEXPIRE', KEYS[1], window * 2)
+end
+return {allowed, count}
+"""
+
+
+@dataclass
+class LocalWindow:
+    item: RateLimitItem
+    key: str
+    # Hits admitted by this worker and not yet sent to Redis.
+    pending: int = 0
+    # Hits admitted locally since the last authoritative check.
+    admitted: int = 0
+    remote_count: int = 0
+    synced_at: float = float("-inf")
+
+
+class HybridRateLimiter:
+    """
+    Per-user rate limits that don't pay a Redis round trip on every request.
+
+    Each worker admits up to ``batch_size`` hits per user locally as long as
+    its last view of the shared window is fresher than ``sync_interval``
+    seconds and at least ``batch_size`` hits below the limit. Locally
+    admitted hits are sent to Redis in batches by a background thread every
+    ``flush_interval`` seconds. Everything else goes through one Lua call
+    that is the authoritative check. The limit can be overshot by at most
+    ``batch_size`` hits per worker.
+    """
+
+    def __init__(self, redis_client: RedisClient):
+        self.redis_client = redis_client
+        self.batch_size: int = 10
+        self.sync_interval: float = 1.0
+        self.flush_interval: float = 0.5
+        self._windows: dict = {}
+        self._lock = threading.Lock()
+        self._flusher_pid: int | None = None
+
+    def init_app(self, app: Flask) -> None:
+        self.batch_size = app.config.get("RATE_LIMIT_LOCAL_BATCH", 10)
+        self.sync_interval = app.config.get("RATE_LIMIT_SYNC_INTERVAL", 1.0)
+        self.flush_interval = app.config.get("RATE_LIMIT_FLUSH_INTERVAL", 0.5)
+        app.extensions["hybrid_limiter"] = self
+
+    def limit(self, limit_value: str, cost: Callable | None = None):
+        """
+        Limit the view per JWT user, e.g. ``@hybrid_limiter.limit("2 per day")``.
+        ``cost``, called with the view's arguments, gives the number of hits a
+        request counts as; one by default.
+        """
+        item: RateLimitItem = parse(limit_value)
+
+        def decorator(func):
+            scope: str = f"{func.__module__}.{func.__qualname__}"
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                from store.user.identity import current_user_id
+
+                hits: int = cost(*args, **kwargs) if cost else 1
+                if not self.hit(item, scope, current_user_id(), hits):
+                    abort(
+                        HTTPStatus.TOO_MANY_REQUESTS,
+                        description=f"Rate limit exceeded: {limit_value}.",
+                    )
+                return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def hit(
+        self,
+        item: RateLimitItem,
+        scope: str,
+        identity: int,
+        cost: int = 1,
+    ) -> bool:
+        key: str = (
+            f"{RATE_LIMIT_PREFIX}{scope}:{identity}:{item.amount}/{item.get_expiry()}"
+        )
+        now: float = time.monotonic()
+        with self._lock:
+            window: LocalWindow = self._windows.setdefault(
+                key,
+                LocalWindow(item=item, key=key),
+            )
+            if (
+                window.admitted + cost <= self.batch_size
+                and now - window.synced_at < self.sync_interval
+                and window.remote_count + window.pending + cost
+                <= item.amount - self.batch_size
+            ):
+                window.pending += cost
+                window.admitted += cost
+                self.start_flusher()
+                return True
+            pending, window.pending = window.pending, 0
+
+        try:
+            allowed, count = self.run_script(window, pending, requested=cost)
+        except Exception:
+            with self._lock:
+                window.pending += pending
+            raise
+        with self._lock:
+            window.remote_count = count
+            window.admitted = 0
+            window.synced_at = now
+        return bool(allowed)
+
+    def flush(self) -> None:
+        """Send the locally admitted hits of every window to Redis."""
+        now: float = time.monotonic()
+        with self._lock:
+            batch: list = []
+            for key, window in list(self._windows.items()):
+                if window.pending:
+                    batch.append((window, window.pending))
+                    window.pending = 0
+                elif now - window.synced_at > self.sync_interval:
+                    del self._windows[key]
+        if not batch:
+            return
+
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for window, pending in batch:
+            self.run_script(window, pending, requested=0, client=pipeline)
+        try:
+            results: list = pipeline.execute()
+        except Exception:
+            with self._lock:
+                for window, pending in batch:
+                    window.pending += pending
+            raise
+        with self._lock:
+            for (window, _), (_, count) in zip(batch, results, strict=True):
+                window.remote_count = count
+                window.synced_at = now
+
+    def run_script(
+        self,
+        window: LocalWindow,
+        pending: int,
+        *args,
+        requested: int,
+        client=None,
+    ):
+        expiry_ms: int = window.item.get_expiry() * 1000
+        now_ms: int = int(time.time() * 1000)
+        index: int = now_ms // expiry_ms
+        script = self.redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+        return script(
+            keys=[f"{window.key}:{index}", f"{window.key}:{index - 1}"],
+            args=[window.item.amount, expiry_ms, now_ms, pending, requested],
+            client=client,
+        )
+
+    def start_flusher(self) -> None:
+        # Called with the lock held. A forked worker needs its own thread.
+        if not self.flush_interval or self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+        threading.Thread(target=self.run_flusher, daemon=True).start()
+
+    def run_flusher(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush rate limit hits to Redis.")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._windows.clear()
@@ -0,0 +1,19 @@
+import redis
+from flask import Flask
+
+
+class RedisClient:
+    """
+    Shared Redis connection for features that need more than the cache API
+    (Lua scripts, locks, counters).
+    """
+
+    def __init__(self):
+        self.client: redis.Redis | None = None
+
+    def init_app(self, app: Flask) -> None:
+        self.client = redis.Redis.from_url(app.config["REDIS_URL"])
+        app.extensions["redis"] = self
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
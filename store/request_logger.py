@@ -1,38 +1,154 @@
+import atexit
+import json
 import logging
+import queue
+import random
 import time
-from logging.handlers import RotatingFileHandler
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-from flask import g, request
+from flask import Flask, g, request
+
+from store import settings
 
 request_logger = logging.getLogger("request_logger")
 request_logger.setLevel(logging.INFO)
+request_logger.propagate = False
+
+REDACTED = "[REDACTED]"
+
+_listener: QueueListener | None = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Hands the raw record to the listener thread, so redaction, JSON encoding
+    and file writes never happen on the request thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonLineFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            **getattr(record, "request_record", {"message": record.getMessage()}),
+        }
+        if hasattr(record, "redact_fields"):
+            data["params"] = redact(data["params"], record.redact_fields)
+            data["body"], data["body_truncated"] = encode_body(
+                data["body"],
+                record.redact_fields,
+                record.max_body,
+            )
+        return json.dumps(data, default=str)
+
+
+def config(app: Flask, name: str):
+    return app.config.get(name, getattr(settings, name))
+
+
+def redact(data, fields: set):
+    if isinstance(data, dict):
+        return {
+            key: REDACTED if key in fields else redact(value, fields)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [redact(value, fields) for value in data]
+    return data
+
 
-handler = RotatingFileHandler(
-    "logs/request.log",
-    maxBytes=1 * 1024 * 1024,
-    backupCount=3,
-)
-formatter = logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s")
-handler.setFormatter(formatter)
-request_logger.addHandler(handler)
+def request_body(app: Flask):
+    """Return the parsed JSON body, or None when it isn't logged."""
+    if (
+        not config(app, "REQUEST_LOG_MAX_BODY")
+        or not request.content_length
+        or not request.is_json
+    ):
+        return None
+    # The view has usually parsed the body already, so this is a cache hit.
+    return request.get_json(silent=True)
+
+
+def encode_body(body, fields: set, max_body: int) -> tuple:
+    """Return the redacted JSON body cut to ``max_body`` characters."""
+    if body is None:
+        return None, False
+    text: str = json.dumps(redact(body, fields))
+    return text[:max_body], len(text) > max_body
+
+
+def sample_rate(app: Flask) -> float:
+    route: str = request.url_rule.rule if request.url_rule else request.path
+    return config(app, "REQUEST_LOG_SAMPLE_RATES").get(
+        route,
+        config(app, "REQUEST_LOG_SAMPLE_RATE"),
+    )
+
+
+def start_listener(app: Flask) -> None:
+    global _listener  # noqa: PLW0603
+    if _listener is not None:
+        _listener.stop()
+    request_logger.handlers.clear()
+
+    file_handler = RotatingFileHandler(
+        config(app, "REQUEST_LOG_FILE"),
+        maxBytes=config(app, "REQUEST_LOG_MAX_BYTES"),
+        backupCount=config(app, "REQUEST_LOG_BACKUP_COUNT"),
+    )
+    file_handler.setFormatter(JsonLineFormatter())
+    log_queue: queue.Queue = queue.Queue(-1)
+    request_logger.addHandler(DeferredQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+
+
+@atexit.register
+def stop_listener() -> None:
+    if _listener is not None:
+        _listener.stop()
 
 
 def request_logging(app):
+    start_listener(app)
+
     @app.before_request
     def log_request_info():
-        g.start_time = time.time()
-        if request.path.startswith("/api/"):
-            request_logger.info(
-                f"START request: {request.method} {request.path} | IP: {request.remote_addr} | "  # noqa: E501, G004
-                f"Params: {request.args} | Body: {request.get_data(as_text=True)}",
-            )
+        g.start_time = time.perf_counter()
 
     @app.after_request
     def log_response_info(response):
-        duration = time.time() - g.start_time
-        if request.path.startswith("/api/"):
-            request_logger.info(
-                f"END request: {request.method} {request.path} | IP: {request.remote_addr}  | "  # noqa: E501, G004
-                f" Status: {response.status_code} | Duration: {duration:.4f}s ",
-            )
+        if not request.path.startswith("/api/"):
+            return response
+        # Server errors are always kept, whatever the route's sample rate.
+        if response.status_code < 500 and random.random() >= sample_rate(app):  # noqa: PLR2004, S311
+            return response
+
+        # Params and body are redacted and encoded by JsonLineFormatter on the
+        # listener thread.
+        request_logger.info(
+            "request",
+            extra={
+                "request_record": {
+                    "method": request.method,
+                    "path": request.path,
+                    "route": request.url_rule.rule if request.url_rule else None,
+                    "ip": request.remote_addr,
+                    "params": request.args.to_dict(flat=False),
+                    "body": request_body(app),
+                    "status": response.status_code,
+                    "duration_ms": round(
+                        (time.perf_counter() - g.start_time) * 1000,
+                        3,
+                    ),
+                },
+                "redact_fields": set(config(app, "REQUEST_LOG_REDACT_FIELDS")),
+                "max_body": config(app, "REQUEST_LOG_MAX_BODY"),
+            },
+        )
         return response
@@ -0,0 +1,297 @@
+import bisect
+import itertools
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import Connection, Table, func, insert, select
+
+from store.enums import OrderStatusEnum
+from store.order.models import Item, Order
+from store.product.models import Product
+from store.user.models import User
+
+# Share of seeded orders per status.
+STATUS_WEIGHTS = {
+    OrderStatusEnum.PENDING.name: 15,
+    OrderStatusEnum.CONFIRMED.name: 25,
+    OrderStatusEnum.COMPLETED.name: 50,
+    OrderStatusEnum.CANCELED.name: 10,
+}
+# Seeded orders are spread over this many days, mostly recent ones.
+HISTORY_DAYS = 365
+
+
+def user_email(user_id: int) -> str:
+    return f"user{user_id}@example.com"
+
+
+class Seeder:
+    """
+    Fills the database with users, products and orders generated from a
+    single random seed, so the same arguments always give the same rows.
+
+    Every chunk of rows is written with one executemany of a statement
+    compiled once, with values already converted by the column types, and
+    the secondary indexes of the seeded tables are dropped first and rebuilt
+    once at the end. Ids continue after the existing rows, so seeding a
+    database that already has data adds to it, and PostgreSQL sequences are
+    moved past them afterwards.
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        password_hash: bytes,
+        *,
+        seed: int = 42,
+        chunk_size: int = 10_000,
+        max_items: int = 3,
+    ):
+        self.connection = connection
+        self.password_hash = password_hash
+        self.random_seed = seed
+        self.chunk_size = chunk_size
+        self.max_items = max_items
+        self.now: datetime = datetime.now()  # noqa: DTZ005
+        self.counts: dict = {}
+
+    def seed(self, users: int, products: int, orders: int, admins: int = 0) -> dict:
+        """Insert everything and return the number of rows per table."""
+        tables: list = [
+            User.__table__,
+            Product.__table__,
+            Order.__table__,
+            Item.__table__,
+        ]
+        started: float = time.perf_counter()
+        with self.deferred_indexes(tables):
+            user_ids: range = self.seed_users(users, admins)
+            prices: dict = self.seed_products(
+                products,
+                created_by=user_ids[0] if admins else None,
+            )
+            if orders:
+                self.seed_orders(orders, user_ids[admins:] or user_ids, prices)
+        self.sync_sequences(tables)
+        self.counts["seconds"] = round(time.perf_counter() - started, 2)
+        return self.counts
+
+    def seed_users(self, count: int, admins: int = 0) -> range:
+        """Insert ``count`` active users, the first ``admins`` of them admins."""
+        ids: range = self.next_ids(User.__table__, count)
+        self.insert(
+            User.__table__,
+            ("id", "email", "_password", "active", "is_admin", "full_name"),
+            (
+                (
+                    user_id,
+                    user_email(user_id),
+                    self.password_hash,
+                    True,
+                    index < admins,
+                    f"User {user_id}",
+                )
+                for index, user_id in enumerate(ids)
+            ),
+        )
+        return ids
+
+    def seed_products(
+        self,
+        count: int,
+        created_by: int | None = None,
+        name: str = "Product",
+        price: float | None = None,
+        inventory: int = 1_000_000,
+    ) -> dict:
+        """Insert products and return their prices by id."""
+        ids: range = self.next_ids(Product.__table__, count)
+        rng: random.Random = self.rng(Product.__table__, ids)
+        prices: dict = {
+            product_id: price or round(rng.uniform(1, 500), 2) for product_id in ids
+        }
+        self.insert(
+            Product.__table__,
+            (
+                "id",
+                "name",
+                "price",
+                "description",
+                "inventory",
+                "price_version",
+                "created_by",
+                "created_at",
+                "updated_at",
+            ),
+            (
+                (
+                    product_id,
+                    f"{name} {product_id}",
+                    product_price,
+                    f"Description of product {product_id}.",
+                    inventory,
+                    0,
+                    created_by,
+                    self.now,
+                    self.now,
+                )
+                for product_id, product_price in prices.items()
+            ),
+        )
+        return prices
+
+    def seed_orders(self, count: int, user_ids: range, prices: dict) -> None:
+        """
+        Insert orders of 1 to ``max_items`` items each, with statuses drawn
+        from STATUS_WEIGHTS and creation dates skewed towards recent days.
+        """
+        order_ids: range = self.next_ids(Order.__table__, count)
+        rng: random.Random = self.rng(Order.__table__, order_ids)
+        draw = rng.random
+        next_item_id: int = self.next_ids(Item.__table__, 1)[0]
+        product_ids: list = list(prices)
+        statuses: list = list(STATUS_WEIGHTS)
+        cum_weights: list = list(itertools.accumulate(STATUS_WEIGHTS.values()))
+        # Plain random() draws are a lot cheaper than randint/choice
+        # once they run several million times.
+        users: int = len(user_ids)
+        products: int = len(product_ids)
+        items: list = []
+
+        def orders():
+            nonlocal next_item_id
+            for order_id in order_ids:
+                total_price: float = 0.0
+                for _ in range(int(draw() * self.max_items) + 1):
+                    product_id: int = product_ids[int(draw() * products)]
+                    quantity: int = int(draw() * 3) + 1
+                    price: float = prices[product_id]
+                    items.append(
+                        (next_item_id, order_id, product_id, quantity, price, 0),
+                    )
+                    total_price += price * quantity
+                    next_item_id += 1
+                yield (
+                    order_id,
+                    user_ids[int(draw() * users)],
+                    statuses[bisect.bisect(cum_weights, draw() * cum_weights[-1])],
+                    self.now - timedelta(days=HISTORY_DAYS * draw() ** 3),
+                    round(total_price, 2),
+                    str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                )
+
+        def insert_items() -> None:
+            # Written after every chunk of orders so they never pile up.
+            self.insert(
+                Item.__table__,
+                (
+                    "id",
+                    "order_id",
+                    "product_id",
+                    "quantity",
+                    "product_price",
+                    "price_version",
+                ),
+                items,
+            )
+            items.clear()
+
+        self.insert(
+            Order.__table__,
+            (
+                "id",
+                "user_id",
+                "status",
+                "created_at",
+                "total_price",
+                "tracking_code",
+            ),
+            orders(),
+            after_chunk=insert_items,
+        )
+
+    def rng(self, table: Table, ids: range) -> random.Random:
+        """
+        Random numbers for the rows ``ids`` of ``table``: the same on every
+        run with the same seed, and different for rows appended later.
+        """
+        return random.Random(f"{self.random_seed}:{table.name}:{ids.start}")  # noqa: S311
+
+    def next_ids(self, table: Table, count: int) -> range:
+        last_id: int = self.connection.scalar(select(func.max(table.c.id))) or 0
+        return range(last_id + 1, last_id + count + 1)
+
+    def insert(self, table: Table, columns: tuple, rows, after_chunk=None) -> None:
+        """Insert ``rows``, tuples in ``columns`` order, in chunks."""
+        dialect = self.connection.dialect
+        compiled = insert(table).compile(dialect=dialect, column_keys=list(columns))
+        # The parameters go straight to the driver, in the form it expects.
+        keys: list = list(compiled.positiontup or columns)
+        positions: list = [columns.index(key) for key in keys]
+        processors: list = [table.c[key].type.bind_processor(dialect) for key in keys]
+        converted: list = [
+            (index, process)
+            for index, process in enumerate(processors)
+            if process is not None
+        ]
+        reorder: bool = positions != list(range(len(columns)))
+
+        def parameters(row: tuple):
+            if reorder:
+                row = tuple(row[position] for position in positions)
+            if converted:
+                row = list(row)
+                for index, process in converted:
+                    if row[index] is not None:
+                        row[index] = process(row[index])
+                row = tuple(row)
+            return row if compiled.positional else dict(zip(keys, row, strict=True))
+
+        chunk: list = []
+        for row in rows:
+            chunk.append(parameters(row))
+            if len(chunk) == self.chunk_size:
+                self.execute(table, str(compiled), chunk, after_chunk)
+                chunk = []
+        if chunk:
+            self.execute(table, str(compiled), chunk, after_chunk)
+
+    def execute(self, table: Table, statement: str, chunk: list, after_chunk) -> None:
+        self.connection.exec_driver_sql(statement, chunk)
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(chunk)
+        if after_chunk:
+            after_chunk()
+
+    def sync_sequences(self, tables: list) -> None:
+        """
+        Rows are inserted with explicit ids, which don't advance PostgreSQL
+        sequences; without this the next INSERT of the app reuses an id.
+        """
+        if self.connection.dialect.name != "postgresql":
+            return
+        for table in tables:
+            last_id = func.max(table.c.id)
+            self.connection.execute(
+                select(
+                    func.setval(
+                        func.pg_get_serial_sequence(table.name, "id"),
+                        func.coalesce(last_id, 1),
+                        # An empty table starts again from 1.
+                        last_id.is_not(None),
+                    ),
+                ),
+            )
+
+    @contextmanager
+    def deferred_indexes(self, tables: list):
+        indexes: list = [index for table in tables for index in table.indexes]
+        for index in indexes:
+            index.drop(self.connection, checkfirst=True)
+        try:
+            yield
+        finally:
+            for index in indexes:
+                index.create(self.connection, checkfirst=True)
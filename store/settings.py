@@ -17,11 +17,44 @@ env.read_env()
 ENV = env.str("FLASK_ENV", default="production")
 DEBUG = ENV == "development"
 SQLALCHEMY_DATABASE_URI = env.str("DATABASE_URL", default="sqlite:///db.sqlite3")
+# Read-only service methods are answered from this replica when it is set.
+DATABASE_REPLICA_URL = env.str("DATABASE_REPLICA_URL", default=None)
+SQLALCHEMY_BINDS = {"replica": DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+REPLICA_MAX_LAG = env.float("REPLICA_MAX_LAG", default=5)
+REPLICA_HEALTH_CHECK_INTERVAL = env.float("REPLICA_HEALTH_CHECK_INTERVAL", default=5)
+# Connection pool per engine (per worker process). SQLite keeps its defaults.
+SQLALCHEMY_POOL_SIZE = env.int("SQLALCHEMY_POOL_SIZE", default=10)
+SQLALCHEMY_MAX_OVERFLOW = env.int("SQLALCHEMY_MAX_OVERFLOW", default=10)
+SQLALCHEMY_POOL_TIMEOUT = env.float("SQLALCHEMY_POOL_TIMEOUT", default=10)
+SQLALCHEMY_POOL_RECYCLE = env.int("SQLALCHEMY_POOL_RECYCLE", default=1800)
+SQLALCHEMY_POOL_PRE_PING = env.bool("SQLALCHEMY_POOL_PRE_PING", default=True)
+# PostgreSQL only, in milliseconds; 0 disables it.
+SQLALCHEMY_STATEMENT_TIMEOUT = env.int("SQLALCHEMY_STATEMENT_TIMEOUT", default=0)
+SQLALCHEMY_ENGINE_OPTIONS = (
+    {}
+    if SQLALCHEMY_DATABASE_URI.startswith("sqlite")
+    else {
+        "pool_size": SQLALCHEMY_POOL_SIZE,
+        "max_overflow": SQLALCHEMY_MAX_OVERFLOW,
+        "pool_timeout": SQLALCHEMY_POOL_TIMEOUT,
+        "pool_recycle": SQLALCHEMY_POOL_RECYCLE,
+        "pool_pre_ping": SQLALCHEMY_POOL_PRE_PING,
+    }
+)
+if SQLALCHEMY_STATEMENT_TIMEOUT and SQLALCHEMY_DATABASE_URI.startswith("postgres"):
+    SQLALCHEMY_ENGINE_OPTIONS["connect_args"] = {
+        "options": f"-c statement_timeout={SQLALCHEMY_STATEMENT_TIMEOUT}",
+    }
 SECRET_KEY = env.str("SECRET_KEY")
 JWT_SECRET_KEY = env.str("JWT_SECRET_KEY")
 JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=2)
 JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
+USER_CACHE_TTL = env.int("USER_CACHE_TTL", default=60)
+USER_CACHE_MAXSIZE = env.int("USER_CACHE_MAXSIZE", default=10000)
 BCRYPT_LOG_ROUNDS = env.int("BCRYPT_LOG_ROUNDS", default=13)
+PASSWORD_HASHER_WORKERS = env.int("PASSWORD_HASHER_WORKERS", default=2)
+PASSWORD_HASHER_MAX_PENDING = env.int("PASSWORD_HASHER_MAX_PENDING", default=8)
+PASSWORD_HASHER_TIMEOUT = env.float("PASSWORD_HASHER_TIMEOUT", default=10)
 SQLALCHEMY_ECHO = DEBUG
 DEBUG_TB_ENABLED = DEBUG
 DEBUG_TB_INTERCEPT_REDIRECTS = False
@@ -57,12 +90,67 @@ CELERY_BEAT_SCHEDULE = {
         "schedule": crontab(minute="*/5"),
     },
 }
-# RateLimit
-RATELIMIT_STORAGE_URI = env.str("REDIS_URL", default="redis://localhost:6379/0")
-RATELIMIT_DEFAULT_LIMITS = []
+# Per-user rate limits: hits a worker may admit before asking Redis, how stale its
+# view of the shared window may get, and how often local hits are flushed.
+RATE_LIMIT_LOCAL_BATCH = env.int("RATE_LIMIT_LOCAL_BATCH", default=10)
+RATE_LIMIT_SYNC_INTERVAL = env.float("RATE_LIMIT_SYNC_INTERVAL", default=1.0)
+RATE_LIMIT_FLUSH_INTERVAL = env.float("RATE_LIMIT_FLUSH_INTERVAL", default=0.5)
 # Cache
 CACHE_TYPE = "RedisCache"
 CACHE_REDIS_HOST = env.str("CACHE_REDIS_HOST", default="localhost")
 CACHE_REDIS_PORT = env.int("CACHE_REDIS_PORT", default=6379)
 CACHE_REDIS_DB = 0
 CACHE_DEFAULT_TIMEOUT = 300
+# Seconds a worker batches cache namespace hits and misses before adding them
+# to the shared stats.
+CACHE_STATS_FLUSH_INTERVAL = env.float("CACHE_STATS_FLUSH_INTERVAL", default=1.0)
+# Request logging
+REQUEST_LOG_FILE = env.str("REQUEST_LOG_FILE", default="logs/request.log")
+REQUEST_LOG_MAX_BYTES = env.int("REQUEST_LOG_MAX_BYTES", default=50 * 1024 * 1024)
+REQUEST_LOG_BACKUP_COUNT = env.int("REQUEST_LOG_BACKUP_COUNT", default=3)
+REQUEST_LOG_MAX_BODY = env.int("REQUEST_LOG_MAX_BODY", default=2048)
+REQUEST_LOG_REDACT_FIELDS = env.list(
+    "REQUEST_LOG_REDACT_FIELDS",
+    default=["password", "re_password", "access_token", "refresh_token"],
+)
+REQUEST_LOG_SAMPLE_RATE = env.float("REQUEST_LOG_SAMPLE_RATE", default=1.0)
+# Per-route overrides keyed by URL rule, e.g. "/api/v1/products/=0.1"
+REQUEST_LOG_SAMPLE_RATES = env.dict(
+    "REQUEST_LOG_SAMPLE_RATES",
+    subcast_values=float,
+    default={},
+)
+# Products
+# "sync" reprices pending orders inside the product update, "deferred" hands
+# it to a coalesced Celery job.
+PRICE_PROPAGATION_MODE = env.str("PRICE_PROPAGATION_MODE", default="sync")
+PRICE_PROPAGATION_DELAY = env.int("PRICE_PROPAGATION_DELAY", default=5)
+PRICE_PROPAGATION_BATCH_SIZE = env.int("PRICE_PROPAGATION_BATCH_SIZE", default=1000)
+PRODUCT_LIST_PER_PAGE = env.int("PRODUCT_LIST_PER_PAGE", default=10)
+PRODUCT_LIST_MAX_PER_PAGE = env.int("PRODUCT_LIST_MAX_PER_PAGE", default=100)
+PRODUCT_TOTAL_CACHE_TIMEOUT = env.int("PRODUCT_TOTAL_CACHE_TIMEOUT", default=60)
+PRODUCT_LIST_CACHE_TIMEOUT = env.int("PRODUCT_LIST_CACHE_TIMEOUT", default=300)
+PRODUCT_CACHE_TIMEOUT = env.int("PRODUCT_CACHE_TIMEOUT", default=600)
+PRODUCT_NOT_FOUND_CACHE_TIMEOUT = env.int("PRODUCT_NOT_FOUND_CACHE_TIMEOUT", default=30)
+# Rows upserted per transaction by the bulk import, and failed rows reported.
+PRODUCT_IMPORT_CHUNK_SIZE = env.int("PRODUCT_IMPORT_CHUNK_SIZE", default=500)
+PRODUCT_IMPORT_MAX_ERRORS = env.int("PRODUCT_IMPORT_MAX_ERRORS", default=1000)
+# Orders
+ORDER_BATCH_MAX_SIZE = env.int("ORDER_BATCH_MAX_SIZE", default=500)
+# Orders a user may place through the batch endpoint, each order one hit.
+ORDER_BATCH_RATE_LIMIT = env.str("ORDER_BATCH_RATE_LIMIT", default="1000 per day")
+ORDER_LIST_PER_PAGE = env.int("ORDER_LIST_PER_PAGE", default=5)
+ORDER_LIST_MAX_PER_PAGE = env.int("ORDER_LIST_MAX_PER_PAGE", default=100)
+ORDER_PENDING_EXPIRE_MINUTES = env.int("ORDER_PENDING_EXPIRE_MINUTES", default=60)
+ORDER_PURGE_CHUNK_SIZE = env.int("ORDER_PURGE_CHUNK_SIZE", default=500)
+ORDER_PURGE_TIME_BUDGET = env.float("ORDER_PURGE_TIME_BUDGET", default=60)
+ORDER_PURGE_LOCK_TIMEOUT = env.int("ORDER_PURGE_LOCK_TIMEOUT", default=300)
+# Idempotency-Key replays (seconds)
+IDEMPOTENCY_KEY_TTL = env.int("IDEMPOTENCY_KEY_TTL", default=24 * 60 * 60)
+IDEMPOTENCY_IN_FLIGHT_TTL = env.int("IDEMPOTENCY_IN_FLIGHT_TTL", default=60)
+IDEMPOTENCY_WAIT_TIMEOUT = env.float("IDEMPOTENCY_WAIT_TIMEOUT", default=10)
+# Stock reservations (seconds). Reservation hashes live as long as the
+# counters, so a counter never outlives the holds subtracted from it.
+STOCK_COUNTER_TTL = env.int("STOCK_COUNTER_TTL", default=24 * 60 * 60)
+# Streaming exports: rows fetched from the database cursor at a time
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", default=1000)
@@ -1,17 +1,183 @@
+import time
 from datetime import datetime, timedelta
 
 from celery import shared_task
+from celery.utils.log import get_task_logger
+from redis.exceptions import LockError
+from sqlalchemy import delete, select
 
 from store.enums import OrderStatusEnum
-from store.extensions import db
-from store.order.models import Order
+from store.events import reprice_pending_orders
+from store.extensions import db, redis_client
+from store.order.models import Item, Order
+from store.order.reservations import stock_reservations
+from store.product.models import Product
+from store.settings import (
+    ORDER_PENDING_EXPIRE_MINUTES,
+    ORDER_PURGE_CHUNK_SIZE,
+    ORDER_PURGE_LOCK_TIMEOUT,
+    ORDER_PURGE_TIME_BUDGET,
+    PRICE_PROPAGATION_BATCH_SIZE,
+    PRICE_PROPAGATION_DELAY,
+)
+
+logger = get_task_logger(__name__)
+
+PURGE_LOCK_KEY = "lock:purge-pending-orders"
+REPRICE_SCHEDULED_PREFIX = "reprice:scheduled:"
 
 
 @shared_task(ignore_result=True)
-def remove_old_order_pending_status():
-    one_hour_ago = datetime.now() - timedelta(hours=1)  # noqa: DTZ005
-    Order.query.filter(
-        Order.created_at < one_hour_ago,
-        Order.status == OrderStatusEnum.PENDING.name,
-    ).delete()
-    db.session.commit()
+def remove_old_order_pending_status() -> dict | None:
+    # Beat fires every few minutes; a run that is still purging a backlog
+    # keeps the lock and the next one just skips.
+    lock = redis_client.lock(
+        PURGE_LOCK_KEY,
+        timeout=ORDER_PURGE_LOCK_TIMEOUT,
+        blocking=False,
+    )
+    if not lock.acquire():
+        logger.info("Pending order purge already running, skipped.")
+        return None
+    try:
+        return purge_pending_orders(
+            older_than=datetime.now()  # noqa: DTZ005
+            - timedelta(minutes=ORDER_PENDING_EXPIRE_MINUTES),
+            chunk_size=ORDER_PURGE_CHUNK_SIZE,
+            time_budget=ORDER_PURGE_TIME_BUDGET,
+        )
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            logger.warning("Pending order purge lock expired before release.")
+
+
+def purge_pending_orders(
+    older_than: datetime,
+    chunk_size: int,
+    time_budget: float,
+) -> dict:
+    """
+    Delete pending orders created before `older_than` together with their
+    items, `chunk_size` orders per transaction, until none are left or
+    `time_budget` seconds have passed.
+    """
+    started: float = time.monotonic()
+    report: dict = {"orders": 0, "items": 0, "chunks": []}
+
+    while time.monotonic() - started < time_budget:
+        chunk_started: float = time.monotonic()
+        # Row locks keep a concurrent confirm from racing the delete; rows
+        # locked by one are skipped and picked up by a later run.
+        order_ids: list = list(
+            db.session.scalars(
+                select(Order.id)
+                .where(
+                    Order.created_at < older_than,
+                    Order.status == OrderStatusEnum.PENDING.name,
+                )
+                .order_by(Order.id)
+                .limit(chunk_size)
+                .with_for_update(skip_locked=True),
+            ),
+        )
+        if not order_ids:
+            break
+
+        items_deleted: int = db.session.execute(
+            delete(Item).where(Item.order_id.in_(order_ids)),
+        ).rowcount
+        orders_deleted: int = db.session.execute(
+            delete(Order).where(Order.id.in_(order_ids)),
+        ).rowcount
+        db.session.commit()
+        stock_reservations.release_many(order_ids)
+
+        chunk: dict = {
+            "orders": orders_deleted,
+            "items": items_deleted,
+            "seconds": round(time.monotonic() - chunk_started, 3),
+        }
+        logger.info(
+            "Purged %(orders)s pending orders and %(items)s items in %(seconds)ss.",
+            chunk,
+        )
+        report["orders"] += orders_deleted
+        report["items"] += items_deleted
+        report["chunks"].append(chunk)
+
+    report["seconds"] = round(time.monotonic() - started, 3)
+    logger.info(
+        "Pending order purge finished: %(orders)s orders, %(items)s items "
+        "in %(seconds)ss.",
+        report,
+    )
+    return report
+
+
+def schedule_repricing(product_ids: set) -> None:
+    """
+    Enqueue one repricing job per product. Price edits made while a job is
+    still waiting are folded into it, since the job reads the latest price
+    when it runs.
+    """
+    for product_id in product_ids:
+        # The marker outlives the countdown so a lost job doesn't block
+        # repricing of the product for good.
+        if redis_client.set(
+            f"{REPRICE_SCHEDULED_PREFIX}{product_id}",
+            1,
+            nx=True,
+            ex=PRICE_PROPAGATION_DELAY + 60,
+        ):
+            reprice_product_pending_orders.apply_async(
+                args=(product_id,),
+                countdown=PRICE_PROPAGATION_DELAY,
+            )
+
+
+@shared_task(ignore_result=True)
+def reprice_product_pending_orders(product_id: int) -> int:
+    # Edits from here on schedule a new job.
+    redis_client.delete(f"{REPRICE_SCHEDULED_PREFIX}{product_id}")
+    product = db.session.execute(
+        select(Product.price, Product.price_version).where(Product.id == product_id),
+    ).first()
+    if product is None:
+        return 0
+
+    repriced: int = 0
+    while True:
+        order_ids: list = list(
+            db.session.scalars(
+                select(Item.order_id)
+                .join(Order, Order.id == Item.order_id)
+                .where(
+                    Item.product_id == product_id,
+                    Item.price_version < product.price_version,
+                    Order.status == OrderStatusEnum.PENDING.name,
+                )
+                .distinct()
+                .limit(PRICE_PROPAGATION_BATCH_SIZE),
+            ),
+        )
+        if not order_ids:
+            break
+        reprice_pending_orders(
+            db.session.connection(),
+            product_id,
+            product.price,
+            product.price_version,
+            order_ids=order_ids,
+        )
+        db.session.commit()
+        repriced += len(order_ids)
+
+    logger.info(
+        "Repriced %s pending orders of product %s to version %s.",
+        repriced,
+        product_id,
+        product.price_version,
+    )
+    return repriced
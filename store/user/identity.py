@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+from store.caching import TTLCache
+from store.settings import USER_CACHE_MAXSIZE, USER_CACHE_TTL
+from store.user.models import User
+
+# Full user rows are rarely needed once the token carries the id and the
+# admin flag, so a short per-process cache is enough for them.
+user_cache = TTLCache(ttl=USER_CACHE_TTL, maxsize=USER_CACHE_MAXSIZE)
+
+
+@dataclass(frozen=True)
+class UserIdentity:
+    id: int
+    email: str
+    is_admin: bool
+
+
+def identity_claims(user: User) -> dict:
+    return {"user_id": user.id, "is_admin": bool(user.is_admin)}
+
+
+def cached_user(email: str) -> dict | None:
+    def load_user() -> dict | None:
+        user: User | None = User.query.filter_by(email=email).first()
+        if not user:
+            return None
+        return {
+            "id": user.id,
+            "email": user.email,
+            "full_name": user.full_name,
+            "active": user.active,
+            "is_admin": bool(user.is_admin),
+        }
+
+    return user_cache.get_or_set(email, load_user)
+
+
+def current_identity() -> UserIdentity | None:
+    """
+    Identity of the request's JWT. Tokens issued before the user claims
+    existed fall back to the cached user row.
+    """
+    claims: dict = get_jwt()
+    if "user_id" in claims:
+        return UserIdentity(
+            id=claims["user_id"],
+            email=get_jwt_identity(),
+            is_admin=claims.get("is_admin", False),
+        )
+
+    user: dict | None = cached_user(get_jwt_identity())
+    if not user:
+        return None
+    return UserIdentity(id=user["id"], email=user["email"], is_admin=user["is_admin"])
+
+
+def current_user_id() -> int | None:
+    identity: UserIdentity | None = current_identity()
+    return identity.id if identity else None
@@ -41,6 +41,10 @@ class User(db.Model):
         """Set password."""
         self._password = bcrypt.generate_password_hash(value)
 
+    def set_password_hash(self, value):
+        """Set a password hashed elsewhere (see store.hashing)."""
+        self._password = value
+
     def check_password(self, value):
         """Check password."""
         return bcrypt.check_password_hash(self._password, value)
@@ -16,10 +16,11 @@ class RegisterUserSchema(Schema):
         if data.get("password") != data.get("re_password"):
             raise ValidationError("Passwords do not match.", field_name="password")  # noqa: EM101, TRY003
 
-    def create_user(self, data, **kwargs):
+    def create_user(self, data, password_hash, **kwargs):
         data.pop("re_password", None)
+        data.pop("password", None)
         user = User(**data)
-        user.password = data.get("password")
+        user.set_password_hash(password_hash)
         return user
 
 
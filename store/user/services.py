@@ -8,7 +8,8 @@ from flask_jwt_extended import (
 )
 from marshmallow import ValidationError
 
-from store.extensions import db
+from store.extensions import db, password_hasher
+from store.user.identity import cached_user, identity_claims
 from store.user.models import User
 from store.user.schemas import LoginUserSchema, RegisterUserSchema
 from store.validators import exists_row
@@ -18,12 +19,17 @@ class UserService:
     def register_user(self, user_data: dict) -> dict:
         register_user_schema = RegisterUserSchema()
         valid_data: dict = register_user_schema.load(user_data)
-        user: User = register_user_schema.create_user(data=valid_data)
 
-        if exists_row(User, email=user.email):
-            msg_error = f"User with email {user.email} already exists."
+        # Check before hashing so duplicate sign-ups don't cost a bcrypt round.
+        if exists_row(User, email=valid_data.get("email")):
+            msg_error = f"User with email {valid_data.get('email')} already exists."
             raise ValidationError(msg_error)
 
+        user: User = register_user_schema.create_user(
+            data=valid_data,
+            password_hash=password_hasher.hash(valid_data.get("password")),
+        )
+
         db.session.add(user)
         db.session.commit()
         return register_user_schema.dump(user)
@@ -33,28 +39,42 @@ class UserService:
         valid_data: dict = login_user_schema.load(user_data)
         user: User | None = User.query.filter_by(email=valid_data.get("email")).first()
 
-        if not user or not user.check_password(valid_data.get("password")):
+        password: str = valid_data.get("password")
+        if not user or not password_hasher.check(user.password, password):
             abort(
                 HTTPStatus.NOT_FOUND,
                 description="email or password is invalid!",
             )
+        if password_hasher.needs_rehash(user.password):
+            user.set_password_hash(password_hasher.hash(password))
+            db.session.commit()
+        # The id and admin flag travel in the token so authenticated requests
+        # don't need to look the user up by email.
+        claims: dict = identity_claims(user)
         return {
-            "access_token": create_access_token(identity=user.email),
-            "refresh_token": create_refresh_token(identity=user.email),
+            "access_token": create_access_token(
+                identity=user.email,
+                additional_claims=claims,
+            ),
+            "refresh_token": create_refresh_token(
+                identity=user.email,
+                additional_claims=claims,
+            ),
         }
 
     def refresh_token(self) -> str:
+        # Claims are rebuilt from the user row rather than copied from the
+        # long-lived refresh token, so a demoted or deleted user loses access
+        # once their current access token expires.
         identity: str = get_jwt_identity()
-        return create_access_token(identity=identity)
+        user: dict | None = cached_user(identity)
+        if not user:
+            abort(HTTPStatus.NOT_FOUND, description="No exists this user!")
+        claims: dict = {"user_id": user["id"], "is_admin": user["is_admin"]}
+        return create_access_token(identity=identity, additional_claims=claims)
 
     def detail_user(self) -> dict:
-        user: User | None = User.query.filter_by(email=get_jwt_identity()).first()
+        user: dict | None = cached_user(get_jwt_identity())
         if not user:
             abort(HTTPStatus.NOT_FOUND, description="No exists this user!")
-        return {
-            "id": user.id,
-            "email": user.email,
-            "full_name": user.full_name,
-            "active": user.active,
-            "is_admin": user.is_admin,
-        }
+        return user
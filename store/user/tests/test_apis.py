@@ -1,5 +1,22 @@
+import json
+import logging
+import threading
+import time
 from http import HTTPStatus
 
+import bcrypt
+import pytest
+from flask_jwt_extended import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+)
+from werkzeug.exceptions import ServiceUnavailable
+
+from store.extensions import password_hasher
+from store.hashing import PasswordHasher
+from store.request_logger import REDACTED, JsonLineFormatter, request_logger
+from store.user.identity import identity_claims, user_cache
 from store.user.models import User
 
 
@@ -46,3 +63,121 @@ class TestUserApi:
         }
         response = client.post("/api/v1/users/login", json=data)
         assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_login_tokens_carry_user_claims(self, client, db, user_store):
+        data = {
+            "email": user_store.email,
+            "password": "123",
+        }
+        tokens = client.post("/api/v1/users/login", json=data).get_json()
+        refresh_headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+
+        access_claims = decode_token(tokens["access_token"])
+        refreshed = client.post("/api/v1/users/refresh", headers=refresh_headers)
+        refreshed_claims = decode_token(refreshed.get_json()["access_token"])
+
+        assert access_claims["user_id"] == user_store.id
+        assert access_claims["is_admin"] is False
+        assert refreshed_claims["user_id"] == user_store.id
+
+    def test_refresh_reads_admin_flag_from_user(self, client, db, admin_user):
+        refresh_token = create_refresh_token(
+            identity=admin_user.email,
+            additional_claims=identity_claims(admin_user),
+        )
+        headers = {"Authorization": f"Bearer {refresh_token}"}
+        admin_user.is_admin = False
+        db.session.commit()
+
+        refreshed = client.post("/api/v1/users/refresh", headers=headers)
+
+        assert refreshed.status_code == HTTPStatus.OK
+        assert decode_token(refreshed.get_json()["access_token"])["is_admin"] is False
+
+        db.session.delete(admin_user)
+        db.session.commit()
+        user_cache.clear()
+
+        refreshed = client.post("/api/v1/users/refresh", headers=headers)
+
+        assert refreshed.status_code == HTTPStatus.NOT_FOUND
+
+    def test_detail_user_with_token_without_claims(self, client, db, user_store):
+        access_token = create_access_token(identity=user_store.email)
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        response = client.get("/api/v1/users/me", headers=headers)
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.get_json()["id"] == user_store.id
+
+    def test_login_rehashes_password_with_outdated_cost(self, client, db, user_store):
+        user_store.set_password_hash(bcrypt.hashpw(b"123", bcrypt.gensalt(rounds=5)))
+        db.session.commit()
+        data = {"email": user_store.email, "password": "123"}
+
+        response = client.post("/api/v1/users/login", json=data)
+        db.session.refresh(user_store)
+
+        assert response.status_code == HTTPStatus.OK
+        assert not password_hasher.needs_rehash(user_store.password)
+        assert bcrypt.checkpw(b"123", user_store.password)
+
+    def test_login_sheds_load_when_hasher_is_busy(
+        self,
+        client,
+        db,
+        user_store,
+        monkeypatch,
+    ):
+        busy_slots = threading.BoundedSemaphore(1)
+        busy_slots.acquire()
+        monkeypatch.setattr(password_hasher, "_slots", busy_slots)
+        data = {"email": user_store.email, "password": "123"}
+
+        response = client.post("/api/v1/users/login", json=data)
+
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+    def test_timed_out_hash_keeps_its_slot_until_done(self, monkeypatch):
+        hasher = PasswordHasher()
+        hasher.workers = 1
+        hasher.timeout = 0.05
+        slots = threading.BoundedSemaphore(1)
+        monkeypatch.setattr(hasher, "_slots", slots)
+
+        with pytest.raises(ServiceUnavailable):
+            hasher.run(time.sleep, 0.3)
+        # The timed out job still runs in the pool and holds the only slot.
+        held_while_running = not slots.acquire(blocking=False)
+        hasher.executor().shutdown(wait=True)
+
+        assert held_while_running
+        assert slots.acquire(blocking=False)
+
+    def test_request_log_redacts_and_truncates_body(self, app, client, db, user_store):
+        app.config["REQUEST_LOG_MAX_BODY"] = 20
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        request_logger.addHandler(handler)
+        data = {"email": user_store.email, "password": "123"}
+
+        client.post("/api/v1/users/login", json=data)
+        app.config["REQUEST_LOG_MAX_BODY"] = 1000
+        client.post("/api/v1/users/login", json=data)
+        app.config["REQUEST_LOG_SAMPLE_RATES"] = {"/api/v1/users/login": 0.0}
+        client.post("/api/v1/users/login", json=data)
+        request_logger.removeHandler(handler)
+
+        truncated, full = (
+            json.loads(JsonLineFormatter().format(record)) for record in records
+        )
+        assert len(records) == 2  # noqa: PLR2004
+        # The request thread hands over the parsed body as is.
+        assert records[1].request_record["body"] == data
+        assert truncated["body_truncated"] is True
+        assert len(truncated["body"]) == 20  # noqa: PLR2004
+        assert full["body_truncated"] is False
+        assert full["status"] == HTTPStatus.OK
+        assert json.loads(full["body"])["password"] == REDACTED
@@ -0,0 +1,85 @@
+from sqlalchemy import func, select
+
+from store.commands import seed
+from store.order.models import Item, Order
+from store.product.models import Product
+from store.user.models import User
+
+
+def seeded_rows(db) -> dict:
+    return {
+        model.__tablename__: db.session.execute(select(model).order_by(model.id))
+        .scalars()
+        .all()
+        for model in (User, Product, Order, Item)
+    }
+
+
+def values(row) -> tuple:
+    # Everything but the timestamps, which hold the time of seeding.
+    return tuple(
+        getattr(row, column.key)
+        for column in row.__table__.columns
+        if column.key not in ("created_at", "updated_at", "_password")
+    )
+
+
+class TestSeedCommand:
+    ARGS = ("--users", "20", "--products", "10", "--orders", "50", "--admins", "2")
+
+    def test_seed(self, app, db):
+        result = app.test_cli_runner().invoke(seed, self.ARGS)
+
+        assert result.exit_code == 0, result.output
+        rows = seeded_rows(db)
+        assert [len(rows[table]) for table in ("users", "products", "orders")] == [
+            20,
+            10,
+            50,
+        ]
+        assert [user.is_admin for user in rows["users"][:3]] == [True, True, False]
+        assert rows["users"][5].check_password("password")
+        assert {order.user_id for order in rows["orders"]} <= set(range(3, 21))
+        for order in rows["orders"]:
+            items = [item for item in rows["items"] if item.order_id == order.id]
+            assert 1 <= len(items) <= 3  # noqa: PLR2004
+            assert order.total_price == round(
+                sum(item.product_price * item.quantity for item in items),
+                2,
+            )
+
+    def test_seed_is_deterministic(self, app, db):
+        runner = app.test_cli_runner()
+        runner.invoke(seed, self.ARGS)
+        first = {
+            table: [values(row) for row in rows]
+            for table, rows in seeded_rows(db).items()
+        }
+        runner.invoke(seed, (*self.ARGS, "--reset"))
+
+        for table, rows in seeded_rows(db).items():
+            assert [values(row) for row in rows] == first[table]
+
+    def test_seed_appends(self, app, db):
+        runner = app.test_cli_runner()
+        runner.invoke(seed, self.ARGS)
+        runner.invoke(seed, self.ARGS)
+
+        orders = seeded_rows(db)["orders"]
+        assert db.session.scalar(select(func.count(User.id))) == 40  # noqa: PLR2004
+        assert len({order.tracking_code for order in orders}) == 100  # noqa: PLR2004
+
+    def test_seed_reset_forgets_cached_rows(self, app, db, fake_redis):
+        from store.product.cache import product_cache
+        from store.product.services import ProductService
+
+        runner = app.test_cli_runner()
+        runner.invoke(seed, self.ARGS)
+        ProductService().product(1)
+        fake_redis.set("{stock}:product:1", 5)
+        fake_redis.hset("{stock}:reservation:1", "1", 2)
+        result = runner.invoke(seed, (*self.ARGS, "--reset"))
+
+        assert result.exit_code == 0, result.output
+        assert product_cache.get(1) is None
+        assert fake_redis.keys("{stock}:*") == []